@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.core.database import async_engine
+from app.core.database import get_engine
 from app.core.rabbitmq_connection_params import RabbitMQConnectionParams
 from sqlalchemy.sql import text
 
@@ -20,7 +20,7 @@ async def health_check():
 
     # Verificar conexão com o banco de dados
     try:
-        async with async_engine.connect() as connection:
+        async with get_engine("api").connect() as connection:
             result = await connection.execute(text("SELECT 1"))  # Use text() para executar a consulta
             if result.scalar() == 1:
                 health_status["database"] = True
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, UploadFile, HTTPException, status, Depends
 from loguru import logger
-from app.services.upload_service import UploadService
+from app.services.upload_service import UploadService, FileTooLargeError
 from app.core.rabbitmq_connection_params import RabbitMQConnectionParams
 from app.core.rabbitmq_broker import RabbitMQBroker
 import time
@@ -55,6 +55,20 @@ async def upload_csv(
 
         return {"message": result}
 
+    except FileTooLargeError as e:
+        logger.error(
+            "File too large during file upload.",
+            extra={
+                "file_name": file.filename,
+                "operation": "upload_csv",
+                "error": str(e),
+            },
+        )
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=str(e),
+        )
+
     except ValueError as e:
         logger.error(
             "Validation error during file upload.",
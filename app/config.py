@@ -1,3 +1,5 @@
+from typing import Dict, List, Optional
+
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -9,6 +11,100 @@ class Settings(BaseSettings):
     POSTGRES_PORT: int = 5432
     POSTGRES_DB: str = "boletos"
     DEBUG: bool = True
+    DB_ECHO: bool = False  # loga todo SQL executado; apenas para depuração
+    DB_API_POOL_SIZE: int = 5
+    DB_API_MAX_OVERFLOW: int = 5
+    DB_WORKER_POOL_SIZE: int = 10
+    DB_WORKER_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 100  # cache de prepared statements do asyncpg; 0 com pgbouncer em modo transaction
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 100  # cache de prepared statements do SQLAlchemy por conexão
+    DB_COMMAND_TIMEOUT_SECONDS: float = 60.0
+    RABBITMQ_CHANNEL_POOL_SIZE: int = 8
+    PUBLISH_CONFIRM_WINDOW: int = 256  # publicações aguardando confirmação do broker ao mesmo tempo
+    PUBLISH_CONFIRM_TIMEOUT_SECONDS: float = 30.0
+    PUBLISH_CONFIRM_RETRIES: int = 3  # republicações de uma mensagem recusada ou sem confirmação
+    RETRY_DELAYS_SECONDS: List[float] = [1.0, 10.0, 60.0, 600.0]  # uma fila com TTL por nível
+    RETRY_MAX_ATTEMPTS: int = 5  # retentativas antes da DLQ; além dos níveis, repete o último
+    RETRY_JITTER: float = 0.2  # fração do atraso sorteada para espalhar as retentativas
+    # Só mude para "columnar" ou ative a compressão depois que todos os consumidores suportarem codecs
+    MESSAGE_CODEC: str = "json"  # "json" ou "columnar" (chunks confiáveis em formato binário)
+    MESSAGE_COMPRESSION_MIN_BYTES: int = 0  # 0 desativa a compressão deflate
+    CSV_VALIDATION_ENGINE: str = "pydantic"  # "pydantic" (linha a linha) ou "columnar" (vetorizado)
+    CSV_VALIDATION_BATCH_SIZE: int = 5000
+    FILE_SPLIT_WORKERS: int = 4  # 1 desativa a divisão paralela
+    FILE_SPLIT_PARALLEL_MIN_BYTES: int = 64 * 1024 * 1024
+    FILE_SPLIT_RANGE_BYTES: int = 16 * 1024 * 1024
+    FILE_SPLIT_QUEUE_SIZE: int = 8  # chunks prontos aguardando publicação
+    CHUNK_SIZE_INITIAL: int = 200
+    CHUNK_SIZE_MIN: int = 100  # min == max desativa o ajuste adaptativo
+    CHUNK_SIZE_MAX: int = 10000
+    CHUNK_TARGET_SECONDS: float = 0.5  # duração alvo da transação de cada chunk
+    CHUNK_SIZE_SMOOTHING: float = 0.3
+    CHUNK_SIZE_MAX_STEP: float = 2.0  # variação máxima do tamanho por ajuste
+    KNOWN_USER_CACHE_SIZE: int = 500_000  # 0 desativa o cache de usuários conhecidos
+    CHUNK_TRANSPORT: str = "inline"  # "inline" (linhas na mensagem) ou "claim_check" (offsets no spool)
+    SPOOL_DIR: str = "/tmp/spool"
+    SPOOL_RETENTION_SECONDS: int = 24 * 60 * 60
+    CHUNK_SIGNING_KEY: Optional[str] = None  # segredo do ambiente; sem ele, todo chunk é revalidado
+    INGEST_STRATEGY: str = "insert"  # "insert" (INSERT ... VALUES) ou "copy" (COPY + merge)
+    FILE_CONSUMER_MAX_IN_FLIGHT: int = 1
+    CHUNK_CONSUMER_MAX_IN_FLIGHT: int = 32  # também limita quantas mensagens cabem em um lote
+    CHUNK_BATCH_MAX_ROWS: int = 5000  # linhas por transação de lote; 0 desativa o micro-batching
+    CHUNK_BATCH_LINGER_SECONDS: float = 0.05
+    BOLETO_CONSUMER_MAX_IN_FLIGHT: int = 4
+    BOLETO_PAGE_SIZE: int = 10000  # dívidas por transação na geração de boletos de um arquivo
+    BOLETO_LEAD_DAYS: int = 10  # boletos são gerados N dias antes do vencimento
+    BOLETO_SCHEDULER_ENABLED: bool = False  # ativar em uma única instância (no compose, o worker)
+    BOLETO_SCHEDULER_SWEEP_SECONDS: int = 24 * 60 * 60  # varredura das dívidas sem boleto
+    BOLETO_SCHEDULER_TICK_SECONDS: int = 60  # precisão da liberação
+    BOLETO_SCHEDULER_PAGE_SIZE: int = 50000  # dívidas por página (uma transação cada)
+    BOLETO_SCHEDULER_FETCH_SIZE: int = 5000  # linhas por ida ao servidor no cursor
+    BOLETO_SCHEDULER_BATCH_SIZE: int = 1000  # dívidas por mensagem de geração
+    BOLETO_BANK_CODE: str = "237"  # layout do campo livre: Bradesco
+    BOLETO_AGENCY: str = "1234"
+    BOLETO_WALLET: str = "09"
+    BOLETO_ACCOUNT: str = "0012345"
+    BOLETO_BENEFICIARY_NAME: str = "Smart Billing"
+    BOLETO_RENDER_WORKERS: int = 2  # processos que geram os PDFs; 0 desativa a geração
+    BOLETO_RENDER_MAX_PENDING: int = 256  # PDFs em andamento no pool
+    BOLETO_RENDER_BATCH_SIZE: int = 32  # PDFs por tarefa enviada ao pool
+    BOLETO_STORE_DIR: str = "/tmp/boletos"  # armazenamento dos PDFs, endereçado por conteúdo
+    NOTIFICATION_BULK_SIZE: int = 500  # boletos por mensagem de notificação
+    NOTIFICATION_CONSUMER_MAX_IN_FLIGHT: int = 4
+    NOTIFICATION_COALESCE_SECONDS: float = 300.0  # janela de agrupamento por usuário; 0 envia por mensagem
+    NOTIFICATION_COALESCE_MAX_BOLETOS: int = 50  # boletos acumulados que liberam o envio antes da janela
+    NOTIFICATION_OUTBOX_POLL_SECONDS: float = 5.0
+    NOTIFICATION_OUTBOX_MAX_USERS: int = 200  # usuários reservados por consulta
+    NOTIFICATION_OUTBOX_LEASE_SECONDS: float = 300.0  # reserva do envio; boletos com falha voltam depois dela
+    NOTIFICATION_EMAIL_ENABLED: bool = False  # desativado, as notificações só vão para o log
+    NOTIFICATION_FROM_ADDRESS: str = "Smart Billing <boletos@smartbilling.local>"
+    NOTIFICATION_PROVIDER_RATE: float = 50.0  # e-mails por segundo no provedor SMTP
+    NOTIFICATION_DOMAIN_RATE: float = 10.0  # e-mails por segundo por domínio de destino
+    NOTIFICATION_DOMAIN_RATES: Dict[str, float] = {}  # limites por domínio, ex.: {"gmail.com": 20}
+    NOTIFICATION_RATE_BURST_SECONDS: float = 2.0  # rajada aceita, em segundos de vazão
+    SMTP_HOST: str = "mailhog"
+    SMTP_PORT: int = 1025
+    SMTP_USERNAME: Optional[str] = None
+    SMTP_PASSWORD: Optional[str] = None
+    SMTP_USE_TLS: bool = False  # TLS implícito (porta 465)
+    SMTP_START_TLS: bool = False
+    SMTP_TIMEOUT_SECONDS: float = 30.0
+    SMTP_POOL_SIZE: int = 4  # sessões SMTP persistentes por processo
+    SMTP_MESSAGES_PER_CONNECTION: int = 1000  # envios por sessão antes de reabrir a conexão
+    BOLETO_STATUS_BATCH_SIZE: int = 5000  # transições de status por comando; 0 grava cada mensagem direto
+    BOLETO_STATUS_FLUSH_SECONDS: float = 0.2  # espera máxima de uma transição no buffer
+    EVENT_LOOP_LAG_INTERVAL_SECONDS: float = 0.5
+    API_RUN_CONSUMERS: bool = False  # executa os consumidores no processo da API, sem `app.worker`
+    WORKER_QUEUES: str = "file,chunk,boleto,notification"  # filas de cada processo do `app.worker`
+    WORKER_PROCESSES: int = 0  # 0 usa a quantidade de CPUs
+    WORKER_SHUTDOWN_TIMEOUT_SECONDS: float = 60.0  # drenagem das mensagens antes do SIGKILL
+    WORKER_METRICS_PORT: int = 9100  # porta do processo 0; cada processo usa porta + índice; 0 desativa
+    UPLOAD_DIR: str = "/tmp"  # lido pelo worker: com API e worker separados, deve ser um volume compartilhado
+    UPLOAD_MAX_SIZE_BYTES: int = 2 * 1024 * 1024 * 1024  # 2 GB
+    UPLOAD_BLOCK_SIZE_BYTES: int = 1024 * 1024  # 1 MB por leitura
 
     class Config:
         env_file = ".env"  
@@ -1,21 +1,80 @@
 import aio_pika
-import json
+import asyncio
+from typing import Optional, Set, Tuple, Type
 from loguru import logger
+from pydantic import ValidationError
+from app.core.codecs import decode_message
+from app.core.metrics import CONSUMER_DEAD_LETTERS, CONSUMER_RETRIES
+from app.utils.retry_policy import RetryPolicy
+
+
+# Tamanho máximo do motivo da falha gravado nos headers da mensagem
+ERROR_REASON_MAX_LENGTH = 1000
+
+
+class PermanentMessageError(Exception):
+    """
+    Erro de uma mensagem que nunca poderá ser processada (ex.: campos obrigatórios
+    ausentes ou corpo ilegível). A mensagem vai direto para a DLQ, sem retentativas.
+    """
 
 
 class BaseConsumer:
     """
     Consumer base para facilitar a criação de consumidores com boas práticas.
     Inclui suporte para DLQ, retentativa e bindings.
+
+    O corpo das mensagens é decodificado pelo `content_type`/`content_encoding`,
+    então todos os codecs suportados são aceitos independentemente do codec que
+    este processo usa para publicar.
+
+    Com `max_in_flight > 1` as mensagens são despachadas para tasks independentes,
+    limitadas por um semáforo, em vez de serem processadas uma a uma.
+
+    No desligamento, o consumo é cancelado no broker, as mensagens em processamento
+    são concluídas e só então as mensagens pré-carregadas (prefetch) são devolvidas à
+    fila, uma a uma. O `QueueIterator` do aio-pika não é usado porque, ao fechar, ele
+    devolve o buffer com `nack(multiple=True)`, o que devolveria também as mensagens
+    ainda em processamento.
+
+    Mensagens com falha são republicadas na exchange do consumidor em uma fila de
+    retentativa por nível de atraso (`RetryPolicy`), que as devolve à fila principal
+    quando o TTL vence. Esgotadas as retentativas, vão para a DLQ.
+
+    Falhas permanentes vão direto para a DLQ: `PermanentMessageError` e os tipos em
+    `permanent_errors`, exceto os registrados em `transient_errors` (que têm
+    precedência). O tipo e o motivo da falha seguem nos headers da mensagem.
     """
 
-    def __init__(self, queue_name, exchange_name, routing_key, connection_params, dlq_name=None, retry_queue_name=None):
+    # Erros que nenhuma retentativa resolve; subclasses podem estender
+    permanent_errors: Tuple[Type[BaseException], ...] = (PermanentMessageError, ValidationError)
+    # Erros sempre retentados, mesmo que herdem de um tipo permanente
+    transient_errors: Tuple[Type[BaseException], ...] = ()
+
+    def __init__(
+        self,
+        queue_name,
+        exchange_name,
+        routing_key,
+        connection_params,
+        dlq_name=None,
+        retry_queue_name=None,
+        max_in_flight: int = 1,
+        retry_policy: Optional[RetryPolicy] = None,
+    ):
         self.queue_name = queue_name
         self.exchange_name = exchange_name
         self.routing_key = routing_key
         self.connection_params = connection_params
         self.dlq_name = dlq_name or f"{queue_name}.dlq"
         self.retry_queue_name = retry_queue_name or f"{queue_name}.retry"
+        self.max_in_flight = max(1, max_in_flight)
+        self.retry_policy = retry_policy or RetryPolicy()
+        self._in_flight: Set[asyncio.Task] = set()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._consumer_task: Optional[asyncio.Task] = None
+        self._waiting_for_message = False
+        self._stopping = False
 
     async def declare_infrastructure(self):
         """
@@ -32,16 +91,18 @@ class BaseConsumer:
             queue = await channel.declare_queue(self.queue_name, durable=True)
             await queue.bind(exchange, routing_key=self.routing_key)
 
-            # Declaração da fila de retentativa
-            retry_queue = await channel.declare_queue(
-                self.retry_queue_name,
-                durable=True,
-                arguments={
-                    "x-dead-letter-exchange": self.exchange_name, 
-                    "x-dead-letter-routing-key": self.routing_key,
-                    "x-message-ttl": 10000},
-            )
-            await retry_queue.bind(exchange, routing_key=f"{self.routing_key}.retry")
+            # Declaração das filas de retentativa, uma por nível de atraso
+            for delay in self.retry_policy.delays:
+                retry_queue = await channel.declare_queue(
+                    f"{self.retry_queue_name}.{RetryPolicy.label(delay)}",
+                    durable=True,
+                    arguments={
+                        "x-dead-letter-exchange": self.exchange_name,
+                        "x-dead-letter-routing-key": self.routing_key,
+                        "x-message-ttl": int(delay * 1000),
+                    },
+                )
+                await retry_queue.bind(exchange, routing_key=self.retry_routing_key(delay))
 
             # Declaração da DLQ
             dlq_queue = await channel.declare_queue(self.dlq_name, durable=True)
@@ -52,50 +113,209 @@ class BaseConsumer:
     async def start_consuming(self, prefetch_count=1):
         """
         Inicia o consumo da fila.
+
+        O prefetch é ajustado para no mínimo `max_in_flight`, para que o broker
+        entregue mensagens suficientes para ocupar todos os handlers. As entregas
+        ficam em um buffer local até serem despachadas.
         """
         connection = await self.connection_params.get_connection()
         async with connection:
             channel = await connection.channel()
 
             # Configura prefetch
-            await channel.set_qos(prefetch_count=prefetch_count)
+            await channel.set_qos(prefetch_count=max(prefetch_count, self.max_in_flight))
 
             queue = await channel.declare_queue(self.queue_name, durable=True)
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+            self._consumer_task = asyncio.current_task()
+
+            buffer: asyncio.Queue = asyncio.Queue()
+            consumer_tag = await queue.consume(buffer.put)
+            try:
+                while not self._stopping:
+                    message = await self._next_message(buffer)
+                    if message is None:
+                        break
+                    await self._dispatch(channel, message)
+            finally:
+                # Para de receber entregas e aguarda os handlers em andamento antes de
+                # devolver o buffer e fechar o canal
+                await self._cancel(queue, consumer_tag)
+                await self._drain()
+                await self._requeue_buffered(buffer)
+
+    async def _next_message(self, buffer: asyncio.Queue):
+        """
+        Aguarda a próxima mensagem. Retorna None se o consumidor for parado durante a espera.
+        """
+        self._waiting_for_message = True
+        try:
+            return await buffer.get()
+        except asyncio.CancelledError:
+            if not self._stopping:
+                raise
+            # Cancelamento solicitado por `stop`: as mensagens do buffer são devolvidas no encerramento
+            asyncio.current_task().uncancel()
+            return None
+        finally:
+            self._waiting_for_message = False
 
-            async with queue.iterator() as queue_iter:
-                async for message in queue_iter:
-                    async with message.process():
-                        try:
-                            await self.process_message(json.loads(message.body))
-                        except Exception as e:
-                            logger.error(f"Error processing message: {e}")
-                            await self.handle_failure(channel, message)
+    async def _cancel(self, queue, consumer_tag):
+        """Cancela o consumo no broker; nenhuma nova mensagem é entregue depois disso."""
+        try:
+            await queue.cancel(consumer_tag)
+        except Exception as e:
+            logger.warning(f"Could not cancel consumer on {self.queue_name}: {e}")
 
-    async def handle_failure(self, channel, message):
+    async def _requeue_buffered(self, buffer: asyncio.Queue):
+        """
+        Devolve à fila as mensagens entregues e ainda não despachadas.
+
+        Cada mensagem é devolvida individualmente: um `nack(multiple=True)` devolveria
+        também as entregas anteriores ainda não confirmadas. Se o canal já estiver
+        fechado, o broker devolve as mensagens por conta própria.
+        """
+        requeued = 0
+        while not buffer.empty():
+            message = buffer.get_nowait()
+            try:
+                await message.nack(requeue=True, multiple=False)
+                requeued += 1
+            except Exception as e:
+                logger.warning(f"Could not requeue buffered message on {self.queue_name}: {e}")
+        if requeued:
+            logger.info(f"Requeued {requeued} prefetched messages on {self.queue_name}.")
+
+    async def _dispatch(self, channel, message):
+        """
+        Processa a mensagem inline ou em uma task, conforme `max_in_flight`.
+        """
+        if self.max_in_flight == 1:
+            await self._handle_message(channel, message)
+            return
+
+        await self._semaphore.acquire()
+        task = asyncio.create_task(self._handle_message(channel, message))
+        self._in_flight.add(task)
+        task.add_done_callback(self._on_handler_done)
+
+    def _on_handler_done(self, task: asyncio.Task):
+        self._in_flight.discard(task)
+        self._semaphore.release()
+
+    async def _handle_message(self, channel, message):
+        """
+        Processa uma única mensagem, com ack ao final ou encaminhamento para retentativa.
+        """
+        # Se nem a retentativa puder ser publicada, a mensagem volta para a fila
+        async with message.process(requeue=True):
+            try:
+                await self.process_message(self._decode(message))
+            except Exception as e:
+                logger.error(f"Error processing message: {e}")
+                await self.handle_failure(channel, message, e)
+
+    @staticmethod
+    def _decode(message) -> dict:
+        """Decodifica o corpo da mensagem; um corpo ilegível é uma falha permanente."""
+        try:
+            return decode_message(message.body, message.content_type, message.content_encoding)
+        except Exception as e:
+            raise PermanentMessageError(f"Undecodable message body: {e}") from e
+
+    async def _drain(self):
+        """Aguarda a conclusão de todas as mensagens em processamento."""
+        if self._in_flight:
+            logger.info(f"Waiting for {len(self._in_flight)} in-flight messages on {self.queue_name}.")
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+
+    async def stop(self):
+        """
+        Desliga o consumidor de forma ordenada: para de receber novas mensagens,
+        aguarda as mensagens em processamento e então libera o canal e a conexão.
+        """
+        self._stopping = True
+        task = self._consumer_task
+        if task is None or task.done():
+            return
+
+        if self._waiting_for_message:
+            task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        logger.info(f"Consumer for queue {self.queue_name} stopped.")
+
+    def retry_routing_key(self, delay: float) -> str:
+        """Chave de roteamento da fila de retentativa do nível `delay`."""
+        return f"{self.routing_key}.retry.{RetryPolicy.label(delay)}"
+
+    def is_permanent(self, error: BaseException) -> bool:
+        """
+        Indica se a falha nunca será resolvida por uma retentativa.
+
+        Args:
+            error (BaseException): Erro lançado pelo processamento da mensagem.
+
+        Returns:
+            bool: True se a mensagem deve ir direto para a DLQ.
+        """
+        if isinstance(error, self.transient_errors):
+            return False
+        return isinstance(error, self.permanent_errors)
+
+    async def handle_failure(self, channel, message, error: Optional[BaseException] = None):
         """
         Tratamento de falhas com retentativa e envio para DLQ.
+
+        A mensagem é republicada na exchange do consumidor, na fila de retentativa do
+        nível escolhido pelo `x-retry-count`, ou na DLQ quando as retentativas acabaram
+        ou a falha é permanente (ver `is_permanent`).
+
+        Args:
+            channel: Canal do consumidor.
+            message: Mensagem que falhou.
+            error (Optional[BaseException]): Erro do processamento, registrado nos headers.
         """
-        retry_count = message.headers.get("x-retry-count", 0)
+        headers = dict(message.headers or {})
+        retry_count = int(headers.get("x-retry-count", 0))
+        permanent = error is not None and self.is_permanent(error)
+        if error is not None:
+            headers["x-error-type"] = type(error).__name__
+            headers["x-error-reason"] = str(error)[:ERROR_REASON_MAX_LENGTH]
+        delay = None if permanent else self.retry_policy.delay_for(retry_count)
+        exchange = await channel.get_exchange(self.exchange_name, ensure=False)
 
-        if retry_count < 3:  # Máximo de 3 retentativas
-            new_headers = message.headers.copy()
-            new_headers["x-retry-count"] = retry_count + 1
-            await channel.default_exchange.publish(
+        if delay is not None:
+            headers["x-retry-count"] = retry_count + 1
+            await exchange.publish(
                 aio_pika.Message(
                     body=message.body,
-                    headers=new_headers,
+                    headers=headers,
+                    content_type=message.content_type,
+                    content_encoding=message.content_encoding,
                     delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+                    expiration=self.retry_policy.expiration_for(delay),
                 ),
-                routing_key=f"{self.routing_key}.retry",
+                routing_key=self.retry_routing_key(delay),
             )
+            CONSUMER_RETRIES.labels(queue=self.queue_name, tier=RetryPolicy.label(delay)).inc()
+            logger.warning(f"Message from {self.queue_name} scheduled for retry {retry_count + 1} in {delay:g}s.")
         else:
-            await channel.default_exchange.publish(
+            reason = "permanent" if permanent else "retries_exhausted"
+            headers["x-dead-letter-reason"] = reason
+            await exchange.publish(
                 aio_pika.Message(
                     body=message.body,
+                    headers=headers,
+                    content_type=message.content_type,
+                    content_encoding=message.content_encoding,
                     delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
                 ),
                 routing_key=f"{self.routing_key}.dlq",
             )
+            CONSUMER_DEAD_LETTERS.labels(queue=self.queue_name, reason=reason).inc()
+            logger.error(
+                f"Message from {self.queue_name} sent to {self.dlq_name} ({reason}) after {retry_count} retries."
+            )
 
     async def process_message(self, message):
         """
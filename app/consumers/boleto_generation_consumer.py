@@ -1,22 +1,43 @@
+import asyncio
+from uuid import UUID
 from loguru import logger
-from app.consumers.base_consumer import BaseConsumer
+from app.consumers.base_consumer import BaseConsumer, PermanentMessageError
+from app.config import settings
+from app.services.boleto_renderer import BoletoRenderer
 from app.services.boleto_service import BoletoService
-from app.core.database import async_session_factory
+from app.core.database import get_session_factory
 from app.core.rabbitmq_connection_params import RabbitMQConnectionParams
+from app.utils.message_publisher import MessagePublisher
 
 class BoletoGenerationConsumer(BaseConsumer):
     """
     Consumidor responsável pela geração de boletos.
+
+    Aceita o job por arquivo (`{"file_id": ...}`), publicado quando todos os chunks do
+    arquivo foram gravados, os lotes liberados pelo agendador (`{"debt_ids": [...]}`)
+    e a mensagem legada por dívida (`user_id` e `debt_id`).
+
+    Os PDFs são gerados no pool de processos do `BoletoRenderer` (`BOLETO_RENDER_WORKERS`).
     """
 
-    def __init__(self, connection_params: RabbitMQConnectionParams):
+    def __init__(
+        self,
+        connection_params: RabbitMQConnectionParams,
+        max_in_flight: int = settings.BOLETO_CONSUMER_MAX_IN_FLIGHT,
+    ):
         super().__init__(
             queue_name="boleto_generation_queue",
             exchange_name="boleto_exchange",
             routing_key="boleto.generate",
             connection_params=connection_params,
+            max_in_flight=max_in_flight,
+        )
+        self.renderer = BoletoRenderer() if settings.BOLETO_RENDER_WORKERS > 0 else None
+        self.boleto_service = BoletoService(
+            session_factory=get_session_factory("worker"),
+            publisher=MessagePublisher(connection_params),
+            renderer=self.renderer,
         )
-        self.boleto_service = BoletoService(session_factory=async_session_factory)
 
     async def process_message(self, message: dict):
         """
@@ -24,13 +45,32 @@ class BoletoGenerationConsumer(BaseConsumer):
 
         Args:
             message (dict): Mensagem contendo informações da dívida e do usuário.
+
+        Raises:
+            PermanentMessageError: Se a mensagem não tiver os campos obrigatórios ou tiver IDs inválidos.
         """
         try:
+            file_id = message.get("file_id")
+            if file_id:
+                logger.info(f"Generating boletos for file {file_id}")
+                await self.boleto_service.generate_boletos_for_file(self._parse(UUID, str(file_id)))
+                return
+
+            debt_ids = message.get("debt_ids")
+            if debt_ids:
+                logger.info(f"Generating scheduled boletos for {len(debt_ids)} debts")
+                await self.boleto_service.generate_boletos_for_debts(
+                    [self._parse(int, debt_id) for debt_id in debt_ids]
+                )
+                return
+
             user_id = message.get("user_id")
             debt_id = message.get("debt_id")
 
             if not user_id or not debt_id:
-                raise ValueError("Message missing required fields: 'user_id' or 'debt_id'.")
+                raise PermanentMessageError(
+                    "Message missing required fields: 'file_id', 'debt_ids' or 'user_id' and 'debt_id'."
+                )
 
             logger.info(f"Generating boleto for User ID: {user_id}, Debt ID: {debt_id}")
 
@@ -39,3 +79,17 @@ class BoletoGenerationConsumer(BaseConsumer):
         except Exception as e:
             logger.error(f"Error generating boleto: {e}")
             raise
+
+    @staticmethod
+    def _parse(parser, value):
+        """Converte um ID da mensagem; valores inválidos são falhas permanentes."""
+        try:
+            return parser(value)
+        except (TypeError, ValueError) as e:
+            raise PermanentMessageError(f"Invalid ID {value!r} in message: {e}") from e
+
+    async def stop(self):
+        """Para o consumidor e encerra o pool de geração de PDFs."""
+        await super().stop()
+        if self.renderer is not None:
+            await asyncio.to_thread(self.renderer.close)
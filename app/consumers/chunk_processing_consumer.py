@@ -1,24 +1,63 @@
+import asyncio
+import hashlib
+import json
 from loguru import logger
 from app.consumers.base_consumer import BaseConsumer
+from app.config import settings
 from app.services.chunk_processing_service import ChunkProcessingService
 from app.core.rabbitmq_connection_params import RabbitMQConnectionParams
-from app.schemas.chunk import ChunkMessage
-from app.core.database import async_session_factory
+from app.schemas.chunk import ChunkEnvelope, PreparedChunk
+from app.core.codecs import json_default
+from app.core.spool_store import SpoolStore
+from app.utils.claim_check import is_claim_check, parse_claim_check
+from app.services.file_import_service import FileImportService
+from app.utils.message_publisher import MessagePublisher
+from app.utils.micro_batcher import MicroBatcher
+from app.utils.trusted_chunk import decode_trusted_chunk, is_trusted_chunk, untrusted_rows_as_dicts
+from app.core.database import get_session_factory
+from typing import List, Optional
 
 
 class ChunkProcessingConsumer(BaseConsumer):
     """
     Consumidor responsável por processar chunks de arquivos.
+
+    Com o micro-batching ativo (`CHUNK_BATCH_MAX_ROWS > 0`), os chunks das mensagens
+    em processamento são agrupados em uma única transação, até o limite de linhas ou
+    o tempo de espera configurados. Cada mensagem só recebe ack depois do commit do
+    seu lote; se o lote falhar, cada chunk é reprocessado individualmente.
+
+    Cada chunk carrega uma chave estável (offset no spool, assinatura ou hash do
+    conteúdo) usada no progresso da importação; quando o último chunk de um arquivo
+    é gravado, o job de geração de boletos do arquivo é publicado.
     """
 
-    def __init__(self, connection_params: RabbitMQConnectionParams):
+    def __init__(
+        self,
+        connection_params: RabbitMQConnectionParams,
+        max_in_flight: int = settings.CHUNK_CONSUMER_MAX_IN_FLIGHT,
+        batch_max_rows: int = settings.CHUNK_BATCH_MAX_ROWS,
+        batch_linger_seconds: float = settings.CHUNK_BATCH_LINGER_SECONDS,
+    ):
         super().__init__(
             queue_name="chunk_processing_queue",
             exchange_name="chunk_exchange",
             routing_key="chunk.process",
             connection_params=connection_params,
+            max_in_flight=max_in_flight,
         )
-        self.chunk_processing_service = ChunkProcessingService(session_factory=async_session_factory)
+        session_factory = get_session_factory("worker")
+        self.chunk_processing_service = ChunkProcessingService(session_factory=session_factory)
+        self.file_import_service = FileImportService(session_factory, MessagePublisher(connection_params))
+        self.spool_store = SpoolStore()
+        self.batcher: Optional[MicroBatcher] = None
+        if batch_max_rows > 0:
+            self.batcher = MicroBatcher(
+                flush=self._ingest_batch,
+                max_size=batch_max_rows,
+                linger_seconds=batch_linger_seconds,
+                size_of=lambda chunk: len(chunk.rows),
+            )
 
     async def process_message(self, message: dict):
         """
@@ -29,12 +68,81 @@ class ChunkProcessingConsumer(BaseConsumer):
         """
 
         try:
-            validated_message = ChunkMessage(**message)
-            await self.chunk_processing_service.process_chunk(
-                validated_message.file_id,
-                [row.dict() for row in validated_message.chunk],
-            )
+            chunk = await self.prepare_chunk(message)
+
+            if self.batcher is None or not chunk.rows:
+                await self._ingest_batch([chunk])
+                return
+
+            try:
+                await self.batcher.submit(chunk)
+            except Exception as e:
+                logger.warning(f"Batch ingest failed ({e}); processing chunk of file {chunk.file_id} individually.")
+                await self._ingest_batch([chunk])
 
         except Exception as e:
             logger.error(f"Error processing chunk: {e}")
             raise
+
+    async def prepare_chunk(self, message: dict) -> PreparedChunk:
+        """
+        Converte a mensagem de chunk em linhas validadas, prontas para inserção.
+
+        Chunks confiáveis (gerados pelo nosso splitter, com assinatura válida) são
+        mapeados direto. Chunks claim-check são lidos do spool e validados uma única
+        vez aqui. Mensagens legadas ou não confiáveis passam pela validação completa.
+
+        Args:
+            message (dict): Mensagem contendo o chunk e metadados.
+
+        Returns:
+            PreparedChunk: ID do arquivo, linhas válidas e chave do chunk.
+        """
+        if is_claim_check(message):
+            claim = parse_claim_check(message)
+            data = await asyncio.to_thread(self.spool_store.read_slice, claim.file_id, claim.offset, claim.length)
+            rows = await asyncio.to_thread(
+                self.chunk_processing_service.validate_slice,
+                claim.columns,
+                data,
+                claim.first_row,
+                claim.row_count,
+            )
+            return PreparedChunk(claim.file_id, rows, f"offset:{claim.offset}")
+
+        if is_trusted_chunk(message):
+            file_id, rows = decode_trusted_chunk(message)
+            return PreparedChunk(file_id, rows, f"signature:{message['signature']}")
+
+        chunk_key = self._content_key(message)
+
+        rows = untrusted_rows_as_dicts(message)
+        if rows is not None:
+            if message.get("signature"):
+                logger.warning(f"Untrusted chunk for file {message.get('file_id')}; validating all rows.")
+            message = {"file_id": message.get("file_id"), "chunk": rows}
+
+        envelope = ChunkEnvelope(**message)
+        return PreparedChunk(envelope.file_id, self.chunk_processing_service.validate_rows(envelope.chunk), chunk_key)
+
+    @staticmethod
+    def _content_key(message: dict) -> str:
+        """Chave de um chunk sem assinatura: hash do conteúdo, estável entre reentregas."""
+        content = json.dumps(message.get("chunk"), sort_keys=True, default=json_default).encode()
+        return f"sha256:{hashlib.sha256(content).hexdigest()}"
+
+    async def _ingest_batch(self, chunks: List[PreparedChunk]):
+        if len(chunks) == 1:
+            completed_files = await self.chunk_processing_service.process_trusted_chunk(*chunks[0])
+        else:
+            completed_files = await self.chunk_processing_service.ingest_chunks(chunks)
+        # Publicado antes do ack: se falhar, a reentrega do chunk não conta de novo,
+        # mas o job continua pendente em `file_imports` e é republicado no fim da divisão.
+        if completed_files:
+            await self.file_import_service.request_boletos(completed_files)
+
+    async def stop(self):
+        """Para o consumidor e envia o lote pendente, se houver."""
+        await super().stop()
+        if self.batcher is not None:
+            await self.batcher.close()
@@ -1,25 +1,77 @@
+import asyncio
+from contextlib import aclosing
 from loguru import logger
 from app.services.file_processor_service import FileProcessorService
 from app.core.rabbitmq_connection_params import RabbitMQConnectionParams
-from app.consumers.base_consumer import BaseConsumer
-from app.utils.message_publisher import MessagePublisher
+from app.consumers.base_consumer import BaseConsumer, PermanentMessageError
+from app.config import settings
+from app.core.database import get_session_factory
+from app.core.metrics import CHUNK_SIZE_ROWS
+from app.core.spool_store import SpoolStore
+from app.services.adaptive_chunk_sizer import chunk_sizer
+from app.services.file_import_service import FileImportService
+from app.utils.async_iteration import iterate_in_thread
+from app.utils.claim_check import build_claim_check
+from app.utils.message_publisher import ConfirmedPublishWindow, MessagePublisher, PublishConfirmError
+from app.utils.trusted_chunk import build_trusted_chunk
 from typing import List
 
+CHUNK_TRANSPORTS = ("inline", "claim_check")
+
 
 class FileProcessingConsumer(BaseConsumer):
     """
     Consumidor responsável por processar mensagens de arquivos prontos e dividi-los em chunks.
+
+    O transporte dos chunks é escolhido por `CHUNK_TRANSPORT`:
+    - "inline": as linhas validadas seguem na mensagem, no contrato de chunk confiável.
+    - "claim_check": o arquivo é guardado no spool e cada mensagem leva apenas o
+      intervalo de bytes do chunk, validado pelo consumidor de chunks.
+
+    O tamanho de cada chunk é consultado no `AdaptiveChunkSizer` compartilhado,
+    alimentado pela latência de ingestão medida pelos consumidores de chunks.
+
+    A importação é registrada em `file_imports` antes da publicação do primeiro chunk
+    e recebe o total de chunks ao fim da divisão, o que permite detectar a conclusão
+    do arquivo e disparar a geração de boletos em lote.
+
+    Os chunks são publicados em uma janela de confirmações (`PUBLISH_CONFIRM_WINDOW`):
+    a divisão não espera o ack de cada chunk, e o total só é registrado depois que o
+    broker confirmou todos eles. Chunks recusados são republicados pelo índice; se
+    algum continuar sem confirmação, o arquivo é reprocessado (os chunks já gravados
+    são reconhecidos pela chave e não são contados de novo).
+
+    Mensagens sem `file_id`/`file_path` ou de arquivos inexistentes vão direto para a DLQ.
     """
 
-    def __init__(self, connection_params: RabbitMQConnectionParams):
+    # O upload grava o arquivo antes de publicar a mensagem: se ele não existe, não vai existir
+    permanent_errors = BaseConsumer.permanent_errors + (FileNotFoundError,)
+
+    def __init__(
+        self,
+        connection_params: RabbitMQConnectionParams,
+        max_in_flight: int = settings.FILE_CONSUMER_MAX_IN_FLIGHT,
+        chunk_transport: str = settings.CHUNK_TRANSPORT,
+    ):
+        if chunk_transport not in CHUNK_TRANSPORTS:
+            raise ValueError(
+                f"Invalid chunk transport '{chunk_transport}'. Expected one of: {', '.join(CHUNK_TRANSPORTS)}."
+            )
         super().__init__(
             queue_name="file_processing_queue",
             exchange_name="file_exchange",
             routing_key="file.process",
             connection_params=connection_params,
+            max_in_flight=max_in_flight,
         )
         self.file_processor_service = FileProcessorService()
         self.publisher = MessagePublisher(connection_params)
+        self.chunk_transport = chunk_transport
+        self.spool_store = SpoolStore()
+        self.chunk_sizer = chunk_sizer
+        self.file_import_service = FileImportService(get_session_factory("worker"), self.publisher)
+        if chunk_transport == "inline" and not settings.CHUNK_SIGNING_KEY:
+            logger.warning("CHUNK_SIGNING_KEY is not set; chunks are published unsigned and fully revalidated.")
 
     async def process_message(self, message: dict):
         """
@@ -27,32 +79,111 @@ class FileProcessingConsumer(BaseConsumer):
 
         Args:
             message (dict): Mensagem contendo informações do arquivo.
+
+        Raises:
+            PermanentMessageError: Se a mensagem não tiver `file_id` e `file_path`.
         """
         file_id = message.get("file_id")
         file_path = message.get("file_path")
+        if not file_id or not file_path:
+            raise PermanentMessageError("Message missing required fields: 'file_id' and 'file_path'.")
 
         logger.info(f"Processing file {file_path} with ID {file_id}")
 
         try:
-            chunks = self.file_processor_service.process_file(file_path)
-            for chunk in chunks:
-                await self.publish_chunks(file_id, chunk)
+            await self.file_import_service.start(file_id)
+
+            if self.chunk_transport == "claim_check":
+                chunk_count = await self.publish_claim_checks(file_id, file_path)
+                await self.file_import_service.finish_split(file_id, chunk_count)
+                return
+
+            # A leitura e a validação do arquivo rodam fora do event loop
+            chunks = iterate_in_thread(
+                lambda: self.file_processor_service.process_file(file_path, self.chunk_sizer.current_size),
+                max_queue_size=settings.FILE_SPLIT_QUEUE_SIZE,
+            )
+            chunk_sizes = []
+            async with self.publisher.confirm_window() as window:
+                async with aclosing(chunks):
+                    async for chunk in chunks:
+                        await self.publish_chunks(window, file_id, chunk, len(chunk_sizes))
+                        chunk_sizes.append(len(chunk))
+            self._log_chunk_sizes(file_id, chunk_sizes)
+            await self.file_import_service.finish_split(file_id, len(chunk_sizes))
+        except PublishConfirmError as e:
+            logger.error(f"Chunks {e.unconfirmed} of file {file_id} were not confirmed by the broker.")
+            raise
         except Exception as e:
             logger.error(f"Error processing file {file_path}: {e}")
             raise
 
-    async def publish_chunks(self, file_id: str, chunk: List[dict]):
+    async def publish_claim_checks(self, file_id: str, file_path: str) -> int:
+        """
+        Guarda o arquivo no spool e publica uma mensagem com o intervalo de bytes de cada chunk.
+
+        Args:
+            file_id (str): Identificador do arquivo original.
+            file_path (str): Caminho do arquivo recebido no upload.
+
+        Returns:
+            int: Quantidade de chunks publicados.
+        """
+        await asyncio.to_thread(self.spool_store.purge_expired)
+        spool_path = await asyncio.to_thread(self.spool_store.adopt, file_id, file_path)
+        columns = await asyncio.to_thread(self.file_processor_service.read_fieldnames, spool_path)
+
+        slices = iterate_in_thread(
+            lambda: self.file_processor_service.plan_chunk_slices(spool_path, self.chunk_sizer.current_size),
+            max_queue_size=settings.FILE_SPLIT_QUEUE_SIZE,
+        )
+        chunk_sizes = []
+        async with self.publisher.confirm_window() as window:
+            async with aclosing(slices):
+                async for chunk_slice in slices:
+                    await window.publish(
+                        exchange="chunk_exchange",
+                        routing_key="chunk.process",
+                        message=build_claim_check(file_id, columns, chunk_slice),
+                        tag=len(chunk_sizes),
+                    )
+                    CHUNK_SIZE_ROWS.observe(chunk_slice.row_count)
+                    chunk_sizes.append(chunk_slice.row_count)
+
+        self._log_chunk_sizes(file_id, chunk_sizes)
+        return len(chunk_sizes)
+
+    @staticmethod
+    def _log_chunk_sizes(file_id: str, chunk_sizes: List[int]):
+        """Registra o resumo dos tamanhos de chunk escolhidos para o arquivo."""
+        if not chunk_sizes:
+            logger.info(f"No chunks enqueued for file {file_id}.")
+            return
+        logger.info(
+            f"{len(chunk_sizes)} chunks enqueued for file {file_id}: "
+            f"min={min(chunk_sizes)}, max={max(chunk_sizes)}, "
+            f"avg={sum(chunk_sizes) / len(chunk_sizes):.0f} rows."
+        )
+
+    async def publish_chunks(self, window: ConfirmedPublishWindow, file_id: str, chunk: List[dict], index: int):
         """
         Publica os chunks gerados na fila `chunk_processing_queue`.
 
+        Os chunks seguem o contrato de chunk confiável (versão e assinatura), para que
+        o consumidor de chunks não precise revalidar as linhas.
+
         Args:
+            window (ConfirmedPublishWindow): Janela de confirmações do arquivo.
             file_id (str): Identificador do arquivo original.
             chunk (List[dict]): Chunk gerado pelo serviço de processamento.
+            index (int): Posição do chunk no arquivo, usada nos erros de confirmação.
         """
-        message = {"file_id": file_id, "chunk": chunk}
-        await self.publisher.publish(
+        message = build_trusted_chunk(file_id, chunk)
+        await window.publish(
             exchange="chunk_exchange",
             routing_key="chunk.process",
             message=message,
+            tag=index,
         )
-        logger.info(f"Chunk with {len(chunk)} rows enqueued successfully.")
+        CHUNK_SIZE_ROWS.observe(len(chunk))
+        logger.info(f"Chunk {index} with {len(chunk)} rows published.")
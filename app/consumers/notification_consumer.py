@@ -1,21 +1,54 @@
 from loguru import logger
-from app.consumers.base_consumer import BaseConsumer
-from app.services.notification_service import NotificationService
+from app.consumers.base_consumer import BaseConsumer, PermanentMessageError
+from app.config import settings
+from app.core.database import get_session_factory
+from app.models.boletos import BoletoStatus
+from app.services.boleto_status_recorder import BoletoStatusRecorder
+from app.services.email_dispatcher import EmailDispatcher, SmtpConnectionPool
+from app.services.notification_coalescer import NotificationCoalescer
+from app.services.notification_service import NotificationDeliveryError, NotificationService
 from app.core.rabbitmq_connection_params import RabbitMQConnectionParams
 
 class NotificationConsumer(BaseConsumer):
     """
     Consumidor responsável por notificar os usuários sobre boletos gerados.
+
+    Aceita mensagens em lote (`{"boletos": [...]}`), publicadas pela geração de boletos
+    por arquivo, e a mensagem legada com um único `user_id` e `boleto_id`.
+
+    Com `NOTIFICATION_COALESCE_SECONDS > 0`, a mensagem só grava os boletos na caixa de
+    saída (`notification_outbox`) e o `NotificationCoalescer` envia um e-mail por usuário
+    quando a janela de agrupamento vence; sem agrupamento, os e-mails saem por mensagem.
+
+    Com `NOTIFICATION_EMAIL_ENABLED`, os e-mails de cada mensagem são enviados em
+    paralelo pelo `EmailDispatcher`, que reutiliza sessões SMTP e respeita os limites
+    de taxa por provedor e por domínio.
+
+    Os boletos notificados passam a `NOTIFIED` (ou `NOTIFICATION_FAILED`) pelo
+    `BoletoStatusRecorder`, que grava as transições das mensagens em andamento em lote.
+    Se algum envio falhar, a mensagem é reprocessada e só os boletos ainda não
+    notificados recebem e-mail de novo.
     """
 
-    def __init__(self, connection_params: RabbitMQConnectionParams):
+    def __init__(
+        self,
+        connection_params: RabbitMQConnectionParams,
+        max_in_flight: int = settings.NOTIFICATION_CONSUMER_MAX_IN_FLIGHT,
+    ):
         super().__init__(
             queue_name="notification_queue",
             exchange_name="notification_exchange",
             routing_key="notification.send",
             connection_params=connection_params,
+            max_in_flight=max_in_flight,
         )
-        self.notification_service = NotificationService()
+        session_factory = get_session_factory("worker")
+        self.dispatcher = EmailDispatcher(SmtpConnectionPool()) if settings.NOTIFICATION_EMAIL_ENABLED else None
+        self.notification_service = NotificationService(session_factory, self.dispatcher)
+        self.status_recorder = BoletoStatusRecorder(session_factory)
+        self.coalescer = None
+        if settings.NOTIFICATION_COALESCE_SECONDS > 0:
+            self.coalescer = NotificationCoalescer(session_factory, self.notification_service, self.status_recorder)
 
     async def process_message(self, message: dict):
         """
@@ -25,16 +58,33 @@ class NotificationConsumer(BaseConsumer):
             message (dict): Mensagem contendo informações do usuário e do boleto.
         """
         try:
-            user_id = message.get("user_id")
-            boleto_id = message.get("boleto_id")
+            boletos = message.get("boletos")
+            if boletos is None:
+                boletos = [message]
+
+            for boleto in boletos:
+                if not boleto.get("user_id") or not boleto.get("boleto_id"):
+                    raise PermanentMessageError("Message missing required fields: 'user_id' or 'boleto_id'.")
 
-            if not user_id or not boleto_id:
-                raise ValueError("Message missing required fields: 'user_id' or 'boleto_id'.")
+            if self.coalescer is not None:
+                await self.coalescer.enqueue(boletos)
+                return
 
-            logger.info(f"Notifying user {user_id} about boleto {boleto_id}")
+            logger.info(f"Notifying users about {len(boletos)} boletos")
 
-            await self.notification_service.notify_user(user_id=user_id, boleto_id=boleto_id)
+            result = await self.notification_service.notify_boletos(boletos)
+            await self.status_recorder.record(result.notified, BoletoStatus.NOTIFIED)
+            if result.failed:
+                await self.status_recorder.record(result.failed, BoletoStatus.NOTIFICATION_FAILED)
+                raise NotificationDeliveryError(f"{len(result.failed)} of {len(boletos)} notifications failed.")
 
         except Exception as e:
             logger.error(f"Error notifying user: {e}")
             raise
+
+    async def stop(self):
+        """Para o consumidor, grava as transições de status pendentes e encerra as sessões SMTP."""
+        await super().stop()
+        await self.status_recorder.close()
+        if self.dispatcher is not None:
+            await self.dispatcher.close()
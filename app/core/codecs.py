@@ -0,0 +1,245 @@
+import json
+import struct
+import zlib
+from datetime import date, datetime
+from typing import Optional, Tuple
+from uuid import UUID
+
+import numpy as np
+
+from app.schemas.chunk import TRUSTED_CHUNK_COLUMNS, TRUSTED_CHUNK_SCHEMA_VERSION
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson é opcional
+    orjson = None
+
+JSON_CONTENT_TYPE = "application/json"
+CHUNK_CONTENT_TYPE = "application/vnd.smart-billing.chunk"
+DEFLATE_ENCODING = "deflate"
+
+
+class UnsupportedCodecError(ValueError):
+    """
+    Erro lançado quando uma mensagem usa um content_type ou content_encoding desconhecido.
+    """
+
+
+def json_default(obj):
+    """
+    Serializador para tipos não suportados pelo JSON, como datetime e UUID.
+    """
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, UUID):
+        return str(obj)
+    raise TypeError(f"Type {type(obj)} not serializable")
+
+
+class JsonCodec:
+    """
+    Codec JSON. Usa o orjson quando instalado, com a mesma saída do `json` da
+    biblioteca padrão para datas e UUIDs.
+    """
+
+    content_type = JSON_CONTENT_TYPE
+
+    def can_encode(self, message: dict) -> bool:
+        return True
+
+    def encode(self, message: dict) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(message, default=json_default)
+        return json.dumps(message, default=json_default).encode()
+
+    def decode(self, body: bytes) -> dict:
+        if orjson is not None:
+            return orjson.loads(body)
+        return json.loads(body)
+
+
+class ColumnarChunkCodec:
+    """
+    Codec binário colunar para chunks confiáveis (ver `build_trusted_chunk`).
+
+    Cada campo é gravado como um array contíguo: inteiros e valores em int64/float64,
+    datas como dias desde 1970-01-01 (int32), UUIDs como 16 bytes e textos como um array de
+    tamanhos seguido dos bytes UTF-8. Os nomes das colunas não se repetem por linha.
+
+    A decodificação reconstrói exatamente a mensagem original, o que mantém válida
+    a assinatura do chunk.
+    """
+
+    content_type = CHUNK_CONTENT_TYPE
+
+    MAGIC = b"SBC"
+    VERSION = 1
+    # magic, versão do codec, versão do contrato, linhas, file_id, assinatura
+    HEADER = struct.Struct("<3sBHI16s32s")
+
+    def can_encode(self, message: dict) -> bool:
+        return (
+            message.get("schema_version") == TRUSTED_CHUNK_SCHEMA_VERSION
+            and tuple(message.get("columns") or ()) == TRUSTED_CHUNK_COLUMNS
+            and isinstance(message.get("rows"), list)
+            and isinstance(message.get("signature"), str)
+            and len(message["signature"]) == 64
+            and set(message) == {"file_id", "schema_version", "columns", "rows", "signature"}
+        )
+
+    def encode(self, message: dict) -> bytes:
+        rows = message["rows"]
+        names, government_ids, emails, amounts, due_dates, debt_ids = (
+            zip(*rows) if rows else ((),) * len(TRUSTED_CHUNK_COLUMNS)
+        )
+
+        header = self.HEADER.pack(
+            self.MAGIC,
+            self.VERSION,
+            message["schema_version"],
+            len(rows),
+            UUID(message["file_id"]).bytes,
+            bytes.fromhex(message["signature"]),
+        )
+        return b"".join(
+            (
+                header,
+                *self._encode_strings(names),
+                np.array(government_ids, dtype="<i8").tobytes(),
+                *self._encode_strings(emails),
+                np.array(amounts, dtype="<f8").tobytes(),
+                np.array(due_dates, dtype="datetime64[D]").astype("<i4").tobytes(),
+                bytes.fromhex("".join(debt_ids).replace("-", "")),
+            )
+        )
+
+    def decode(self, body: bytes) -> dict:
+        magic, version, schema_version, row_count, file_id, signature = self.HEADER.unpack_from(body)
+        if magic != self.MAGIC or version != self.VERSION:
+            raise UnsupportedCodecError(f"Unsupported columnar chunk version {magic!r}/{version}")
+
+        view = memoryview(body)
+        offset = self.HEADER.size
+        names, offset = self._decode_strings(view, offset, row_count)
+        government_ids, offset = self._decode_array(view, offset, row_count, "<i8")
+        emails, offset = self._decode_strings(view, offset, row_count)
+        amounts, offset = self._decode_array(view, offset, row_count, "<f8")
+        day_numbers, offset = self._decode_array(view, offset, row_count, "<i4")
+        if offset + 16 * row_count != len(body):
+            raise ValueError("Truncated columnar chunk")
+        uuid_hex = view[offset:].hex()
+
+        due_dates = day_numbers.astype("datetime64[D]").astype(str).tolist()
+        debt_ids = [
+            f"{uuid_hex[i:i + 8]}-{uuid_hex[i + 8:i + 12]}-{uuid_hex[i + 12:i + 16]}-"
+            f"{uuid_hex[i + 16:i + 20]}-{uuid_hex[i + 20:i + 32]}"
+            for i in range(0, 32 * row_count, 32)
+        ]
+        rows = [
+            list(row)
+            for row in zip(names, government_ids.tolist(), emails, amounts.tolist(), due_dates, debt_ids)
+        ]
+        return {
+            "file_id": str(UUID(bytes=file_id)),
+            "schema_version": schema_version,
+            "columns": list(TRUSTED_CHUNK_COLUMNS),
+            "rows": rows,
+            "signature": signature.hex(),
+        }
+
+    @staticmethod
+    def _encode_strings(values) -> Tuple[bytes, bytes]:
+        encoded = [value.encode() for value in values]
+        return np.array([len(value) for value in encoded], dtype="<u4").tobytes(), b"".join(encoded)
+
+    @staticmethod
+    def _decode_array(view: memoryview, offset: int, count: int, dtype: str):
+        array = np.frombuffer(view, dtype=dtype, count=count, offset=offset)
+        return array, offset + array.nbytes
+
+    @classmethod
+    def _decode_strings(cls, view: memoryview, offset: int, count: int):
+        lengths, offset = cls._decode_array(view, offset, count, "<u4")
+        values = []
+        for length in lengths.tolist():
+            values.append(str(view[offset:offset + length], "utf-8"))
+            offset += length
+        return values, offset
+
+
+JSON_CODEC = JsonCodec()
+COLUMNAR_CODEC = ColumnarChunkCodec()
+
+# Codecs aceitos pelos consumidores, por content_type
+CODECS_BY_CONTENT_TYPE = {codec.content_type: codec for codec in (JSON_CODEC, COLUMNAR_CODEC)}
+
+# Codecs que o publicador pode preferir (`MESSAGE_CODEC`)
+CODECS_BY_NAME = {"json": JSON_CODEC, "columnar": COLUMNAR_CODEC}
+
+
+def encode_message(
+    message: dict, codec_name: str = "json", compression_min_bytes: int = 0
+) -> Tuple[bytes, str, Optional[str]]:
+    """
+    Serializa uma mensagem com o codec preferido, usando JSON quando o codec não se aplica.
+
+    Args:
+        message (dict): Mensagem a ser publicada.
+        codec_name (str): "json" ou "columnar".
+        compression_min_bytes (int): Corpos a partir desse tamanho são comprimidos com deflate (0 desativa).
+
+    Returns:
+        Tuple[bytes, str, Optional[str]]: Corpo, content_type e content_encoding.
+    """
+    try:
+        codec = CODECS_BY_NAME[codec_name]
+    except KeyError:
+        raise UnsupportedCodecError(
+            f"Invalid message codec '{codec_name}'. Expected one of: {', '.join(CODECS_BY_NAME)}."
+        )
+
+    body = None
+    if codec is not JSON_CODEC and codec.can_encode(message):
+        try:
+            body = codec.encode(message)
+        except (OverflowError, ValueError, TypeError):
+            # Valores fora do formato binário (ex.: inteiros acima de 64 bits) seguem em JSON
+            body = None
+    if body is None:
+        codec = JSON_CODEC
+        body = codec.encode(message)
+
+    content_encoding = None
+    if compression_min_bytes and len(body) >= compression_min_bytes:
+        body = zlib.compress(body, 1)
+        content_encoding = DEFLATE_ENCODING
+
+    return body, codec.content_type, content_encoding
+
+
+def decode_message(body: bytes, content_type: Optional[str] = None, content_encoding: Optional[str] = None) -> dict:
+    """
+    Desserializa uma mensagem de acordo com o content_type e o content_encoding.
+
+    Mensagens sem content_type são tratadas como JSON, o formato usado antes dos codecs.
+
+    Args:
+        body (bytes): Corpo da mensagem.
+        content_type (Optional[str]): Content type AMQP.
+        content_encoding (Optional[str]): Content encoding AMQP.
+
+    Returns:
+        dict: Mensagem desserializada.
+
+    Raises:
+        UnsupportedCodecError: Se o content_type ou o content_encoding não forem suportados.
+    """
+    if content_encoding == DEFLATE_ENCODING:
+        body = zlib.decompress(body)
+    elif content_encoding not in (None, "", "identity"):
+        raise UnsupportedCodecError(f"Unsupported content encoding '{content_encoding}'")
+
+    codec = CODECS_BY_CONTENT_TYPE.get(content_type or JSON_CONTENT_TYPE)
+    if codec is None:
+        raise UnsupportedCodecError(f"Unsupported content type '{content_type}'")
+    return codec.decode(body)
@@ -0,0 +1,81 @@
+import hashlib
+import os
+import re
+import tempfile
+
+from app.config import settings
+
+DIGEST_PATTERN = re.compile(r"[0-9a-f]{64}")
+
+
+class ContentStore:
+    """
+    Armazenamento local endereçado por conteúdo (SHA-256).
+
+    Cada documento é gravado uma única vez em `<root>/<aa>/<bb>/<digest><suffix>`;
+    gravar o mesmo conteúdo de novo (reentregas, reprocessamentos) não cria cópias.
+    A gravação usa um arquivo temporário no mesmo diretório e `os.replace`, então
+    leitores nunca veem um documento pela metade.
+    """
+
+    def __init__(self, root: str = settings.BOLETO_STORE_DIR, suffix: str = ".pdf"):
+        self.root = root
+        self.suffix = suffix
+
+    def path_for(self, digest: str) -> str:
+        """
+        Caminho do documento no store.
+
+        Args:
+            digest (str): SHA-256 do conteúdo, em hexadecimal.
+
+        Returns:
+            str: Caminho do documento.
+
+        Raises:
+            ValueError: Se o digest não for um SHA-256 em hexadecimal.
+        """
+        if not DIGEST_PATTERN.fullmatch(digest):
+            raise ValueError(f"Invalid content digest '{digest}'.")
+        return os.path.join(self.root, digest[:2], digest[2:4], f"{digest}{self.suffix}")
+
+    def put(self, data: bytes) -> str:
+        """
+        Grava o conteúdo, se ainda não existir.
+
+        Args:
+            data (bytes): Conteúdo do documento.
+
+        Returns:
+            str: SHA-256 do conteúdo.
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path_for(digest)
+        if os.path.exists(path):
+            return digest
+
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(file_descriptor, "wb") as file:
+                file.write(data)
+            os.replace(temporary_path, path)
+        except BaseException:
+            if os.path.exists(temporary_path):
+                os.unlink(temporary_path)
+            raise
+        return digest
+
+    def get(self, digest: str) -> bytes:
+        """
+        Lê um documento do store.
+
+        Args:
+            digest (str): SHA-256 do conteúdo.
+
+        Returns:
+            bytes: Conteúdo do documento.
+        """
+        with open(self.path_for(digest), "rb") as file:
+            return file.read()
@@ -0,0 +1,164 @@
+import asyncio
+from prometheus_client import Counter, Gauge, Histogram
+
+# Atraso do event loop: quanto uma tarefa agendada demora além do previsto para executar
+EVENT_LOOP_LAG_SECONDS = Histogram(
+    "event_loop_lag_seconds",
+    "Delay between the scheduled and the actual wake-up time of the event loop monitor.",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+EVENT_LOOP_LAG_LAST_SECONDS = Gauge(
+    "event_loop_lag_last_seconds",
+    "Most recent event loop lag measurement.",
+)
+
+
+async def monitor_event_loop_lag(interval: float):
+    """
+    Mede continuamente o atraso do event loop.
+
+    A cada `interval` segundos, compara o horário em que o monitor deveria acordar
+    com o horário em que realmente acordou. Qualquer trabalho bloqueante no loop
+    aparece como atraso.
+
+    Args:
+        interval (float): Intervalo entre medições, em segundos.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        scheduled = loop.time() + interval
+        await asyncio.sleep(interval)
+        lag = max(0.0, loop.time() - scheduled)
+        EVENT_LOOP_LAG_SECONDS.observe(lag)
+        EVENT_LOOP_LAG_LAST_SECONDS.set(lag)
+
+# Tamanho dos chunks e latência da ingestão, usados pelo dimensionamento adaptativo
+CHUNK_SIZE_TARGET_ROWS = Gauge(
+    "chunk_size_target_rows",
+    "Chunk size currently chosen by the adaptive chunk sizer.",
+)
+CHUNK_SIZE_ROWS = Histogram(
+    "chunk_size_rows",
+    "Number of rows in each chunk published by the file splitter.",
+    buckets=(50, 100, 200, 500, 1000, 2000, 5000, 10000, 20000, 50000),
+)
+CHUNK_INGEST_SECONDS = Histogram(
+    "chunk_ingest_seconds",
+    "Duration of the database transaction that ingests one chunk.",
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+CHUNK_INGEST_ROWS = Counter(
+    "chunk_ingest_rows_total",
+    "Rows ingested by the chunk processing service.",
+)
+
+# Cache de usuários conhecidos do ChunkProcessingService
+KNOWN_USER_CACHE_HITS = Counter(
+    "known_user_cache_hits_total",
+    "Chunk users found in the known-user cache (user upsert skipped).",
+)
+KNOWN_USER_CACHE_MISSES = Counter(
+    "known_user_cache_misses_total",
+    "Chunk users not found in the known-user cache.",
+)
+KNOWN_USER_CACHE_SIZE = Gauge(
+    "known_user_cache_size",
+    "Number of government ids held by the known-user cache.",
+)
+
+# Pools de conexões do banco (o estado atual é exposto por `DatabasePoolCollector`)
+DB_POOL_CHECKOUT_SECONDS = Histogram(
+    "db_pool_checkout_seconds",
+    "Time to check out a connection from the pool, including waits for a free connection.",
+    ["role"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+DB_POOL_CHECKOUT_TIMEOUTS = Counter(
+    "db_pool_checkout_timeouts_total",
+    "Connection checkouts that gave up after pool_timeout.",
+    ["role"],
+)
+
+# Agendador de boletos por vencimento
+BOLETO_SCHEDULER_PENDING = Gauge(
+    "boleto_scheduler_pending_debts",
+    "Debts held in the scheduler time wheel, waiting for their release time.",
+)
+BOLETO_SCHEDULER_RELEASED = Counter(
+    "boleto_scheduler_released_debts_total",
+    "Debts released by the scheduler for boleto generation.",
+)
+BOLETO_SCHEDULER_SWEEP_SECONDS = Histogram(
+    "boleto_scheduler_sweep_seconds",
+    "Duration of a sweep over debts without boleto.",
+    buckets=(0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, 3600.0),
+)
+
+# Transições de status dos boletos gravadas em lote
+BOLETO_STATUS_TRANSITIONS = Counter(
+    "boleto_status_transitions_total",
+    "Boleto status transitions by target status and result (applied or ignored by the transition guard).",
+    ["status", "result"],
+)
+BOLETO_STATUS_FLUSH_SIZE = Histogram(
+    "boleto_status_flush_size",
+    "Transitions written per status flush.",
+    buckets=(1, 10, 50, 100, 500, 1000, 5000, 10000),
+)
+
+# Envio de e-mails de notificação
+NOTIFICATION_EMAILS = Counter(
+    "notification_emails_total",
+    "Notification e-mails by result (sent or failed).",
+    ["result"],
+)
+NOTIFICATION_EMAIL_SEND_SECONDS = Histogram(
+    "notification_email_send_seconds",
+    "Time to send one e-mail over a pooled SMTP session.",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+NOTIFICATION_EMAIL_THROTTLE_SECONDS = Histogram(
+    "notification_email_throttle_seconds",
+    "Time an e-mail waited for the domain and provider rate limits.",
+    buckets=(0.0, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0),
+)
+NOTIFICATION_DISPATCH_RATE = Gauge(
+    "notification_dispatch_messages_per_second",
+    "E-mails per second delivered by the most recent notification batch.",
+)
+SMTP_CONNECTIONS_OPENED = Counter(
+    "smtp_connections_opened_total",
+    "SMTP sessions opened by the connection pool.",
+)
+NOTIFICATION_DIGEST_SIZE = Histogram(
+    "notification_digest_boletos",
+    "Boletos included in one notification e-mail.",
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250),
+)
+NOTIFICATION_OUTBOX_CLAIMED = Counter(
+    "notification_outbox_claimed_boletos_total",
+    "Boletos claimed from the notification outbox for a digest.",
+)
+
+# Confirmações de publicação do broker
+PUBLISH_CONFIRMS = Counter(
+    "publish_confirms_total",
+    "Publisher confirms by result (ack, nack, error, retry).",
+    ["result"],
+)
+PUBLISH_OUTSTANDING = Gauge(
+    "publish_outstanding_messages",
+    "Published messages waiting for a broker confirm.",
+)
+
+# Retentativas e DLQ dos consumidores
+CONSUMER_RETRIES = Counter(
+    "consumer_retries_total",
+    "Failed messages scheduled for a delayed retry, by queue and delay tier.",
+    ["queue", "tier"],
+)
+CONSUMER_DEAD_LETTERS = Counter(
+    "consumer_dead_letters_total",
+    "Failed messages sent to the dead letter queue, by reason (permanent, retries_exhausted).",
+    ["queue", "reason"],
+)
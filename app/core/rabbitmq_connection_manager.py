@@ -0,0 +1,129 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional, Tuple
+
+from aio_pika.abc import AbstractChannel, AbstractExchange, AbstractRobustConnection
+from aio_pika.pool import Pool
+from loguru import logger
+
+from app.config import settings
+from app.core.rabbitmq_connection_params import RabbitMQConnectionParams
+
+
+class RabbitMQConnectionManager:
+    """
+    Mantém uma conexão com o RabbitMQ durante todo o ciclo de vida da aplicação,
+    um pool de canais e um cache das exchanges já resolvidas.
+
+    Uma única instância é compartilhada por todos os publicadores que usam os mesmos
+    parâmetros de conexão (ver `for_params`).
+    """
+
+    _instances: Dict[str, "RabbitMQConnectionManager"] = {}
+
+    def __init__(
+        self,
+        connection_params: RabbitMQConnectionParams,
+        channel_pool_size: int = settings.RABBITMQ_CHANNEL_POOL_SIZE,
+    ):
+        self.connection_params = connection_params
+        self.channel_pool_size = channel_pool_size
+        self._connection: Optional[AbstractRobustConnection] = None
+        self._channel_pool: Optional[Pool] = None
+        self._exchanges: Dict[Tuple[int, str], AbstractExchange] = {}
+        self._lock: Optional[asyncio.Lock] = None
+
+    @classmethod
+    def for_params(cls, connection_params: RabbitMQConnectionParams) -> "RabbitMQConnectionManager":
+        """
+        Retorna a instância compartilhada para os parâmetros de conexão informados.
+
+        Args:
+            connection_params (RabbitMQConnectionParams): Parâmetros de conexão.
+
+        Returns:
+            RabbitMQConnectionManager: Gerenciador compartilhado.
+        """
+        manager = cls._instances.get(connection_params.url)
+        if manager is None:
+            manager = cls(connection_params)
+            cls._instances[connection_params.url] = manager
+        return manager
+
+    @classmethod
+    async def close_all(cls):
+        """Fecha todas as conexões compartilhadas."""
+        managers = list(cls._instances.values())
+        cls._instances.clear()
+        for manager in managers:
+            await manager.close()
+
+    async def get_connection(self) -> AbstractRobustConnection:
+        """
+        Retorna a conexão persistente, abrindo-a na primeira chamada.
+
+        Returns:
+            AbstractRobustConnection: Conexão robusta com o RabbitMQ.
+        """
+        if self._connection is not None and not self._connection.is_closed:
+            return self._connection
+
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        async with self._lock:
+            if self._connection is None or self._connection.is_closed:
+                self._connection = await self.connection_params.get_connection()
+                self._channel_pool = Pool(self._open_channel, max_size=self.channel_pool_size)
+                self._exchanges.clear()
+                logger.info(
+                    f"RabbitMQ connection opened with a pool of {self.channel_pool_size} channels."
+                )
+        return self._connection
+
+    async def _open_channel(self) -> AbstractChannel:
+        connection = await self.get_connection()
+        # Cada publicação é confirmada pelo broker (ack/nack); ver `ConfirmedPublishWindow`
+        return await connection.channel(publisher_confirms=True)
+
+    @asynccontextmanager
+    async def acquire_channel(self) -> AsyncIterator[AbstractChannel]:
+        """
+        Empresta um canal do pool.
+
+        Yields:
+            AbstractChannel: Canal pronto para uso, devolvido ao pool ao final.
+        """
+        await self.get_connection()
+        async with self._channel_pool.acquire() as channel:
+            if channel.is_closed:
+                await channel.reopen()
+            yield channel
+
+    async def get_exchange(self, channel: AbstractChannel, name: str) -> AbstractExchange:
+        """
+        Resolve uma exchange no canal informado, reutilizando o resultado em chamadas seguintes.
+
+        Args:
+            channel (AbstractChannel): Canal emprestado do pool.
+            name (str): Nome da exchange.
+
+        Returns:
+            AbstractExchange: Exchange resolvida.
+        """
+        key = (id(channel), name)
+        exchange = self._exchanges.get(key)
+        if exchange is None:
+            exchange = await channel.get_exchange(name)
+            self._exchanges[key] = exchange
+        return exchange
+
+    async def close(self):
+        """Fecha o pool de canais e a conexão."""
+        if self._channel_pool is not None:
+            await self._channel_pool.close()
+            self._channel_pool = None
+        if self._connection is not None and not self._connection.is_closed:
+            await self._connection.close()
+        self._connection = None
+        self._exchanges.clear()
@@ -11,6 +11,11 @@ class RabbitMQConnectionParams:
         self.username = username
         self.password = password
 
+    @property
+    def url(self) -> str:
+        """URL AMQP correspondente aos parâmetros."""
+        return f"amqp://{self.username}:{self.password}@{self.host}:{self.port}/"
+
     async def get_connection(self) -> aio_pika.RobustConnection:
         """
         Retorna uma conexão assíncrona configurada com RabbitMQ.
@@ -18,6 +23,4 @@ class RabbitMQConnectionParams:
         Returns:
             aio_pika.RobustConnection: Conexão configurada.
         """
-        return await aio_pika.connect_robust(
-            f"amqp://{self.username}:{self.password}@{self.host}:{self.port}/"
-        )
+        return await aio_pika.connect_robust(self.url)
@@ -0,0 +1,139 @@
+import mmap
+import os
+import shutil
+import time
+from typing import Optional
+from uuid import UUID
+
+from loguru import logger
+
+from app.config import settings
+
+SPOOL_SUFFIX = ".csv"
+
+
+class SpoolStore:
+    """
+    Armazenamento local dos arquivos importados no modo claim-check.
+
+    O arquivo é guardado uma única vez, identificado pelo `file_id`, e os consumidores
+    de chunks leem diretamente o intervalo de bytes de cada chunk. O diretório precisa
+    ser compartilhado entre o consumidor de arquivos e os consumidores de chunks.
+    """
+
+    def __init__(
+        self,
+        spool_dir: str = settings.SPOOL_DIR,
+        retention_seconds: int = settings.SPOOL_RETENTION_SECONDS,
+    ):
+        self.spool_dir = spool_dir
+        self.retention_seconds = retention_seconds
+
+    def path_for(self, file_id) -> str:
+        """
+        Caminho do arquivo no spool. O `file_id` é normalizado como UUID, o que impede
+        que valores vindos de mensagens apontem para fora do diretório.
+
+        Args:
+            file_id (UUID | str): Identificador do arquivo.
+
+        Returns:
+            str: Caminho absoluto no spool.
+        """
+        return os.path.join(self.spool_dir, f"{UUID(str(file_id))}{SPOOL_SUFFIX}")
+
+    def adopt(self, file_id, source_path: str) -> str:
+        """
+        Move o arquivo recebido para o spool. A operação é idempotente: se a mensagem
+        for reentregue depois da movimentação, o arquivo já guardado é reutilizado.
+
+        Args:
+            file_id (UUID | str): Identificador do arquivo.
+            source_path (str): Caminho atual do arquivo.
+
+        Returns:
+            str: Caminho do arquivo no spool.
+
+        Raises:
+            FileNotFoundError: Se o arquivo não estiver na origem nem no spool.
+        """
+        os.makedirs(self.spool_dir, exist_ok=True)
+        spool_path = self.path_for(file_id)
+
+        if os.path.exists(source_path):
+            if os.path.abspath(source_path) != spool_path:
+                # os.replace quando possível; cópia apenas entre sistemas de arquivos diferentes
+                shutil.move(source_path, spool_path)
+            logger.info(f"File {file_id} spooled at {spool_path}")
+        elif not os.path.exists(spool_path):
+            raise FileNotFoundError(f"File {source_path} not found and not spooled as {spool_path}")
+
+        return spool_path
+
+    def read_slice(self, file_id, offset: int, length: int) -> bytes:
+        """
+        Lê um intervalo de bytes do arquivo, via mmap quando possível.
+
+        Args:
+            file_id (UUID | str): Identificador do arquivo.
+            offset (int): Início do intervalo.
+            length (int): Tamanho do intervalo.
+
+        Returns:
+            bytes: Conteúdo do intervalo.
+
+        Raises:
+            ValueError: Se o intervalo ultrapassar o fim do arquivo.
+        """
+        with open(self.path_for(file_id), "rb") as file:
+            file_size = os.fstat(file.fileno()).st_size
+            if offset < 0 or length < 0 or offset + length > file_size:
+                raise ValueError(
+                    f"Slice {offset}+{length} is out of bounds for spooled file {file_id} ({file_size} bytes)"
+                )
+            if length == 0:
+                return b""
+
+            try:
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    return mapped[offset:offset + length]
+            except (OSError, ValueError):
+                # Sistemas de arquivos sem suporte a mmap
+                file.seek(offset)
+                return file.read(length)
+
+    def purge(self, file_id):
+        """Remove o arquivo do spool, se existir."""
+        try:
+            os.remove(self.path_for(file_id))
+        except FileNotFoundError:
+            pass
+
+    def purge_expired(self, now: Optional[float] = None) -> int:
+        """
+        Remove os arquivos do spool mais antigos que a retenção configurada.
+
+        Args:
+            now (Optional[float]): Horário de referência (epoch); padrão é o horário atual.
+
+        Returns:
+            int: Quantidade de arquivos removidos.
+        """
+        if not os.path.isdir(self.spool_dir):
+            return 0
+
+        deadline = (now if now is not None else time.time()) - self.retention_seconds
+        removed = 0
+        for entry in os.scandir(self.spool_dir):
+            if not entry.name.endswith(SPOOL_SUFFIX) or not entry.is_file():
+                continue
+            try:
+                if entry.stat().st_mtime < deadline:
+                    os.remove(entry.path)
+                    removed += 1
+            except FileNotFoundError:
+                continue
+
+        if removed:
+            logger.info(f"Purged {removed} expired files from spool {self.spool_dir}")
+        return removed
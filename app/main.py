@@ -1,14 +1,20 @@
 import asyncio
 from fastapi import FastAPI
-from app.core.database import init_db
+from app.core.database import init_db, dispose_engines, get_session_factory
+from app.core.metrics import monitor_event_loop_lag
+from app.config import settings
 from app.api.routes_upload import router as routes_upload
 from app.api.routes_healthcheck import router as routes_healthcheck
-from app.models import users, debts
+from app.models import users, debts, boletos, file_imports, notification_outbox
 from app.core.rabbitmq_connection_params import RabbitMQConnectionParams
+from app.core.rabbitmq_connection_manager import RabbitMQConnectionManager
 from app.consumers.file_processing_consumer import FileProcessingConsumer
 from app.consumers.chunk_processing_consumer import ChunkProcessingConsumer
 from app.consumers.boleto_generation_consumer import BoletoGenerationConsumer
 from app.consumers.notification_consumer import NotificationConsumer
+from app.services.known_user_cache import known_user_cache
+from app.services.boleto_scheduler import BoletoScheduler
+from app.utils.message_publisher import MessagePublisher
 from loguru import logger
 from prometheus_fastapi_instrumentator import Instrumentator
 import sys
@@ -37,6 +43,12 @@ Instrumentator().instrument(app).expose(app)
 app.include_router(routes_upload, prefix="/upload", tags=["Upload"])
 app.include_router(routes_healthcheck, prefix="/healthcheck", tags=["Healthcheck"])
 
+# Consumidores em execução, encerrados de forma ordenada no shutdown
+consumers = []
+# Tarefas de fundo canceladas no shutdown
+background_tasks = []
+
+
 async def initialize_consumers():
     """
     Inicializa os consumidores e declara as filas, exchanges e bindings.
@@ -60,25 +72,56 @@ async def initialize_consumers():
     await boleto_generation_consumer.declare_infrastructure()
     await notification_consumer.declare_infrastructure()
 
-    # Iniciar consumidores de forma paralela
-    asyncio.create_task(file_processing_consumer.start_consuming())
-    asyncio.create_task(boleto_generation_consumer.start_consuming())
-    asyncio.create_task(notification_consumer.start_consuming())
-    num_consumers = 2
-    for i in range(num_consumers):
-        consumer = ChunkProcessingConsumer(connection_params)
-        await consumer.declare_infrastructure()
-        asyncio.create_task(consumer.start_consuming(prefetch_count=3))
+    # Iniciar consumidores de forma paralela. O paralelismo de cada fila é controlado
+    # por `max_in_flight` do consumidor, e não por várias instâncias do mesmo consumidor.
+    consumers.extend([
+        file_processing_consumer,
+        chunk_processing_consumer,
+        boleto_generation_consumer,
+        notification_consumer,
+    ])
+    for consumer in consumers:
+        asyncio.create_task(consumer.start_consuming())
+
+    # Envio das notificações agrupadas por usuário
+    if notification_consumer.coalescer is not None:
+        background_tasks.append(asyncio.create_task(notification_consumer.coalescer.run()))
 
-    
+    # Agendador de boletos por vencimento
+    if settings.BOLETO_SCHEDULER_ENABLED:
+        scheduler = BoletoScheduler(get_session_factory("worker"), MessagePublisher(connection_params))
+        background_tasks.append(asyncio.create_task(scheduler.run()))
 
 
 @app.on_event("startup")
 async def startup_event():
     """
-    Evento executado ao iniciar o aplicativo. Inicializa os consumidores.
+    Evento executado ao iniciar o aplicativo.
+
+    Os consumidores rodam nos processos de `app.worker`; com `API_RUN_CONSUMERS`,
+    são iniciados também neste processo, no mesmo event loop da API.
     """
-    await initialize_consumers()
+    asyncio.create_task(monitor_event_loop_lag(settings.EVENT_LOOP_LAG_INTERVAL_SECONDS))
+
+    if settings.API_RUN_CONSUMERS:
+        await initialize_consumers()
 
     # Inicializa BD caso nao tenha sido criado
     await init_db()
+
+    # Carrega os usuários mais recentes no cache de usuários conhecidos
+    if settings.API_RUN_CONSUMERS:
+        asyncio.create_task(known_user_cache.warm(get_session_factory("worker")))
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """
+    Evento executado ao encerrar o aplicativo. Para os consumidores, aguardando as mensagens
+    em processamento, e fecha as conexões compartilhadas com o RabbitMQ e os pools do banco.
+    """
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*(consumer.stop() for consumer in consumers))
+    await RabbitMQConnectionManager.close_all()
+    await dispose_engines()
@@ -1,13 +1,41 @@
-from sqlalchemy import Column, String, TIMESTAMP, func
+from sqlalchemy import BigInteger, Column, ForeignKey, Integer, Sequence, String, TIMESTAMP, func, text
 from sqlalchemy.dialects.postgresql import UUID
 from app.core.database import Base
 
+
+class BoletoStatus:
+    """Estados do ciclo de vida de um boleto."""
+
+    PENDING = "PENDING"
+    GENERATED = "GENERATED"
+    GENERATION_FAILED = "GENERATION_FAILED"  # valor ou vencimento fora do layout do código de barras
+    NOTIFIED = "NOTIFIED"
+    NOTIFICATION_FAILED = "NOTIFICATION_FAILED"
+
+
+# Estados de origem aceitos por cada estado de destino; qualquer outra transição é ignorada
+BOLETO_TRANSITIONS = {
+    BoletoStatus.GENERATED: (BoletoStatus.PENDING, BoletoStatus.GENERATION_FAILED),
+    BoletoStatus.GENERATION_FAILED: (BoletoStatus.PENDING,),
+    BoletoStatus.NOTIFIED: (BoletoStatus.GENERATED, BoletoStatus.NOTIFICATION_FAILED),
+    BoletoStatus.NOTIFICATION_FAILED: (BoletoStatus.GENERATED,),
+}
+
+
 class Boleto(Base):
     __tablename__ = "boletos"
 
-    id = Column(UUID(as_uuid=True), primary_key=True)
-    user_id = Column(UUID(as_uuid=True), nullable=False)
-    debt_id = Column(UUID(as_uuid=True), nullable=False)
-    status = Column(String(20), nullable=False, default="PENDING")
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    debt_id = Column(UUID(as_uuid=True), unique=True, nullable=False)  # um boleto por dívida
+    our_number = Column(
+        BigInteger, Sequence("boleto_our_number_seq"), unique=True, nullable=False,
+        server_default=text("nextval('boleto_our_number_seq')"),
+    )  # nosso número, sem o dígito verificador
+    barcode = Column(String(44), default=None)
+    digitable_line = Column(String(54), default=None)
+    document_digest = Column(String(64), default=None)  # SHA-256 do PDF no ContentStore
+    status = Column(String(20), nullable=False, default=BoletoStatus.PENDING)
     generated_at = Column(TIMESTAMP, default=None)
-    notified_at = Column(TIMESTAMP, default=None)
\ No newline at end of file
+    notified_at = Column(TIMESTAMP, default=None)
+    dispatched_at = Column(TIMESTAMP, default=None)  # documentos gerados e notificação publicada
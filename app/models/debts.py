@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Index, Numeric, Date, UUID, ForeignKey, TIMESTAMP, DateTime, func
+from sqlalchemy import Column, Integer, Index, Numeric, Date, UUID, ForeignKey, TIMESTAMP, DateTime, func, text
 from app.core.database import Base
 
 class Debt(Base):
@@ -11,7 +11,16 @@ class Debt(Base):
     debt_due_date = Column(DateTime, nullable=False)  # Alterado de Date para DateTime para maior precisão
     debt_id = Column(UUID(as_uuid=True), unique=True, nullable=False)
     created_at = Column(TIMESTAMP, server_default=func.now())
+    boleto_generated_at = Column(TIMESTAMP, default=None)  # preenchido junto com a geração do boleto
 
     __table_args__ = (
         Index("idx_user_debt", "user_id", "debt_id"),  # Índice composto para buscas rápidas
+        Index("ix_debts_file_id_id", "file_id", "id"),  # Paginação por arquivo na geração de boletos
+        # Varredura do agendador: só dívidas sem boleto, em ordem de vencimento
+        Index(
+            "ix_debts_pending_boleto_due_date",
+            "debt_due_date",
+            "id",
+            postgresql_where=text("boleto_generated_at IS NULL"),
+        ),
     )
\ No newline at end of file
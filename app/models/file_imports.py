@@ -0,0 +1,33 @@
+from sqlalchemy import Column, Integer, String, TIMESTAMP, func
+from sqlalchemy.dialects.postgresql import UUID
+from app.core.database import Base
+
+
+class FileImport(Base):
+    """
+    Progresso da importação de um arquivo: quantos chunks foram gerados e quantos já
+    foram gravados. Quando todos os chunks são gravados, a geração de boletos do
+    arquivo é disparada.
+    """
+
+    __tablename__ = "file_imports"
+
+    file_id = Column(UUID(as_uuid=True), primary_key=True)
+    status = Column(String(20), nullable=False, server_default="INGESTING")
+    total_chunks = Column(Integer, nullable=True)  # definido ao fim da divisão do arquivo
+    committed_chunks = Column(Integer, nullable=False, server_default="0")
+    created_at = Column(TIMESTAMP, server_default=func.now())
+    completed_at = Column(TIMESTAMP, nullable=True)
+    boletos_requested_at = Column(TIMESTAMP, nullable=True)
+
+
+class FileImportChunk(Base):
+    """
+    Chunks já gravados de cada arquivo. Garante que reentregas de um mesmo chunk
+    não sejam contadas duas vezes.
+    """
+
+    __tablename__ = "file_import_chunks"
+
+    file_id = Column(UUID(as_uuid=True), primary_key=True)
+    chunk_key = Column(String(80), primary_key=True)
@@ -0,0 +1,25 @@
+from sqlalchemy import BigInteger, Column, Index, Integer, String, TIMESTAMP, func
+from sqlalchemy.dialects.postgresql import UUID
+from app.core.database import Base
+
+
+class NotificationOutbox(Base):
+    """
+    Boletos aguardando a notificação agrupada do pagador.
+
+    As notificações de um mesmo usuário se acumulam aqui até a janela de agrupamento
+    vencer ou o limite de boletos ser atingido; então um único e-mail com todos os
+    boletos é enviado. `claimed_until` é o lease de quem está enviando: se o worker
+    cair no meio do envio, as linhas voltam a ficar disponíveis quando o lease vence.
+    """
+
+    __tablename__ = "notification_outbox"
+    __table_args__ = (Index("ix_notification_outbox_user_id_created_at", "user_id", "created_at"),)
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    user_id = Column(Integer, nullable=False)
+    boleto_id = Column(UUID(as_uuid=True), unique=True, nullable=False)  # reentregas não duplicam
+    digitable_line = Column(String(54), default=None)
+    document_digest = Column(String(64), default=None)
+    created_at = Column(TIMESTAMP, nullable=False, server_default=func.now())
+    claimed_until = Column(TIMESTAMP, default=None)
@@ -0,0 +1,22 @@
+from typing import Iterator, List
+
+# Limite de parâmetros por comando do protocolo do PostgreSQL (asyncpg)
+MAX_BIND_PARAMETERS = 32767
+
+
+def statement_batches(rows: List[dict]) -> Iterator[List[dict]]:
+    """
+    Divide as linhas de um INSERT multi-linha em partes que respeitam o limite de
+    parâmetros por comando.
+
+    Args:
+        rows (List[dict]): Linhas a inserir, todas com as mesmas colunas.
+
+    Yields:
+        List[dict]: Partes das linhas, na ordem original.
+    """
+    if not rows:
+        return
+    rows_per_statement = max(1, MAX_BIND_PARAMETERS // len(rows[0]))
+    for start in range(0, len(rows), rows_per_statement):
+        yield rows[start:start + rows_per_statement]
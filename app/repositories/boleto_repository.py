@@ -0,0 +1,318 @@
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import Integer, String, TIMESTAMP, bindparam, text
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
+
+from app.models.boletos import BOLETO_TRANSITIONS, BoletoStatus
+
+# Último `debts.id` da próxima página do arquivo (paginação por keyset)
+NEXT_PAGE_BOUNDARY = text(
+    """
+    SELECT max(id) FROM (
+        SELECT id FROM debts
+        WHERE file_id = :file_id AND id > :after_id
+        ORDER BY id
+        LIMIT :page_size
+    ) page
+    """
+)
+
+
+def _generate_boletos(candidate_filter: str):
+    """
+    Comando que gera os boletos das dívidas selecionadas por `candidate_filter`.
+
+    Um boleto por dívida: reprocessar as mesmas dívidas não gera boletos duplicados.
+    As dívidas são marcadas em `boleto_generated_at`, o que as tira do índice parcial
+    usado pelo agendador. O nosso número vem da sequência; valor e vencimento seguem
+    para o cálculo dos códigos. O boleto nasce `PENDING` e passa a `GENERATED` (ou
+    `GENERATION_FAILED`) quando os códigos são gravados.
+    """
+    return text(
+        f"""
+        WITH candidates AS (
+            SELECT id, user_id, debt_id FROM debts
+            WHERE boleto_generated_at IS NULL AND {candidate_filter}
+        ), marked AS (
+            UPDATE debts SET boleto_generated_at = now()
+            FROM candidates WHERE debts.id = candidates.id
+        ), inserted AS (
+            INSERT INTO boletos (user_id, debt_id, status)
+            SELECT user_id, debt_id, 'PENDING'
+            FROM candidates
+            ON CONFLICT (debt_id) DO NOTHING
+            RETURNING id, user_id, debt_id, our_number
+        )
+        SELECT inserted.id, inserted.user_id, inserted.debt_id, inserted.our_number,
+               debts.debt_amount, debts.debt_due_date, users.name AS user_name
+        FROM inserted
+        JOIN debts ON debts.debt_id = inserted.debt_id
+        JOIN users ON users.id = inserted.user_id
+        """
+    )
+
+
+def _undispatched_boletos(candidate_filter: str):
+    """
+    Consulta os boletos já gerados das dívidas selecionadas por `candidate_filter` cujos
+    documentos e notificações não chegaram a ser concluídos (`dispatched_at IS NULL`).
+
+    Cobre o job que morre (ou falha ao publicar) depois do commit da página: a reentrega
+    não gera os boletos de novo, mas os encontra aqui e conclui o envio.
+    """
+    return text(
+        f"""
+        WITH candidates AS (
+            SELECT debt_id, debt_amount, debt_due_date FROM debts
+            WHERE {candidate_filter}
+        )
+        SELECT boletos.id, boletos.user_id, boletos.debt_id, boletos.our_number,
+               boletos.barcode, boletos.digitable_line, boletos.document_digest,
+               candidates.debt_amount, candidates.debt_due_date, users.name AS user_name
+        FROM candidates
+        JOIN boletos ON boletos.debt_id = candidates.debt_id
+        JOIN users ON users.id = boletos.user_id
+        WHERE boletos.dispatched_at IS NULL AND boletos.status <> '{BoletoStatus.PENDING}'
+        """
+    )
+
+
+# Dívidas do arquivo que vencem antes de `generate_before`; as demais ficam para o agendador
+PAGE_FILTER = "file_id = :file_id AND id > :after_id AND id <= :last_id AND debt_due_date < :generate_before"
+DEBT_FILTER = "debt_id = :debt_id"
+DEBT_IDS_FILTER = "id = ANY(:debt_ids)"
+
+INSERT_PAGE = _generate_boletos(PAGE_FILTER)
+UNDISPATCHED_PAGE = _undispatched_boletos(PAGE_FILTER)
+
+INSERT_FOR_DEBT = _generate_boletos(DEBT_FILTER)
+UNDISPATCHED_FOR_DEBT = _undispatched_boletos(DEBT_FILTER)
+
+INSERT_FOR_DEBT_IDS = _generate_boletos(DEBT_IDS_FILTER).bindparams(bindparam("debt_ids", type_=ARRAY(Integer)))
+UNDISPATCHED_FOR_DEBT_IDS = _undispatched_boletos(DEBT_IDS_FILTER).bindparams(
+    bindparam("debt_ids", type_=ARRAY(Integer))
+)
+
+# Dívidas sem boleto que vencem antes de `due_before`, em ordem de vencimento (keyset).
+# Coberto pelo índice parcial ix_debts_pending_boleto_due_date.
+PENDING_DEBTS_PAGE = text(
+    """
+    SELECT id, debt_due_date FROM debts
+    WHERE boleto_generated_at IS NULL
+      AND debt_due_date < :due_before
+      AND (debt_due_date, id) > (:after_due_date, :after_id)
+    ORDER BY debt_due_date, id
+    LIMIT :page_size
+    """
+)
+
+UPDATE_CODES = text(
+    """
+    UPDATE boletos
+    SET barcode = codes.barcode, digitable_line = codes.digitable_line
+    FROM unnest(:ids, :barcodes, :digitable_lines) AS codes(id, barcode, digitable_line)
+    WHERE boletos.id = codes.id
+    """
+).bindparams(
+    bindparam("ids", type_=ARRAY(PG_UUID(as_uuid=True))),
+    bindparam("barcodes", type_=ARRAY(String)),
+    bindparam("digitable_lines", type_=ARRAY(String)),
+)
+
+UPDATE_DOCUMENTS = text(
+    """
+    UPDATE boletos
+    SET document_digest = documents.digest
+    FROM unnest(:ids, :digests) AS documents(id, digest)
+    WHERE boletos.id = documents.id
+    """
+).bindparams(
+    bindparam("ids", type_=ARRAY(PG_UUID(as_uuid=True))),
+    bindparam("digests", type_=ARRAY(String)),
+)
+
+MARK_DISPATCHED = text(
+    "UPDATE boletos SET dispatched_at = now() WHERE id = ANY(:ids) AND dispatched_at IS NULL"
+).bindparams(bindparam("ids", type_=ARRAY(PG_UUID(as_uuid=True))))
+
+# Transições permitidas, como tabela (origem, destino) para o JOIN do comando de transição
+_ALLOWED_TRANSITIONS = ", ".join(
+    f"('{source}', '{target}')" for target, sources in BOLETO_TRANSITIONS.items() for source in sources
+)
+
+# Transições de status em lote: uma linha por boleto, aplicada só se o estado atual for
+# uma origem permitida para o destino. Retorna os boletos que mudaram de estado.
+APPLY_TRANSITIONS = text(
+    f"""
+    UPDATE boletos
+    SET status = transitions.status,
+        generated_at = CASE WHEN transitions.status = '{BoletoStatus.GENERATED}'
+                            THEN transitions.occurred_at ELSE boletos.generated_at END,
+        notified_at = CASE WHEN transitions.status = '{BoletoStatus.NOTIFIED}'
+                           THEN transitions.occurred_at ELSE boletos.notified_at END
+    FROM unnest(:ids, :statuses, :occurred_at) AS transitions(id, status, occurred_at)
+    JOIN (VALUES {_ALLOWED_TRANSITIONS}) AS allowed(from_status, to_status)
+      ON allowed.to_status = transitions.status
+    WHERE boletos.id = transitions.id AND boletos.status = allowed.from_status
+    RETURNING boletos.id
+    """
+).bindparams(
+    bindparam("ids", type_=ARRAY(PG_UUID(as_uuid=True))),
+    bindparam("statuses", type_=ARRAY(String)),
+    bindparam("occurred_at", type_=ARRAY(TIMESTAMP)),
+)
+
+# Destinatários dos boletos que ainda podem ser notificados: gerados e ainda não notificados.
+# Reentregas não reenviam e-mails, e boletos sem código (`GENERATION_FAILED`) não são enviados.
+_NOTIFIABLE_STATUSES = ", ".join(f"'{status}'" for status in BOLETO_TRANSITIONS[BoletoStatus.NOTIFIED])
+
+NOTIFICATION_RECIPIENTS = text(
+    f"""
+    SELECT boletos.id, users.email, users.name
+    FROM boletos
+    JOIN users ON users.id = boletos.user_id
+    WHERE boletos.id = ANY(:ids) AND boletos.status IN ({_NOTIFIABLE_STATUSES})
+    """
+).bindparams(bindparam("ids", type_=ARRAY(PG_UUID(as_uuid=True))))
+
+
+class BoletoRepository:
+    def __init__(self, session):
+        self.session = session
+
+    async def next_page_boundary(self, file_id: UUID, after_id: int, page_size: int) -> Optional[int]:
+        """Retorna o maior `debts.id` da próxima página do arquivo, ou None se não houver mais dívidas."""
+        result = await self.session.execute(
+            NEXT_PAGE_BOUNDARY, {"file_id": file_id, "after_id": after_id, "page_size": page_size}
+        )
+        return result.scalar()
+
+    async def insert_page(
+        self, file_id: UUID, after_id: int, last_id: int, generate_before: datetime
+    ) -> List[dict]:
+        """Gera os boletos das dívidas do arquivo em (after_id, last_id] que vencem antes de `generate_before`."""
+        result = await self.session.execute(
+            INSERT_PAGE,
+            {"file_id": file_id, "after_id": after_id, "last_id": last_id, "generate_before": generate_before},
+        )
+        return [dict(row) for row in result.mappings()]
+
+    async def undispatched_page(
+        self, file_id: UUID, after_id: int, last_id: int, generate_before: datetime
+    ) -> List[dict]:
+        """Boletos já gerados da página do arquivo cujo envio não foi concluído (ver `insert_page`)."""
+        result = await self.session.execute(
+            UNDISPATCHED_PAGE,
+            {"file_id": file_id, "after_id": after_id, "last_id": last_id, "generate_before": generate_before},
+        )
+        return [dict(row) for row in result.mappings()]
+
+    async def insert_for_debt_ids(self, debt_ids: List[int]) -> List[dict]:
+        """Gera os boletos das dívidas informadas (`debts.id`) que ainda não têm boleto."""
+        result = await self.session.execute(INSERT_FOR_DEBT_IDS, {"debt_ids": debt_ids})
+        return [dict(row) for row in result.mappings()]
+
+    async def undispatched_for_debt_ids(self, debt_ids: List[int]) -> List[dict]:
+        """Boletos já gerados das dívidas informadas cujo envio não foi concluído."""
+        result = await self.session.execute(UNDISPATCHED_FOR_DEBT_IDS, {"debt_ids": debt_ids})
+        return [dict(row) for row in result.mappings()]
+
+    async def stream_pending_debts(
+        self, due_before: datetime, after: Tuple[datetime, int], page_size: int, fetch_size: int
+    ) -> AsyncIterator[Tuple[int, datetime]]:
+        """
+        Percorre uma página de dívidas sem boleto com um cursor no servidor.
+
+        Args:
+            due_before (datetime): Limite (exclusivo) de vencimento.
+            after (Tuple[datetime, int]): Vencimento e `id` da última dívida da página anterior.
+            page_size (int): Dívidas por página.
+            fetch_size (int): Linhas buscadas por ida ao servidor.
+
+        Yields:
+            Tuple[int, datetime]: `id` e vencimento de cada dívida.
+        """
+        result = await self.session.stream(
+            PENDING_DEBTS_PAGE.execution_options(yield_per=fetch_size),
+            {
+                "due_before": due_before,
+                "after_due_date": after[0],
+                "after_id": after[1],
+                "page_size": page_size,
+            },
+        )
+        async for debt_id, due_date in result:
+            yield debt_id, due_date
+
+    async def insert_for_debt(self, debt_id: UUID) -> List[dict]:
+        """Gera o boleto de uma única dívida."""
+        result = await self.session.execute(INSERT_FOR_DEBT, {"debt_id": debt_id})
+        return [dict(row) for row in result.mappings()]
+
+    async def undispatched_for_debt(self, debt_id: UUID) -> List[dict]:
+        """Boleto já gerado da dívida, se o seu envio não foi concluído."""
+        result = await self.session.execute(UNDISPATCHED_FOR_DEBT, {"debt_id": debt_id})
+        return [dict(row) for row in result.mappings()]
+
+    async def update_codes(self, ids: List[UUID], barcodes: List[str], digitable_lines: List[str]):
+        """Grava código de barras e linha digitável de vários boletos em um único comando."""
+        if not ids:
+            return
+        await self.session.execute(
+            UPDATE_CODES, {"ids": ids, "barcodes": barcodes, "digitable_lines": digitable_lines}
+        )
+
+    async def update_documents(self, ids: List[UUID], digests: List[str]):
+        """Grava o digest do PDF de vários boletos em um único comando."""
+        if not ids:
+            return
+        await self.session.execute(UPDATE_DOCUMENTS, {"ids": ids, "digests": digests})
+
+    async def mark_dispatched(self, ids: List[UUID]):
+        """Registra que documentos e notificações dos boletos foram concluídos."""
+        if not ids:
+            return
+        await self.session.execute(MARK_DISPATCHED, {"ids": ids})
+
+    async def apply_transitions(
+        self, ids: List[UUID], statuses: List[str], occurred_at: List[datetime]
+    ) -> List[UUID]:
+        """
+        Aplica transições de status a vários boletos em um único comando.
+
+        Cada boleto deve aparecer uma única vez. Transições não permitidas a partir do
+        estado atual (ex.: `NOTIFIED` de um boleto ainda `PENDING`, ou uma reentrega que
+        repete a mesma transição) são ignoradas.
+
+        Args:
+            ids (List[UUID]): IDs dos boletos.
+            statuses (List[str]): Estado de destino de cada boleto.
+            occurred_at (List[datetime]): Momento de cada transição.
+
+        Returns:
+            List[UUID]: Boletos que mudaram de estado.
+        """
+        if not ids:
+            return []
+        result = await self.session.execute(
+            APPLY_TRANSITIONS, {"ids": ids, "statuses": statuses, "occurred_at": occurred_at}
+        )
+        return list(result.scalars())
+
+    async def notification_recipients(self, ids: List[UUID]) -> Dict[UUID, Tuple[str, str]]:
+        """
+        Busca e-mail e nome do pagador dos boletos gerados que ainda não foram notificados.
+
+        Args:
+            ids (List[UUID]): IDs dos boletos.
+
+        Returns:
+            Dict[UUID, Tuple[str, str]]: E-mail e nome por boleto; boletos já notificados ou
+                com falha na geração ficam de fora.
+        """
+        if not ids:
+            return {}
+        result = await self.session.execute(NOTIFICATION_RECIPIENTS, {"ids": ids})
+        return {boleto_id: (email, name) for boleto_id, email, name in result}
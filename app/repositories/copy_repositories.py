@@ -0,0 +1,139 @@
+from datetime import date, datetime, time
+from decimal import Decimal
+from sqlalchemy import text
+from app.repositories.user_repository import UserRepository
+from app.repositories.debt_repository import DebtRepository
+
+
+# Tabelas temporárias de staging, criadas uma vez por conexão e esvaziadas no commit
+CREATE_STAGING_USERS = text(
+    """
+    CREATE TEMP TABLE IF NOT EXISTS staging_users (
+        id INTEGER,
+        name VARCHAR(255),
+        government_id INTEGER,
+        email VARCHAR(255)
+    ) ON COMMIT DELETE ROWS
+    """
+)
+
+CREATE_STAGING_DEBTS = text(
+    """
+    CREATE TEMP TABLE IF NOT EXISTS staging_debts (
+        file_id UUID,
+        user_id INTEGER,
+        debt_amount NUMERIC(10, 2),
+        debt_due_date TIMESTAMP,
+        debt_id UUID
+    ) ON COMMIT DELETE ROWS
+    """
+)
+
+# O merge consome o staging no mesmo comando, permitindo várias cargas na mesma transação
+MERGE_USERS = text(
+    """
+    WITH staged AS (DELETE FROM staging_users RETURNING id, name, government_id, email)
+    INSERT INTO users (id, name, government_id, email)
+    SELECT id, name, government_id, email FROM staged
+    ON CONFLICT (government_id) DO NOTHING
+    """
+)
+
+MERGE_DEBTS = text(
+    """
+    WITH staged AS (
+        DELETE FROM staging_debts RETURNING file_id, user_id, debt_amount, debt_due_date, debt_id
+    )
+    INSERT INTO debts (file_id, user_id, debt_amount, debt_due_date, debt_id)
+    SELECT file_id, user_id, debt_amount, debt_due_date, debt_id FROM staged
+    ON CONFLICT (debt_id) DO NOTHING
+    """
+)
+
+USER_COLUMNS = ("id", "name", "government_id", "email")
+DEBT_COLUMNS = ("file_id", "user_id", "debt_amount", "debt_due_date", "debt_id")
+
+
+async def get_driver_connection(session):
+    """
+    Retorna a conexão asyncpg subjacente à sessão, na mesma transação da sessão.
+
+    Args:
+        session (AsyncSession): Sessão com transação já iniciada.
+
+    Returns:
+        asyncpg.Connection: Conexão nativa do asyncpg.
+    """
+    connection = await session.connection()
+    raw_connection = await connection.get_raw_connection()
+    return raw_connection.driver_connection
+
+
+def _to_timestamp(value):
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime.combine(value, time())
+    return value
+
+
+def _to_numeric(value):
+    if isinstance(value, Decimal):
+        return value
+    return Decimal(str(value))
+
+
+class CopyUserRepository(UserRepository):
+    """
+    Variante do UserRepository que carrega usuários via COPY binário do asyncpg
+    em uma tabela temporária e faz o merge com um único INSERT ... SELECT.
+    """
+
+    async def insert_users(self, users):
+        """Insere usuários em lote via COPY + merge."""
+        if not users:
+            return
+
+        # O primeiro comando pela sessão garante que a transação já foi aberta no asyncpg
+        await self.session.execute(CREATE_STAGING_USERS)
+
+        driver_connection = await get_driver_connection(self.session)
+        await driver_connection.copy_records_to_table(
+            "staging_users",
+            records=[tuple(user[column] for column in USER_COLUMNS) for user in users],
+            columns=USER_COLUMNS,
+        )
+
+        await self.session.execute(MERGE_USERS)
+
+
+class CopyDebtRepository(DebtRepository):
+    """
+    Variante do DebtRepository que carrega dívidas via COPY binário do asyncpg
+    em uma tabela temporária e faz o merge com um único INSERT ... SELECT.
+    """
+
+    async def insert_debts(self, debts):
+        """Insere dívidas em lote via COPY + merge."""
+        if not debts:
+            return
+
+        await self.session.execute(CREATE_STAGING_DEBTS)
+
+        driver_connection = await get_driver_connection(self.session)
+        await driver_connection.copy_records_to_table(
+            "staging_debts",
+            records=[
+                (
+                    debt["file_id"],
+                    debt["user_id"],
+                    _to_numeric(debt["debt_amount"]),
+                    _to_timestamp(debt["debt_due_date"]),
+                    debt["debt_id"],
+                )
+                for debt in debts
+            ],
+            columns=DEBT_COLUMNS,
+        )
+
+        await self.session.execute(MERGE_DEBTS)
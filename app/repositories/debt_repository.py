@@ -1,5 +1,6 @@
 from app.models.debts import Debt
 from sqlalchemy.dialects.postgresql import insert
+from app.repositories.batching import statement_batches
 
 
 class DebtRepository:
@@ -11,11 +12,13 @@ class DebtRepository:
         if not debts:
             return
 
-        # Use o insert do dialect PostgreSQL
-        stmt = insert(Debt).values(debts)
+        # Lotes grandes são divididos para respeitar o limite de parâmetros por comando
+        for batch in statement_batches(debts):
+            # Use o insert do dialect PostgreSQL
+            stmt = insert(Debt).values(batch)
 
-        # Adicione a cláusula ON CONFLICT DO NOTHING
-        stmt = stmt.on_conflict_do_nothing(index_elements=["debt_id"])
+            # Adicione a cláusula ON CONFLICT DO NOTHING
+            stmt = stmt.on_conflict_do_nothing(index_elements=["debt_id"])
 
-        # Execute a query
-        await self.session.execute(stmt)
+            # Execute a query
+            await self.session.execute(stmt)
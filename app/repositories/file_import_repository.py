@@ -0,0 +1,105 @@
+from typing import List, NamedTuple, Optional
+from uuid import UUID
+
+from sqlalchemy import String, bindparam, text
+from sqlalchemy.dialects.postgresql import ARRAY
+
+# Uma nova divisão do arquivo recomeça o progresso: as chaves dos chunks podem mudar
+# (ex.: outro tamanho de chunk), e as da divisão anterior seriam contadas em dobro.
+START_IMPORT = text(
+    """
+    WITH cleared AS (
+        DELETE FROM file_import_chunks WHERE file_id = :file_id
+    )
+    INSERT INTO file_imports (file_id, status)
+    VALUES (:file_id, 'INGESTING')
+    ON CONFLICT (file_id) DO UPDATE
+    SET status = 'INGESTING', total_chunks = NULL, committed_chunks = 0,
+        completed_at = NULL, boletos_requested_at = NULL
+    """
+)
+
+# Definido o total, o arquivo conclui se todos os chunks já foram gravados
+FINISH_SPLIT = text(
+    """
+    UPDATE file_imports
+    SET total_chunks = :total_chunks,
+        status = CASE WHEN committed_chunks >= :total_chunks THEN 'COMPLETED' ELSE status END,
+        completed_at = CASE WHEN committed_chunks >= :total_chunks THEN now() ELSE completed_at END
+    WHERE file_id = :file_id
+    RETURNING status, 0 AS new_chunks, boletos_requested_at IS NULL AS boletos_pending
+    """
+)
+
+# Registra os chunks gravados (ignorando reentregas) e atualiza o contador na mesma transação.
+# O UPDATE bloqueia a linha do arquivo até o commit, o que serializa a detecção da conclusão.
+RECORD_CHUNKS = text(
+    """
+    WITH new_chunks AS (
+        INSERT INTO file_import_chunks (file_id, chunk_key)
+        SELECT :file_id, unnest(:chunk_keys)
+        ON CONFLICT DO NOTHING
+        RETURNING 1
+    ), counted AS (
+        SELECT count(*) AS new_chunks FROM new_chunks
+    )
+    UPDATE file_imports
+    SET committed_chunks = committed_chunks + counted.new_chunks,
+        status = CASE
+            WHEN total_chunks IS NOT NULL AND committed_chunks + counted.new_chunks >= total_chunks
+            THEN 'COMPLETED' ELSE status END,
+        completed_at = CASE
+            WHEN completed_at IS NULL AND total_chunks IS NOT NULL
+                 AND committed_chunks + counted.new_chunks >= total_chunks
+            THEN now() ELSE completed_at END
+    FROM counted
+    WHERE file_id = :file_id
+    RETURNING status, counted.new_chunks, boletos_requested_at IS NULL AS boletos_pending
+    """
+).bindparams(bindparam("chunk_keys", type_=ARRAY(String)))
+
+MARK_BOLETOS_REQUESTED = text(
+    "UPDATE file_imports SET boletos_requested_at = now() WHERE file_id = :file_id"
+)
+
+
+class FileImportProgress(NamedTuple):
+    """
+    Resultado de uma atualização do progresso de importação.
+    """
+
+    file_id: UUID
+    completed: bool
+    needs_boletos: bool  # a geração de boletos deve ser (re)disparada
+
+
+def _progress(file_id: UUID, row) -> Optional[FileImportProgress]:
+    if row is None:
+        return None
+    status, new_chunks, boletos_pending = row
+    completed = status == "COMPLETED"
+    # Chunks gravados depois da conclusão (ex.: nova divisão do arquivo) pedem uma nova geração
+    return FileImportProgress(file_id, completed, completed and (boletos_pending or new_chunks > 0))
+
+
+class FileImportRepository:
+    def __init__(self, session):
+        self.session = session
+
+    async def start(self, file_id: UUID):
+        """Registra a importação de um arquivo, ou a reinicia do zero se o arquivo for dividido de novo."""
+        await self.session.execute(START_IMPORT, {"file_id": file_id})
+
+    async def finish_split(self, file_id: UUID, total_chunks: int) -> Optional[FileImportProgress]:
+        """Registra o total de chunks gerados para o arquivo."""
+        result = await self.session.execute(FINISH_SPLIT, {"file_id": file_id, "total_chunks": total_chunks})
+        return _progress(file_id, result.first())
+
+    async def record_chunks(self, file_id: UUID, chunk_keys: List[str]) -> Optional[FileImportProgress]:
+        """Registra chunks gravados do arquivo; retorna None se o arquivo não estiver sendo acompanhado."""
+        result = await self.session.execute(RECORD_CHUNKS, {"file_id": file_id, "chunk_keys": chunk_keys})
+        return _progress(file_id, result.first())
+
+    async def mark_boletos_requested(self, file_id: UUID):
+        """Registra que a geração de boletos do arquivo foi publicada."""
+        await self.session.execute(MARK_BOLETOS_REQUESTED, {"file_id": file_id})
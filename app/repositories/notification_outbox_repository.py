@@ -0,0 +1,101 @@
+from typing import List
+from uuid import UUID
+
+from sqlalchemy import Integer, String, bindparam, text
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
+
+ENQUEUE = text(
+    """
+    INSERT INTO notification_outbox (user_id, boleto_id, digitable_line, document_digest)
+    SELECT * FROM unnest(:user_ids, :boleto_ids, :digitable_lines, :document_digests)
+    ON CONFLICT (boleto_id) DO NOTHING
+    """
+).bindparams(
+    bindparam("user_ids", type_=ARRAY(Integer)),
+    bindparam("boleto_ids", type_=ARRAY(PG_UUID(as_uuid=True))),
+    bindparam("digitable_lines", type_=ARRAY(String)),
+    bindparam("document_digests", type_=ARRAY(String)),
+)
+
+# Usuários prontos (janela vencida ou limite de boletos atingido), os mais antigos primeiro.
+# As linhas são travadas com SKIP LOCKED e recebem um lease, então vários workers podem
+# enviar ao mesmo tempo sem repetir usuários.
+CLAIM_READY = text(
+    """
+    WITH ready AS (
+        SELECT user_id FROM notification_outbox
+        WHERE claimed_until IS NULL OR claimed_until < now()
+        GROUP BY user_id
+        HAVING min(created_at) <= now() - make_interval(secs => :window_seconds)
+            OR count(*) >= :max_boletos
+        ORDER BY min(created_at)
+        LIMIT :max_users
+    ), claimed AS (
+        SELECT outbox.id FROM notification_outbox outbox
+        JOIN ready ON ready.user_id = outbox.user_id
+        WHERE outbox.claimed_until IS NULL OR outbox.claimed_until < now()
+        FOR UPDATE OF outbox SKIP LOCKED
+    )
+    UPDATE notification_outbox
+    SET claimed_until = now() + make_interval(secs => :lease_seconds)
+    FROM claimed
+    WHERE notification_outbox.id = claimed.id
+    RETURNING notification_outbox.id, notification_outbox.user_id, notification_outbox.boleto_id,
+              notification_outbox.digitable_line, notification_outbox.document_digest
+    """
+)
+
+DELETE = text("DELETE FROM notification_outbox WHERE boleto_id = ANY(:boleto_ids)").bindparams(
+    bindparam("boleto_ids", type_=ARRAY(PG_UUID(as_uuid=True)))
+)
+
+
+class NotificationOutboxRepository:
+    def __init__(self, session):
+        self.session = session
+
+    async def enqueue(self, boletos: List[dict]):
+        """Adiciona boletos à caixa de saída em um único comando; boletos já presentes são ignorados."""
+        if not boletos:
+            return
+        await self.session.execute(
+            ENQUEUE,
+            {
+                "user_ids": [int(boleto["user_id"]) for boleto in boletos],
+                "boleto_ids": [UUID(str(boleto["boleto_id"])) for boleto in boletos],
+                "digitable_lines": [boleto.get("digitable_line") for boleto in boletos],
+                "document_digests": [boleto.get("document_digest") for boleto in boletos],
+            },
+        )
+
+    async def claim_ready(
+        self, window_seconds: float, max_boletos: int, max_users: int, lease_seconds: float
+    ) -> List[dict]:
+        """
+        Reserva os boletos dos usuários prontos para a notificação agrupada.
+
+        Args:
+            window_seconds (float): Espera máxima desde o boleto mais antigo do usuário.
+            max_boletos (int): Boletos acumulados que liberam o usuário antes da janela.
+            max_users (int): Usuários por reserva.
+            lease_seconds (float): Duração da reserva.
+
+        Returns:
+            List[dict]: Boletos reservados, com `user_id`, `boleto_id`, `digitable_line` e `document_digest`.
+        """
+        result = await self.session.execute(
+            CLAIM_READY,
+            {
+                "window_seconds": window_seconds,
+                "max_boletos": max_boletos,
+                "max_users": max_users,
+                "lease_seconds": lease_seconds,
+            },
+        )
+        return [dict(row) for row in result.mappings()]
+
+    async def delete(self, boleto_ids: List[UUID]):
+        """Remove da caixa de saída os boletos já tratados."""
+        if not boleto_ids:
+            return
+        await self.session.execute(DELETE, {"boleto_ids": boleto_ids})
@@ -2,6 +2,7 @@ from sqlalchemy import select
 from app.models.users import User
 from typing import List
 from sqlalchemy.dialects.postgresql import insert
+from app.repositories.batching import statement_batches
 
 
 class UserRepository:
@@ -14,16 +15,24 @@ class UserRepository:
         result = await self.session.execute(query)
         return {row[0] for row in result}
 
+    async def get_recent_government_ids(self, limit: int) -> List[int]:
+        """Retorna os `government_id` dos usuários mais recentes."""
+        query = select(User.government_id).order_by(User.created_at.desc()).limit(limit)
+        result = await self.session.execute(query)
+        return list(result.scalars())
+
     async def insert_users(self, users):
         """Insere usuários em lote."""
         if not users:
             return
 
-        # Use o insert do dialect PostgreSQL
-        stmt = insert(User).values(users)
+        # Lotes grandes são divididos para respeitar o limite de parâmetros por comando
+        for batch in statement_batches(users):
+            # Use o insert do dialect PostgreSQL
+            stmt = insert(User).values(batch)
 
-        # Adicione a cláusula ON CONFLICT DO NOTHING
-        stmt = stmt.on_conflict_do_nothing(index_elements=["government_id"])
+            # Adicione a cláusula ON CONFLICT DO NOTHING
+            stmt = stmt.on_conflict_do_nothing(index_elements=["government_id"])
 
-        # Execute a query
-        await self.session.execute(stmt)
+            # Execute a query
+            await self.session.execute(stmt)
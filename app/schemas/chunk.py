@@ -1,7 +1,7 @@
 from pydantic import BaseModel, EmailStr
 from datetime import date
 from uuid import UUID
-from typing import List
+from typing import List, NamedTuple, Optional
 
 
 class ChunkRow(BaseModel):
@@ -16,3 +16,73 @@ class ChunkRow(BaseModel):
 class ChunkMessage(BaseModel):
     file_id: UUID
     chunk: List[ChunkRow]
+
+
+class ChunkEnvelope(BaseModel):
+    """
+    Envelope de mensagens de chunk legadas ou não confiáveis. As linhas não são
+    validadas aqui: o ChunkProcessingService valida cada linha uma única vez.
+    """
+
+    file_id: UUID
+    chunk: List[dict]
+
+
+# Versão do contrato de chunk confiável, gerado pelo nosso próprio splitter
+TRUSTED_CHUNK_SCHEMA_VERSION = 1
+
+# Ordem das colunas de cada linha de um chunk confiável
+TRUSTED_CHUNK_COLUMNS = ("name", "governmentId", "email", "debtAmount", "debtDueDate", "debtId")
+
+
+class IngestRow(NamedTuple):
+    """
+    Linha já validada, pronta para ser mapeada em usuários e dívidas.
+    """
+
+    name: str
+    government_id: int
+    email: str
+    debt_amount: float
+    debt_due_date: date
+    debt_id: UUID
+
+
+
+class PreparedChunk(NamedTuple):
+    """
+    Chunk pronto para gravação: linhas validadas e a chave que identifica o chunk
+    no acompanhamento da importação do arquivo (igual em reentregas).
+    """
+
+    file_id: UUID
+    rows: List[IngestRow]
+    chunk_key: Optional[str] = None
+
+class ChunkSlice(NamedTuple):
+    """
+    Intervalo de bytes de um chunk no arquivo original, alinhado a registros do CSV.
+    """
+
+    offset: int
+    length: int
+    first_row: int  # número da primeira linha do chunk (base 1, sem o cabeçalho)
+    row_count: int
+
+
+# Marcador das mensagens de chunk no modo claim-check
+CLAIM_CHECK_TRANSPORT = "claim_check"
+
+
+class ChunkClaimCheck(BaseModel):
+    """
+    Mensagem de chunk no modo claim-check: referencia um intervalo do arquivo no
+    spool em vez de carregar as linhas.
+    """
+
+    file_id: UUID
+    offset: int
+    length: int
+    first_row: int
+    row_count: int
+    columns: List[str]
@@ -0,0 +1,101 @@
+import threading
+from typing import Optional
+
+from loguru import logger
+
+from app.config import settings
+from app.core.metrics import CHUNK_SIZE_TARGET_ROWS
+
+
+class AdaptiveChunkSizer:
+    """
+    Controlador do tamanho dos chunks a partir da latência medida na ingestão.
+
+    Cada transação concluída pelo ChunkProcessingService informa quantas linhas
+    gravou e quanto tempo levou. O custo por linha é suavizado por média móvel
+    exponencial e o próximo chunk recebe o tamanho que, nesse custo, leva
+    `target_seconds` para ser gravado. A variação por ajuste é limitada por
+    `max_step` e o resultado fica sempre entre `min_size` e `max_size`.
+
+    É thread-safe: o tamanho é lido pela thread que divide o arquivo e atualizado
+    pelos consumidores de chunks no event loop.
+
+    O estado fica na memória do processo: o consumidor de arquivos só recebe
+    medições se os consumidores de chunks rodarem no mesmo processo (o `app.worker`
+    exige isso). Como o broker distribui os chunks entre todos os consumidores, a
+    amostra de cada processo representa a latência de ingestão do conjunto.
+    """
+
+    def __init__(
+        self,
+        initial_size: int = settings.CHUNK_SIZE_INITIAL,
+        min_size: int = settings.CHUNK_SIZE_MIN,
+        max_size: int = settings.CHUNK_SIZE_MAX,
+        target_seconds: float = settings.CHUNK_TARGET_SECONDS,
+        smoothing: float = settings.CHUNK_SIZE_SMOOTHING,
+        max_step: float = settings.CHUNK_SIZE_MAX_STEP,
+    ):
+        if min_size < 1 or max_size < min_size:
+            raise ValueError(f"Invalid chunk size bounds: min={min_size}, max={max_size}.")
+        if target_seconds <= 0:
+            raise ValueError("target_seconds must be positive.")
+        if not 0 < smoothing <= 1:
+            raise ValueError("smoothing must be in (0, 1].")
+        if max_step < 1:
+            raise ValueError("max_step must be at least 1.")
+
+        self.min_size = min_size
+        self.max_size = max_size
+        self.target_seconds = target_seconds
+        self.smoothing = smoothing
+        self.max_step = max_step
+        self._size = self._clamp(initial_size)
+        self._seconds_per_row: Optional[float] = None
+        self._lock = threading.Lock()
+        CHUNK_SIZE_TARGET_ROWS.set(self._size)
+
+    def _clamp(self, size: float) -> int:
+        return int(min(self.max_size, max(self.min_size, size)))
+
+    def current_size(self) -> int:
+        """
+        Tamanho a ser usado no próximo chunk.
+
+        Returns:
+            int: Número de linhas.
+        """
+        with self._lock:
+            return self._size
+
+    def record(self, rows: int, seconds: float):
+        """
+        Registra o resultado de uma transação de ingestão e recalcula o tamanho.
+
+        Args:
+            rows (int): Linhas gravadas na transação.
+            seconds (float): Duração da transação, em segundos.
+        """
+        if rows <= 0 or seconds <= 0:
+            return
+
+        with self._lock:
+            sample = seconds / rows
+            if self._seconds_per_row is None:
+                self._seconds_per_row = sample
+            else:
+                self._seconds_per_row += self.smoothing * (sample - self._seconds_per_row)
+
+            ideal = self.target_seconds / self._seconds_per_row
+            bounded = min(self._size * self.max_step, max(self._size / self.max_step, ideal))
+            previous, self._size = self._size, self._clamp(bounded)
+
+        if self._size != previous:
+            CHUNK_SIZE_TARGET_ROWS.set(self._size)
+            logger.debug(
+                f"Chunk size adjusted from {previous} to {self._size} rows "
+                f"({rows} rows committed in {seconds:.3f}s)."
+            )
+
+
+# Controlador compartilhado entre o consumidor de arquivos e os consumidores de chunks do processo
+chunk_sizer = AdaptiveChunkSizer()
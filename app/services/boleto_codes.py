@@ -0,0 +1,256 @@
+from datetime import date
+from typing import List, NamedTuple, Sequence
+
+import numpy as np
+
+# Fator de vencimento FEBRABAN: dias desde 07/10/1997. Ao atingir 9999 (21/02/2025)
+# o fator volta para 1000, e o ciclo se repete a cada 9000 dias.
+DUE_FACTOR_BASE_DATE = np.datetime64("1997-10-07", "D")
+DUE_FACTOR_MIN = 1000
+DUE_FACTOR_CYCLE = 9000
+
+CURRENCY_CODE = 9  # Real
+MAX_AMOUNT_CENTS = 10**10 - 1  # 10 dígitos no código de barras
+MAX_OUR_NUMBER = 10**11 - 1  # 11 dígitos no campo livre do Bradesco
+
+# Pesos precomputados, aplicados da direita para a esquerda
+MOD11_BARCODE_WEIGHTS = np.array([2 + i % 8 for i in range(43)][::-1], dtype=np.int64)  # 2..9
+MOD11_OUR_NUMBER_WEIGHTS = np.array([2 + i % 6 for i in range(13)][::-1], dtype=np.int64)  # 2..7
+
+# Módulo 10: produto de cada dígito pelo peso 2 ou 1, somando os algarismos do produto
+MOD10_TABLE = np.array(
+    [[(d * w) // 10 + (d * w) % 10 for d in range(10)] for w in (1, 2)], dtype=np.int64
+)
+
+# Posições do código de barras que compõem os três primeiros campos da linha digitável
+LINE_FIELD_1 = np.array([0, 1, 2, 3, 19, 20, 21, 22, 23])
+LINE_FIELD_2 = np.arange(24, 34)
+LINE_FIELD_3 = np.arange(34, 44)
+LINE_FIELD_5 = np.arange(5, 19)  # fator de vencimento + valor
+
+# "AAAAA.AAAAA BBBBB.BBBBBB CCCCC.CCCCCC D EEEEEEEEEEEEEE"
+LINE_TEMPLATE = np.frombuffer(b"00000.00000 00000.000000 00000.000000 0 00000000000000", dtype=np.uint8)
+LINE_DIGIT_POSITIONS = np.flatnonzero(LINE_TEMPLATE == ord("0"))
+
+
+class BoletoCodes(NamedTuple):
+    """
+    Códigos calculados para um lote de boletos, na ordem da entrada.
+    """
+
+    barcodes: List[str]  # 44 dígitos
+    digitable_lines: List[str]  # 47 dígitos formatados
+    our_numbers: List[str]  # carteira/nosso número-DV, como impresso no boleto
+
+
+def due_date_factors(due_dates) -> np.ndarray:
+    """
+    Calcula o fator de vencimento de cada data.
+
+    Args:
+        due_dates: Datas de vencimento (qualquer sequência conversível para datetime64).
+
+    Returns:
+        np.ndarray: Fatores de 4 dígitos.
+
+    Raises:
+        ValueError: Se alguma data for anterior a 03/07/2000 (fator 1000).
+    """
+    days = (np.asarray(due_dates, dtype="datetime64[D]") - DUE_FACTOR_BASE_DATE).astype(np.int64)
+    if (days < DUE_FACTOR_MIN).any():
+        raise ValueError("Due dates before 2000-07-03 have no due-date factor.")
+    return (days - DUE_FACTOR_MIN) % DUE_FACTOR_CYCLE + DUE_FACTOR_MIN
+
+
+def due_dates_in_range(due_dates) -> np.ndarray:
+    """Máscara das datas que têm fator de vencimento."""
+    days = (np.asarray(due_dates, dtype="datetime64[D]") - DUE_FACTOR_BASE_DATE).astype(np.int64)
+    return days >= DUE_FACTOR_MIN
+
+
+def amounts_to_cents(amounts) -> np.ndarray:
+    """Converte valores monetários (Decimal/float) para centavos."""
+    return np.rint(np.asarray(amounts, dtype=np.float64) * 100).astype(np.int64)
+
+
+def amounts_in_range(cents: np.ndarray) -> np.ndarray:
+    """Máscara dos valores representáveis no código de barras."""
+    return (cents >= 0) & (cents <= MAX_AMOUNT_CENTS)
+
+
+def _digits(values: np.ndarray, width: int) -> np.ndarray:
+    """Matriz (n, width) com os dígitos decimais de cada valor."""
+    powers = 10 ** np.arange(width - 1, -1, -1, dtype=np.int64)
+    return (np.asarray(values, dtype=np.int64)[:, None] // powers) % 10
+
+
+def _constant_digits(value: str, rows: int) -> np.ndarray:
+    return np.broadcast_to(np.frombuffer(value.encode(), dtype=np.uint8) - ord("0"), (rows, len(value)))
+
+
+def _mod10(digits: np.ndarray) -> np.ndarray:
+    """Dígito verificador módulo 10 de cada linha da matriz."""
+    width = digits.shape[1]
+    # Peso 2 no dígito mais à direita, alternando com 1
+    weight_index = (np.arange(width)[::-1] % 2 == 0).astype(np.int64)
+    total = MOD10_TABLE[weight_index, digits].sum(axis=1)
+    return (10 - total % 10) % 10
+
+
+def _mod11_barcode(digits: np.ndarray) -> np.ndarray:
+    """Dígito verificador geral do código de barras (módulo 11, pesos 2 a 9)."""
+    check = 11 - (digits @ MOD11_BARCODE_WEIGHTS) % 11
+    return np.where((check == 0) | (check >= 10), 1, check)
+
+
+def _mod11_our_number(digits: np.ndarray) -> np.ndarray:
+    """Dígito do nosso número do Bradesco (módulo 11, pesos 2 a 7); 10 representa "P"."""
+    remainder = (digits @ MOD11_OUR_NUMBER_WEIGHTS) % 11
+    return np.where(remainder == 0, 0, 11 - remainder)
+
+
+def _as_strings(matrix: np.ndarray) -> List[str]:
+    rows, width = matrix.shape
+    data = np.ascontiguousarray(matrix, dtype=np.uint8).tobytes().decode("ascii")
+    return [data[i:i + width] for i in range(0, rows * width, width)]
+
+
+class BoletoCodeEngine:
+    """
+    Calcula código de barras, linha digitável e nosso número de lotes de boletos
+    (layout FEBRABAN, campo livre da carteira Bradesco), com operações vetorizadas
+    do numpy sobre matrizes de dígitos.
+
+    Campo livre (25 dígitos): agência (4), carteira (2), nosso número (11), conta (7) e "0".
+    """
+
+    def __init__(self, bank_code: str, agency: str, wallet: str, account: str):
+        for name, value, width in (
+            ("bank_code", bank_code, 3),
+            ("agency", agency, 4),
+            ("wallet", wallet, 2),
+            ("account", account, 7),
+        ):
+            if len(value) != width or not value.isdigit():
+                raise ValueError(f"Invalid {name} '{value}': expected {width} digits.")
+        self.bank_code = bank_code
+        self.agency = agency
+        self.wallet = wallet
+        self.account = account
+
+    def compute(self, amounts_cents, due_factors, our_numbers) -> BoletoCodes:
+        """
+        Calcula os códigos de um lote.
+
+        Args:
+            amounts_cents: Valores em centavos.
+            due_factors: Fatores de vencimento (ver `due_date_factors`).
+            our_numbers: Nossos números (sequência do banco), sem dígito verificador.
+
+        Returns:
+            BoletoCodes: Códigos de cada boleto, na ordem da entrada.
+
+        Raises:
+            ValueError: Se algum valor não couber no layout.
+        """
+        cents = np.asarray(amounts_cents, dtype=np.int64)
+        factors = np.asarray(due_factors, dtype=np.int64)
+        numbers = np.asarray(our_numbers, dtype=np.int64)
+        rows = len(cents)
+        if not (len(factors) == len(numbers) == rows):
+            raise ValueError("amounts_cents, due_factors and our_numbers must have the same length.")
+        if not amounts_in_range(cents).all():
+            raise ValueError(f"Amounts must be between 0 and {MAX_AMOUNT_CENTS} cents.")
+        if ((factors < DUE_FACTOR_MIN) | (factors > 9999)).any():
+            raise ValueError("Due-date factors must have 4 digits.")
+        if ((numbers < 0) | (numbers > MAX_OUR_NUMBER)).any():
+            raise ValueError(f"Our numbers must be between 0 and {MAX_OUR_NUMBER}.")
+
+        wallet_digits = _constant_digits(self.wallet, rows)
+        our_number_digits = _digits(numbers, 11)
+
+        # Código de barras sem o DV geral (43 dígitos)
+        barcode = np.hstack(
+            [
+                _constant_digits(self.bank_code, rows),
+                np.full((rows, 1), CURRENCY_CODE, dtype=np.int64),
+                _digits(factors, 4),
+                _digits(cents, 10),
+                _constant_digits(self.agency, rows),
+                wallet_digits,
+                our_number_digits,
+                _constant_digits(self.account, rows),
+                np.zeros((rows, 1), dtype=np.int64),
+            ]
+        ).astype(np.int64)
+        barcode = np.insert(barcode, 4, _mod11_barcode(barcode), axis=1)
+
+        field_1 = barcode[:, LINE_FIELD_1]
+        field_2 = barcode[:, LINE_FIELD_2]
+        field_3 = barcode[:, LINE_FIELD_3]
+        line_digits = np.hstack(
+            [
+                field_1, _mod10(field_1)[:, None],
+                field_2, _mod10(field_2)[:, None],
+                field_3, _mod10(field_3)[:, None],
+                barcode[:, 4:5],
+                barcode[:, LINE_FIELD_5],
+            ]
+        )
+        lines = np.tile(LINE_TEMPLATE, (rows, 1))
+        lines[:, LINE_DIGIT_POSITIONS] = line_digits + ord("0")
+
+        our_number_checks = _mod11_our_number(np.hstack([wallet_digits, our_number_digits]))
+        our_number_prefix = _as_strings(np.hstack([wallet_digits, our_number_digits]) + ord("0"))
+
+        return BoletoCodes(
+            barcodes=_as_strings(barcode + ord("0")),
+            digitable_lines=_as_strings(lines),
+            our_numbers=[
+                f"{prefix[:2]}/{prefix[2:]}-{'P' if check == 10 else check}"
+                for prefix, check in zip(our_number_prefix, our_number_checks.tolist())
+            ],
+        )
+
+
+def reference_codes(
+    bank_code: str, agency: str, wallet: str, account: str, amount_cents: int, due_date: date, our_number: int
+) -> Sequence[str]:
+    """
+    Implementação linha a linha das mesmas regras, usada como referência nos testes e no benchmark.
+
+    Returns:
+        Sequence[str]: Código de barras, linha digitável e nosso número.
+    """
+    days = (due_date - date(1997, 10, 7)).days
+    factor = (days - DUE_FACTOR_MIN) % DUE_FACTOR_CYCLE + DUE_FACTOR_MIN
+    free_field = f"{agency}{wallet}{our_number:011d}{account}0"
+    partial = f"{bank_code}{CURRENCY_CODE}{factor:04d}{amount_cents:010d}{free_field}"
+
+    total = sum(int(digit) * (2 + i % 8) for i, digit in enumerate(reversed(partial)))
+    check = 11 - total % 11
+    check = 1 if check in (0, 10, 11) else check
+    barcode = f"{partial[:4]}{check}{partial[4:]}"
+
+    def mod10(digits: str) -> int:
+        total = 0
+        for i, digit in enumerate(reversed(digits)):
+            product = int(digit) * (2 if i % 2 == 0 else 1)
+            total += product // 10 + product % 10
+        return (10 - total % 10) % 10
+
+    field_1 = barcode[0:4] + barcode[19:24]
+    field_2 = barcode[24:34]
+    field_3 = barcode[34:44]
+    field_1 += str(mod10(field_1))
+    field_2 += str(mod10(field_2))
+    field_3 += str(mod10(field_3))
+    line = (
+        f"{field_1[:5]}.{field_1[5:]} {field_2[:5]}.{field_2[5:]} "
+        f"{field_3[:5]}.{field_3[5:]} {barcode[4]} {barcode[5:19]}"
+    )
+
+    our_number_digits = f"{wallet}{our_number:011d}"
+    remainder = sum(int(digit) * (2 + i % 6) for i, digit in enumerate(reversed(our_number_digits))) % 11
+    our_number_check = "0" if remainder == 0 else ("P" if remainder == 1 else str(11 - remainder))
+    return barcode, line, f"{wallet}/{our_number:011d}-{our_number_check}"
@@ -0,0 +1,212 @@
+import zlib
+from typing import Dict, List, NamedTuple, Tuple
+
+# Larguras (1/1000 em) dos caracteres ASCII 32..126 da Helvetica, uma das fontes padrão do PDF
+HELVETICA_WIDTHS = (
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+)
+DEFAULT_WIDTH = 556
+
+# Intercalado 2 de 5: barras estreitas (n) e largas (w) de cada dígito
+I2OF5_PATTERNS = (
+    "nnwwn", "wnnnw", "nwnnw", "wwnnn", "nnwnw", "wnwnn", "nwwnn", "nnnww", "wnnwn", "nwnwn",
+)
+# Dimensões FEBRABAN: 44 dígitos em ~103 mm, barras largas com 3x a estreita, 13 mm de altura
+BAR_NARROW = 0.72
+BAR_WIDE = 2.16
+BAR_HEIGHT = 36.85
+
+PAGE_WIDTH = 595
+PAGE_HEIGHT = 842
+MARGIN = 36
+
+# Campos do boleto: (rótulo, chave do documento, x, y, largura, alinhado à direita)
+FIELDS = (
+    ("Beneficiário", "beneficiary", MARGIN, 700, 383, False),
+    ("Vencimento", "due_date", MARGIN + 383, 700, 140, True),
+    ("Agência / Código do Beneficiário", "agency_account", MARGIN, 672, 383, False),
+    ("Nosso Número", "our_number", MARGIN + 383, 672, 140, True),
+    ("Número do Documento", "document_number", MARGIN, 644, 383, False),
+    ("Valor do Documento", "amount", MARGIN + 383, 644, 140, True),
+    ("Pagador", "payer", MARGIN, 616, 523, False),
+)
+FIELD_HEIGHT = 28
+
+
+class BoletoTemplate(NamedTuple):
+    """
+    Partes do PDF que não mudam entre boletos, montadas uma vez por processo.
+    """
+
+    header: bytes  # cabeçalho e objetos fixos (catálogo, páginas, página e fontes)
+    offsets: Tuple[int, ...]  # posição de cada objeto fixo
+    static_content: str  # molduras, rótulos e dados do beneficiário
+    pair_bars: Tuple[Tuple[Tuple[bool, float], ...], ...]  # barras de cada par de dígitos (00..99)
+    widths: Dict[str, int]
+
+
+# Templates já montados neste processo (um por beneficiário)
+_worker_templates: Dict[Tuple[str, ...], BoletoTemplate] = {}
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _text(font: str, size: float, x: float, y: float, value: str) -> str:
+    return f"BT /{font} {size} Tf {x:.2f} {y:.2f} Td ({_escape(value)}) Tj ET\n"
+
+
+def text_width(widths: Dict[str, int], value: str, size: float) -> float:
+    """Largura do texto na Helvetica, em pontos."""
+    return sum(widths.get(char, DEFAULT_WIDTH) for char in value) * size / 1000
+
+
+def bank_code_check_digit(bank_code: str) -> int:
+    """Dígito verificador do código do banco (módulo 11, pesos 2 a 9)."""
+    total = sum(int(digit) * (2 + i % 8) for i, digit in enumerate(reversed(bank_code)))
+    check = 11 - total % 11
+    return 0 if check >= 10 else check
+
+
+def _pair_bars(pair: int) -> Tuple[Tuple[bool, float], ...]:
+    bars, spaces = I2OF5_PATTERNS[pair // 10], I2OF5_PATTERNS[pair % 10]
+    elements = []
+    for bar, space in zip(bars, spaces):
+        elements.append((True, BAR_WIDE if bar == "w" else BAR_NARROW))
+        elements.append((False, BAR_WIDE if space == "w" else BAR_NARROW))
+    return tuple(elements)
+
+
+def build_template(bank_code: str, beneficiary: str, agency: str, account: str) -> BoletoTemplate:
+    """
+    Monta as partes fixas do PDF de um beneficiário.
+
+    Args:
+        bank_code (str): Código do banco.
+        beneficiary (str): Nome do beneficiário.
+        agency (str): Agência.
+        account (str): Conta.
+
+    Returns:
+        BoletoTemplate: Template pronto para `render_boleto_pdf`.
+    """
+    header = b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n"
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+            f"/Resources << /Font << /F1 4 0 R /F2 5 0 R >> >> /Contents 6 0 R >>"
+        ).encode(),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>",
+    ]
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(header))
+        header += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+
+    content = ["0.5 w\n"]
+    content.append(_text("F2", 14, MARGIN, 736, f"{bank_code}-{bank_code_check_digit(bank_code)}"))
+    content.append(f"{MARGIN + 60} 730 m {MARGIN + 60} 750 l S\n")
+    for label, key, x, y, width, _ in FIELDS:
+        content.append(f"{x} {y} {width} {FIELD_HEIGHT} re S\n")
+        content.append(_text("F1", 6, x + 3, y + FIELD_HEIGHT - 8, label))
+    content.append(_text("F1", 9, MARGIN + 3, 704, beneficiary))
+    content.append(_text("F1", 9, MARGIN + 3, 676, f"{agency} / {account}"))
+    content.append(_text("F1", 6, MARGIN, 600, "Autenticação mecânica - Ficha de Compensação"))
+
+    widths = {chr(32 + index): width for index, width in enumerate(HELVETICA_WIDTHS)}
+    return BoletoTemplate(
+        header=header,
+        offsets=tuple(offsets),
+        static_content="".join(content),
+        pair_bars=tuple(_pair_bars(pair) for pair in range(100)),
+        widths=widths,
+    )
+
+
+def get_template(bank_code: str, beneficiary: str, agency: str, account: str) -> BoletoTemplate:
+    """Template do beneficiário, montado na primeira chamada do processo e reutilizado depois."""
+    key = (bank_code, beneficiary, agency, account)
+    template = _worker_templates.get(key)
+    if template is None:
+        template = _worker_templates[key] = build_template(*key)
+    return template
+
+
+def barcode_operators(template: BoletoTemplate, barcode: str, x: float, y: float) -> str:
+    """
+    Desenha o código de barras intercalado 2 de 5 como retângulos preenchidos.
+
+    Args:
+        template (BoletoTemplate): Template com a tabela de barras dos pares de dígitos.
+        barcode (str): Código de barras (quantidade par de dígitos).
+        x (float): Posição horizontal inicial.
+        y (float): Base das barras.
+
+    Raises:
+        ValueError: Se o código não tiver uma quantidade par de dígitos.
+    """
+    if len(barcode) % 2 or not barcode.isdigit():
+        raise ValueError("Interleaved 2 of 5 requires an even number of digits.")
+
+    # Início (estreita, espaço, estreita, espaço), pares de dígitos e fim (larga, espaço, estreita)
+    elements: List[Tuple[bool, float]] = [(True, BAR_NARROW), (False, BAR_NARROW)] * 2
+    for i in range(0, len(barcode), 2):
+        elements.extend(template.pair_bars[int(barcode[i:i + 2])])
+    elements.extend([(True, BAR_WIDE), (False, BAR_NARROW), (True, BAR_NARROW)])
+
+    operators = []
+    for is_bar, width in elements:
+        if is_bar:
+            operators.append(f"{x:.2f} {y} {width:.2f} {BAR_HEIGHT} re\n")
+        x += width
+    operators.append("f\n")
+    return "".join(operators)
+
+
+def render_boleto_pdf(template: BoletoTemplate, document: Dict[str, str]) -> bytes:
+    """
+    Gera o PDF de um boleto.
+
+    Args:
+        template (BoletoTemplate): Partes fixas do beneficiário.
+        document (Dict[str, str]): Campos já formatados: `digitable_line`, `barcode`,
+            `due_date`, `our_number`, `document_number`, `amount` e `payer`.
+
+    Returns:
+        bytes: Documento PDF.
+    """
+    content = [template.static_content]
+    content.append(_text("F2", 11, MARGIN + 70, 736, document["digitable_line"]))
+    for _, key, x, y, width, right_aligned in FIELDS:
+        value = document.get(key)
+        if value is None:
+            continue
+        text_x = x + 3
+        if right_aligned:
+            text_x = x + width - 3 - text_width(template.widths, value, 9)
+        content.append(_text("F1", 9, text_x, y + 4, value))
+    if document.get("barcode"):
+        content.append(barcode_operators(template, document["barcode"], MARGIN, 540))
+
+    stream = zlib.compress("".join(content).encode("cp1252", errors="replace"), 6)
+    output = bytearray(template.header)
+    offsets = list(template.offsets)
+    offsets.append(len(output))
+    output += f"6 0 obj\n<< /Length {len(stream)} /Filter /FlateDecode >>\nstream\n".encode()
+    output += stream
+    output += b"\nendstream\nendobj\n"
+
+    xref_offset = len(output)
+    output += f"xref\n0 {len(offsets) + 1}\n0000000000 65535 f \n".encode()
+    output += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    output += f"trailer\n<< /Size {len(offsets) + 1} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode()
+    return bytes(output)
@@ -0,0 +1,154 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from loguru import logger
+
+from app.config import settings
+from app.core.content_store import ContentStore
+from app.services.boleto_pdf import get_template, render_boleto_pdf
+
+TemplateKey = Tuple[str, str, str, str]
+
+
+def render_to_store(template_key: TemplateKey, documents: List[Dict[str, str]], store_root: str) -> List[str]:
+    """
+    Gera os PDFs de um lote e grava no store. Executado nos workers do pool de processos.
+
+    Apenas os digests voltam para o processo principal; os PDFs não atravessam o pool.
+
+    Args:
+        template_key (TemplateKey): Banco, beneficiário, agência e conta.
+        documents (List[Dict[str, str]]): Campos formatados de cada boleto.
+        store_root (str): Diretório do `ContentStore`.
+
+    Returns:
+        List[str]: SHA-256 de cada documento gravado.
+    """
+    template = get_template(*template_key)
+    store = ContentStore(store_root)
+    return [store.put(render_boleto_pdf(template, document)) for document in documents]
+
+
+def format_amount(amount) -> str:
+    """Formata o valor no padrão brasileiro (R$ 1.234,56)."""
+    formatted = f"{float(amount):,.2f}".replace(",", "_").replace(".", ",").replace("_", ".")
+    return f"R$ {formatted}"
+
+
+def build_document(boleto: dict) -> Dict[str, str]:
+    """
+    Monta os campos impressos de um boleto gerado.
+
+    Args:
+        boleto (dict): Boleto com códigos, valor, vencimento e dados do pagador.
+
+    Returns:
+        Dict[str, str]: Campos formatados para `render_boleto_pdf`.
+    """
+    return {
+        "digitable_line": boleto["digitable_line"],
+        "barcode": boleto["barcode"],
+        "due_date": boleto["debt_due_date"].strftime("%d/%m/%Y"),
+        "our_number": boleto["our_number_label"],
+        "document_number": str(boleto["debt_id"]),
+        "amount": format_amount(boleto["debt_amount"]),
+        "payer": f"{boleto['user_name']} - {boleto['user_id']}",
+    }
+
+
+class BoletoRenderer:
+    """
+    Gera os PDFs dos boletos em um pool de processos, fora do event loop.
+
+    Cada worker monta o template do beneficiário uma única vez e grava o PDF direto
+    no `ContentStore`, devolvendo apenas o digest. Os documentos seguem para o pool em
+    lotes de `batch_size`, o que dilui o custo de comunicação entre processos, e no
+    máximo `max_pending` documentos ficam em andamento, o que mantém a memória estável
+    em arquivos grandes.
+    """
+
+    def __init__(
+        self,
+        workers: int = settings.BOLETO_RENDER_WORKERS,
+        max_pending: int = settings.BOLETO_RENDER_MAX_PENDING,
+        batch_size: int = settings.BOLETO_RENDER_BATCH_SIZE,
+        store: Optional[ContentStore] = None,
+        template_key: Optional[TemplateKey] = None,
+    ):
+        if workers < 1:
+            raise ValueError("BoletoRenderer requires at least one worker.")
+        self.workers = workers
+        self.max_pending = max_pending
+        self.batch_size = max(1, min(batch_size, max_pending))
+        self.store = store or ContentStore()
+        self.template_key = template_key or (
+            settings.BOLETO_BANK_CODE,
+            settings.BOLETO_BENEFICIARY_NAME,
+            settings.BOLETO_AGENCY,
+            settings.BOLETO_ACCOUNT,
+        )
+        # Cada vaga é um lote em andamento no pool
+        self._slots = asyncio.Semaphore(max(1, max_pending // self.batch_size))
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    async def _render_in_slot(self, documents: List[Dict[str, str]]) -> List[str]:
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._get_executor(), render_to_store, self.template_key, documents, self.store.root
+            )
+        finally:
+            self._slots.release()
+
+    async def render(self, document: Dict[str, str]) -> str:
+        """
+        Gera e grava um boleto.
+
+        Args:
+            document (Dict[str, str]): Campos formatados do boleto.
+
+        Returns:
+            str: SHA-256 do PDF no store.
+        """
+        await self._slots.acquire()
+        digests = await self._render_in_slot([document])
+        return digests[0]
+
+    async def render_many(self, documents: Sequence[Dict[str, str]]) -> List[str]:
+        """
+        Gera e grava vários boletos, com no máximo `max_pending` em andamento.
+
+        Args:
+            documents (Sequence[Dict[str, str]]): Campos formatados de cada boleto.
+
+        Returns:
+            List[str]: Digest de cada PDF, na ordem da entrada.
+        """
+        tasks = []
+        try:
+            for start in range(0, len(documents), self.batch_size):
+                # O próximo lote só é enviado quando há vaga no pool
+                await self._slots.acquire()
+                batch = list(documents[start:start + self.batch_size])
+                tasks.append(asyncio.ensure_future(self._render_in_slot(batch)))
+            return [digest for digests in await asyncio.gather(*tasks) for digest in digests]
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+    def close(self):
+        """Encerra o pool de processos."""
+        if self._executor is not None:
+            logger.info("Shutting down boleto renderer pool.")
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,138 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Set
+
+from loguru import logger
+
+from app.config import settings
+from app.core.metrics import BOLETO_SCHEDULER_PENDING, BOLETO_SCHEDULER_RELEASED, BOLETO_SCHEDULER_SWEEP_SECONDS
+from app.repositories.boleto_repository import BoletoRepository
+from app.services.file_import_service import BOLETO_EXCHANGE, BOLETO_ROUTING_KEY
+from app.utils.time_wheel import HierarchicalTimeWheel
+
+# Minutos, horas e dias (com tick de 60 s): uma volta completa cobre 31 dias
+TIME_WHEEL_SLOTS = (60, 24, 31)
+
+
+class BoletoScheduler:
+    """
+    Libera a geração de boletos `lead_days` dias antes do vencimento de cada dívida.
+
+    A varredura (`sweep`) percorre as dívidas sem boleto que vencem até o fim da
+    próxima janela, pelo índice parcial de `debts(debt_due_date, id)`, em páginas por
+    keyset, cada uma em sua própria transação e lida com um cursor no servidor. Cada
+    dívida entra em uma roda de tempo hierárquica no seu momento de liberação; a cada
+    tick, as dívidas liberadas seguem em lotes de `batch_size` para `boleto.generate`.
+
+    A geração é idempotente, então uma dívida liberada duas vezes (ex.: duas instâncias
+    com o agendador ativo) não gera boletos duplicados.
+    """
+
+    def __init__(
+        self,
+        session_factory,
+        publisher,
+        lead_days: int = settings.BOLETO_LEAD_DAYS,
+        sweep_seconds: int = settings.BOLETO_SCHEDULER_SWEEP_SECONDS,
+        tick_seconds: int = settings.BOLETO_SCHEDULER_TICK_SECONDS,
+        page_size: int = settings.BOLETO_SCHEDULER_PAGE_SIZE,
+        fetch_size: int = settings.BOLETO_SCHEDULER_FETCH_SIZE,
+        batch_size: int = settings.BOLETO_SCHEDULER_BATCH_SIZE,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.session_factory = session_factory
+        self.publisher = publisher
+        self.lead = timedelta(days=lead_days)
+        self.sweep_seconds = sweep_seconds
+        self.tick_seconds = tick_seconds
+        self.page_size = page_size
+        self.fetch_size = fetch_size
+        self.batch_size = batch_size
+        self.clock = clock
+        self.wheel: HierarchicalTimeWheel[int] = HierarchicalTimeWheel(tick_seconds, TIME_WHEEL_SLOTS, clock())
+        self._scheduled: Set[int] = set()
+
+    async def sweep(self) -> int:
+        """
+        Agenda as dívidas sem boleto cuja liberação cai até o fim da próxima janela.
+
+        Returns:
+            int: Quantidade de dívidas agendadas nesta varredura.
+        """
+        started_at = time.perf_counter()
+        now = self.clock()
+        due_before = datetime.fromtimestamp(now + self.sweep_seconds) + self.lead
+        after = (datetime.min, 0)
+        scheduled = 0
+
+        while True:
+            page_rows = 0
+            async with self.session_factory() as session:
+                async with session.begin():
+                    debts = BoletoRepository(session).stream_pending_debts(
+                        due_before, after, self.page_size, self.fetch_size
+                    )
+                    async for debt_id, due_date in debts:
+                        page_rows += 1
+                        after = (due_date, debt_id)
+                        if debt_id in self._scheduled:
+                            continue
+                        # Dívidas vencidas ou dentro do prazo são liberadas no próximo tick
+                        self.wheel.add((due_date - self.lead).timestamp(), debt_id)
+                        self._scheduled.add(debt_id)
+                        scheduled += 1
+            if page_rows < self.page_size:
+                break
+
+        BOLETO_SCHEDULER_PENDING.set(len(self.wheel))
+        BOLETO_SCHEDULER_SWEEP_SECONDS.observe(time.perf_counter() - started_at)
+        logger.info(f"Boleto scheduler sweep scheduled {scheduled} debts due before {due_before:%Y-%m-%d %H:%M}.")
+        return scheduled
+
+    async def release_due(self) -> int:
+        """
+        Publica os lotes de dívidas cujo momento de liberação chegou.
+
+        Returns:
+            int: Quantidade de dívidas liberadas.
+        """
+        now = self.clock()
+        debt_ids = self.wheel.advance(now)
+        for start in range(0, len(debt_ids), self.batch_size):
+            batch = debt_ids[start:start + self.batch_size]
+            try:
+                await self.publisher.publish(
+                    exchange=BOLETO_EXCHANGE,
+                    routing_key=BOLETO_ROUTING_KEY,
+                    message={"debt_ids": batch},
+                )
+            except Exception:
+                # O restante volta para a roda e é liberado no próximo tick
+                for debt_id in debt_ids[start:]:
+                    self.wheel.add(now, debt_id)
+                raise
+            self._scheduled.difference_update(batch)
+            BOLETO_SCHEDULER_RELEASED.inc(len(batch))
+
+        BOLETO_SCHEDULER_PENDING.set(len(self.wheel))
+        if debt_ids:
+            logger.info(f"Boleto scheduler released {len(debt_ids)} debts for generation.")
+        return len(debt_ids)
+
+    async def run(self):
+        """
+        Executa varreduras a cada `sweep_seconds` e libera as dívidas a cada tick, até ser cancelado.
+
+        Uma varredura que falha é repetida no tick seguinte.
+        """
+        next_sweep = self.clock()
+        while True:
+            try:
+                if self.clock() >= next_sweep:
+                    await self.sweep()
+                    next_sweep = self.clock() + self.sweep_seconds
+                await self.release_due()
+            except Exception as e:
+                logger.error(f"Boleto scheduler error: {e}")
+            await asyncio.sleep(self.tick_seconds)
@@ -1,13 +1,126 @@
+from datetime import datetime, timedelta
+from typing import List, Optional
+from uuid import UUID
+
+import numpy as np
 from loguru import logger
-from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.boletos import BoletoStatus
+from app.repositories.boleto_repository import BoletoRepository
+from app.services.boleto_renderer import BoletoRenderer, build_document
+from app.services.boleto_codes import (
+    BoletoCodeEngine,
+    amounts_in_range,
+    amounts_to_cents,
+    due_date_factors,
+    due_dates_in_range,
+)
+
+NOTIFICATION_EXCHANGE = "notification_exchange"
+NOTIFICATION_ROUTING_KEY = "notification.send"
+
 
 class BoletoService:
     """
     Serviço responsável pela geração de boletos.
+
+    A geração por arquivo é feita por conjunto (`INSERT INTO boletos ... SELECT ... FROM debts`),
+    em páginas de `page_size` dívidas paginadas por `debts.id`, cada uma em sua própria
+    transação. Os boletos de cada página são notificados em mensagens de até `bulk_size` boletos.
+
+    Código de barras e linha digitável de cada página são calculados de uma vez pelo
+    `BoletoCodeEngine` e gravados na mesma transação da inserção, junto com a transição
+    de status da página inteira (`GENERATED` ou `GENERATION_FAILED`). Com um `BoletoRenderer`,
+    os PDFs da página são gerados no pool de processos depois do commit, antes das notificações.
+
+    O boleto só é marcado em `dispatched_at` depois que documentos e notificações da página
+    foram concluídos. Se o job morrer (ou a publicação falhar) depois do commit, a reentrega
+    encontra na mesma página os boletos ainda não despachados e conclui o envio.
+
+    No job por arquivo, só as dívidas que vencem nos próximos `lead_days` dias recebem
+    boleto; as demais são liberadas pelo `BoletoScheduler` perto do vencimento.
     """
 
-    def __init__(self, session_factory):
+    def __init__(
+        self,
+        session_factory,
+        publisher=None,
+        page_size: int = settings.BOLETO_PAGE_SIZE,
+        bulk_size: int = settings.NOTIFICATION_BULK_SIZE,
+        code_engine: BoletoCodeEngine = None,
+        renderer: Optional[BoletoRenderer] = None,
+        lead_days: int = settings.BOLETO_LEAD_DAYS,
+    ):
         self.session_factory = session_factory
+        self.publisher = publisher
+        self.page_size = page_size
+        self.bulk_size = bulk_size
+        self.code_engine = code_engine or BoletoCodeEngine(
+            bank_code=settings.BOLETO_BANK_CODE,
+            agency=settings.BOLETO_AGENCY,
+            wallet=settings.BOLETO_WALLET,
+            account=settings.BOLETO_ACCOUNT,
+        )
+        self.renderer = renderer
+        self.lead_days = lead_days
+
+    async def generate_boletos_for_file(self, file_id: UUID) -> int:
+        """
+        Gera os boletos de todas as dívidas de um arquivo.
+
+        O job é idempotente: dívidas que já têm boleto são ignoradas, então uma
+        reentrega apenas completa as páginas que faltaram e o envio dos boletos
+        que não chegaram a ser despachados.
+
+        Args:
+            file_id (UUID): ID do arquivo importado.
+
+        Returns:
+            int: Quantidade de boletos gerados.
+        """
+        after_id = 0
+        generated = 0
+        generate_before = datetime.now() + timedelta(days=self.lead_days)
+        while True:
+            async with self.session_factory() as session:
+                async with session.begin():
+                    repository = BoletoRepository(session)
+                    last_id = await repository.next_page_boundary(file_id, after_id, self.page_size)
+                    if last_id is None:
+                        break
+                    pending = await repository.undispatched_page(file_id, after_id, last_id, generate_before)
+                    boletos = await repository.insert_page(file_id, after_id, last_id, generate_before)
+                    await self.assign_codes(repository, boletos)
+
+            # Documentos e notificações só depois do commit da página
+            await self.dispatch(self.restore_codes(pending) + boletos)
+            generated += len(boletos)
+            after_id = last_id
+
+        logger.info(f"{generated} boletos generated for file {file_id}.")
+        return generated
+
+    async def generate_boletos_for_debts(self, debt_ids: List[int]) -> int:
+        """
+        Gera os boletos de um lote de dívidas liberado pelo agendador.
+
+        Args:
+            debt_ids (List[int]): `debts.id` das dívidas.
+
+        Returns:
+            int: Quantidade de boletos gerados.
+        """
+        async with self.session_factory() as session:
+            async with session.begin():
+                repository = BoletoRepository(session)
+                pending = await repository.undispatched_for_debt_ids(debt_ids)
+                boletos = await repository.insert_for_debt_ids(debt_ids)
+                await self.assign_codes(repository, boletos)
+
+        await self.dispatch(self.restore_codes(pending) + boletos)
+        logger.info(f"{len(boletos)} scheduled boletos generated for {len(debt_ids)} debts.")
+        return len(boletos)
 
     async def generate_boleto(self, user_id: str, debt_id: str):
         """
@@ -17,8 +130,146 @@ class BoletoService:
             user_id (str): Identificador do usuário.
             debt_id (str): Identificador da dívida.
         """
+        async with self.session_factory() as session:
+            async with session.begin():
+                repository = BoletoRepository(session)
+                pending = await repository.undispatched_for_debt(UUID(str(debt_id)))
+                boletos = await repository.insert_for_debt(UUID(str(debt_id)))
+                await self.assign_codes(repository, boletos)
+
+        await self.dispatch(self.restore_codes(pending) + boletos)
+        logger.info(f"Boleto gerado para usuario: {user_id}, Debt ID: {debt_id}")
+
+    async def assign_codes(self, repository: BoletoRepository, boletos: List[dict]):
+        """
+        Calcula e grava código de barras e linha digitável dos boletos de uma página.
 
-        # Implementar aqui geraçao de boleto, armazenamento na tabela de boletos e envio para fila de notificaçao
+        Boletos com código passam a `GENERATED`; os com valor ou vencimento fora do
+        layout ficam sem código, passam a `GENERATION_FAILED` e são registrados no log.
+
+        Args:
+            repository (BoletoRepository): Repositório na transação da página.
+            boletos (List[dict]): Boletos inseridos, com valor, vencimento e nosso número.
+        """
+        if not boletos:
+            return
+
+        encodable, positions, codes = self._compute_codes(boletos)
+        if not encodable.all():
+            logger.warning(f"{int((~encodable).sum())} boletos without barcode: amount or due date out of range.")
+
+        await repository.update_codes(
+            [boletos[i]["id"] for i in positions], codes.barcodes, codes.digitable_lines
+        )
+        now = datetime.now()
+        await repository.apply_transitions(
+            [boleto["id"] for boleto in boletos],
+            [BoletoStatus.GENERATED if ok else BoletoStatus.GENERATION_FAILED for ok in encodable],
+            [now] * len(boletos),
+        )
+
+    def restore_codes(self, boletos: List[dict]) -> List[dict]:
+        """
+        Recalcula os campos derivados dos códigos (ex.: o nosso número impresso) de boletos
+        lidos do banco, para que possam seguir para os documentos. Nada é gravado.
+
+        Args:
+            boletos (List[dict]): Boletos já gerados, com valor, vencimento e nosso número.
+
+        Returns:
+            List[dict]: Os mesmos boletos.
+        """
+        if boletos:
+            self._compute_codes(boletos)
+        return boletos
+
+    def _compute_codes(self, boletos: List[dict]):
+        cents = amounts_to_cents([boleto["debt_amount"] for boleto in boletos])
+        due_dates = np.asarray([boleto["debt_due_date"] for boleto in boletos], dtype="datetime64[D]")
+        encodable = amounts_in_range(cents) & due_dates_in_range(due_dates)
+        positions = np.flatnonzero(encodable)
+        codes = self.code_engine.compute(
+            cents[positions],
+            due_date_factors(due_dates[positions]),
+            [boletos[i]["our_number"] for i in positions],
+        )
+        for position, barcode, digitable_line, our_number_label in zip(positions, *codes):
+            boletos[position]["barcode"] = barcode
+            boletos[position]["digitable_line"] = digitable_line
+            boletos[position]["our_number_label"] = our_number_label
+        return encodable, positions, codes
+
+    async def dispatch(self, boletos: List[dict]):
+        """
+        Gera os documentos e publica as notificações dos boletos; só então os marca como despachados.
+
+        Uma falha na publicação interrompe o job antes da marcação, e a reentrega conclui o envio.
+
+        Args:
+            boletos (List[dict]): Boletos gerados (ou ainda não despachados) da página.
+        """
+        if not boletos:
+            return
+        await self.render_documents(boletos)
+        await self.notify(boletos)
         async with self.session_factory() as session:
             async with session.begin():
-                logger.info(f"Boleto gerado para usuario: {user_id}, Debt ID: {debt_id}")
+                await BoletoRepository(session).mark_dispatched([boleto["id"] for boleto in boletos])
+
+    async def render_documents(self, boletos: List[dict]):
+        """
+        Gera os PDFs dos boletos com código de barras que ainda não têm documento e grava os digests.
+
+        Uma falha na geração é registrada e não interrompe o job: os boletos já foram
+        gravados e seguem para notificação sem documento.
+
+        Args:
+            boletos (List[dict]): Boletos gerados na página.
+        """
+        if self.renderer is None:
+            return
+        renderable = [boleto for boleto in boletos if boleto.get("barcode") and not boleto.get("document_digest")]
+        if not renderable:
+            return
+
+        try:
+            digests = await self.renderer.render_many([build_document(boleto) for boleto in renderable])
+        except Exception as e:
+            logger.error(f"Error rendering {len(renderable)} boleto documents: {e}")
+            return
+
+        async with self.session_factory() as session:
+            async with session.begin():
+                await BoletoRepository(session).update_documents(
+                    [boleto["id"] for boleto in renderable], digests
+                )
+        for boleto, digest in zip(renderable, digests):
+            boleto["document_digest"] = digest
+
+    async def notify(self, boletos: List[dict]):
+        """
+        Publica as notificações dos boletos gerados, em mensagens de até `bulk_size` boletos.
+
+        Args:
+            boletos (List[dict]): Boletos com `id`, `user_id` e `debt_id`.
+        """
+        if not boletos or self.publisher is None:
+            return
+
+        for start in range(0, len(boletos), self.bulk_size):
+            await self.publisher.publish(
+                exchange=NOTIFICATION_EXCHANGE,
+                routing_key=NOTIFICATION_ROUTING_KEY,
+                message={
+                    "boletos": [
+                        {
+                            "boleto_id": boleto["id"],
+                            "user_id": boleto["user_id"],
+                            "debt_id": boleto["debt_id"],
+                            "digitable_line": boleto.get("digitable_line"),
+                            "document_digest": boleto.get("document_digest"),
+                        }
+                        for boleto in boletos[start:start + self.bulk_size]
+                    ]
+                },
+            )
@@ -0,0 +1,134 @@
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional, Sequence
+from uuid import UUID
+
+from loguru import logger
+
+from app.config import settings
+from app.core.metrics import BOLETO_STATUS_FLUSH_SIZE, BOLETO_STATUS_TRANSITIONS
+from app.models.boletos import BOLETO_TRANSITIONS
+from app.repositories.boleto_repository import BoletoRepository
+from app.utils.micro_batcher import MicroBatcher
+
+
+class BoletoTransition(NamedTuple):
+    boleto_id: UUID
+    status: str
+    occurred_at: datetime
+
+
+def transition_rounds(transitions: Sequence[BoletoTransition]) -> List[List[BoletoTransition]]:
+    """
+    Separa as transições em rodadas com no máximo uma transição por boleto.
+
+    Um mesmo boleto pode aparecer mais de uma vez no buffer (ex.: `NOTIFICATION_FAILED`
+    e, na reentrega, `NOTIFIED`). As transições de cada boleto vão para rodadas
+    sucessivas, na ordem em que foram registradas.
+
+    Args:
+        transitions (Sequence[BoletoTransition]): Transições na ordem do registro.
+
+    Returns:
+        List[List[BoletoTransition]]: Rodadas, cada uma aplicada em um único comando.
+    """
+    rounds: List[List[BoletoTransition]] = []
+    seen: Dict[UUID, int] = {}
+    for transition in transitions:
+        index = seen.get(transition.boleto_id, 0)
+        seen[transition.boleto_id] = index + 1
+        if index == len(rounds):
+            rounds.append([])
+        rounds[index].append(transition)
+    return rounds
+
+
+class BoletoStatusRecorder:
+    """
+    Registra transições de status de boletos e as grava em lote.
+
+    As transições das mensagens em processamento são acumuladas por até
+    `flush_seconds` ou `batch_size` transições e gravadas com um único
+    `UPDATE ... FROM unnest(...)` (`BoletoRepository.apply_transitions`), que só
+    aplica as transições permitidas a partir do estado atual de cada boleto.
+    `record` retorna depois do commit do lote, então a mensagem só recebe ack com o
+    status gravado.
+    """
+
+    def __init__(
+        self,
+        session_factory,
+        batch_size: int = settings.BOLETO_STATUS_BATCH_SIZE,
+        flush_seconds: float = settings.BOLETO_STATUS_FLUSH_SECONDS,
+    ):
+        self.session_factory = session_factory
+        self.batcher: Optional[MicroBatcher] = None
+        if batch_size > 0:
+            self.batcher = MicroBatcher(
+                flush=self._flush,
+                max_size=batch_size,
+                linger_seconds=flush_seconds,
+                size_of=len,
+            )
+
+    async def record(self, boleto_ids: Sequence[UUID], status: str):
+        """
+        Registra a mesma transição para vários boletos e aguarda a gravação.
+
+        Args:
+            boleto_ids (Sequence[UUID]): IDs dos boletos.
+            status (str): Estado de destino.
+
+        Raises:
+            ValueError: Se o estado de destino não existir.
+        """
+        if status not in BOLETO_TRANSITIONS:
+            raise ValueError(f"Unknown boleto status '{status}'.")
+        if not boleto_ids:
+            return
+
+        now = datetime.now()
+        transitions = [BoletoTransition(UUID(str(boleto_id)), status, now) for boleto_id in boleto_ids]
+        if self.batcher is None:
+            await self.apply(transitions)
+        else:
+            await self.batcher.submit(transitions)
+
+    async def _flush(self, batches: List[List[BoletoTransition]]):
+        await self.apply([transition for batch in batches for transition in batch])
+
+    async def apply(self, transitions: Sequence[BoletoTransition]) -> int:
+        """
+        Grava as transições em uma única transação, um comando por rodada.
+
+        Args:
+            transitions (Sequence[BoletoTransition]): Transições na ordem do registro.
+
+        Returns:
+            int: Quantidade de transições aplicadas.
+        """
+        results: Counter = Counter()
+        async with self.session_factory() as session:
+            async with session.begin():
+                repository = BoletoRepository(session)
+                for transitions_round in transition_rounds(transitions):
+                    ids, statuses, occurred_at = (list(column) for column in zip(*transitions_round))
+                    applied = set(await repository.apply_transitions(ids, statuses, occurred_at))
+                    results.update(
+                        (status, "applied" if boleto_id in applied else "ignored")
+                        for boleto_id, status in zip(ids, statuses)
+                    )
+
+        for (status, result), count in results.items():
+            BOLETO_STATUS_TRANSITIONS.labels(status=status, result=result).inc(count)
+        BOLETO_STATUS_FLUSH_SIZE.observe(len(transitions))
+
+        ignored = sum(count for (_, result), count in results.items() if result == "ignored")
+        if ignored:
+            logger.warning(f"{ignored} of {len(transitions)} boleto status transitions ignored by the guard.")
+        return len(transitions) - ignored
+
+    async def close(self):
+        """Grava as transições pendentes no buffer."""
+        if self.batcher is not None:
+            await self.batcher.close()
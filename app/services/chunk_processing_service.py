@@ -1,97 +1,287 @@
+import csv
+import io
+import time
 from loguru import logger
 from app.repositories.user_repository import UserRepository
 from app.repositories.debt_repository import DebtRepository
-from app.schemas.chunk import ChunkRow
-from typing import List
+from app.repositories.copy_repositories import CopyUserRepository, CopyDebtRepository
+from app.repositories.file_import_repository import FileImportRepository
+from app.config import settings
+from app.core.metrics import CHUNK_INGEST_ROWS, CHUNK_INGEST_SECONDS
+from app.services.adaptive_chunk_sizer import AdaptiveChunkSizer, chunk_sizer as shared_chunk_sizer
+from app.schemas.chunk import ChunkRow, IngestRow, PreparedChunk
+from app.services.csv_validation import build_row_validator
+from app.services.known_user_cache import KnownUserCache, known_user_cache as shared_known_user_cache
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence
 from uuid import UUID
-from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 
 
 class ChunkProcessingService:
     """
     Serviço responsável por processar e armazenar chunks de usuários e dívidas.
+
+    A estratégia de carga é escolhida por deployment (`INGEST_STRATEGY`):
+    - "insert": INSERT ... VALUES multi-linha via SQLAlchemy Core.
+    - "copy": COPY binário do asyncpg em tabelas temporárias, seguido de um merge.
+
+    A duração de cada transação é informada ao `AdaptiveChunkSizer`, que ajusta o
+    tamanho dos próximos chunks gerados pelo splitter.
+
+    Usuários presentes no `KnownUserCache` não são reenviados no upsert de usuários.
+
+    Cada chunk gravado é contado no progresso da importação do arquivo (`file_imports`);
+    os arquivos concluídos são devolvidos para que a geração de boletos seja disparada.
     """
 
-    def __init__(self, session_factory):
+    INGEST_STRATEGIES = {
+        "insert": (UserRepository, DebtRepository),
+        "copy": (CopyUserRepository, CopyDebtRepository),
+    }
+
+    def __init__(
+        self,
+        session_factory,
+        ingest_strategy: str = settings.INGEST_STRATEGY,
+        validation_engine: str = settings.CSV_VALIDATION_ENGINE,
+        chunk_sizer: AdaptiveChunkSizer = shared_chunk_sizer,
+        user_cache: KnownUserCache = shared_known_user_cache,
+    ):
+        if ingest_strategy not in self.INGEST_STRATEGIES:
+            raise ValueError(
+                f"Invalid ingest strategy '{ingest_strategy}'. "
+                f"Expected one of: {', '.join(self.INGEST_STRATEGIES)}."
+            )
         self.session_factory = session_factory
+        self.ingest_strategy = ingest_strategy
+        self.row_validator = build_row_validator(validation_engine)
+        self.chunk_sizer = chunk_sizer
+        self.user_cache = user_cache
+
+    @staticmethod
+    def validate_rows(chunk: List[dict]) -> List[IngestRow]:
+        """
+        Valida as linhas de um chunk não confiável com o `ChunkRow`.
+
+        Args:
+            chunk (List[dict]): Linhas a validar.
+
+        Returns:
+            List[IngestRow]: Linhas válidas; as inválidas são registradas e descartadas.
+        """
+        valid_rows = []
+        invalid_rows = []
+
+        for row in chunk:
+            try:
+                validated_row = ChunkRow(**row)
+                valid_rows.append(
+                    IngestRow(
+                        validated_row.name,
+                        validated_row.governmentId,
+                        validated_row.email,
+                        validated_row.debtAmount,
+                        validated_row.debtDueDate,
+                        validated_row.debtId,
+                    )
+                )
+            except Exception as e:
+                logger.error(f"Invalid row: {row} - {e}")
+                invalid_rows.append(row)
+
+        if invalid_rows:
+            logger.warning(f"{len(invalid_rows)} invalid rows detected and skipped.")
+
+        return valid_rows
 
     async def process_chunk(self, file_id: UUID, chunk: List[dict]):
         """
-        Processa um chunk de dados e insere no banco.
+        Valida um chunk não confiável (mensagens legadas ou sem assinatura) e insere no banco.
+
+        Args:
+            file_id (UUID): ID do arquivo que originou os chunks.
+            chunk (List[dict]): Chunk contendo os dados a validar.
+        """
+        await self.process_trusted_chunk(file_id, self.validate_rows(chunk))
+
+    def validate_slice(
+        self, columns: Sequence[str], data: bytes, first_row: int, row_count: int
+    ) -> List[IngestRow]:
+        """
+        Lê e valida as linhas de um chunk no modo claim-check.
+
+        Args:
+            columns (Sequence[str]): Cabeçalho do CSV.
+            data (bytes): Intervalo do arquivo com os registros do chunk.
+            first_row (int): Número da primeira linha do chunk no arquivo.
+            row_count (int): Quantidade de registros esperada no intervalo.
+
+        Returns:
+            List[IngestRow]: Linhas válidas; as inválidas são registradas e descartadas.
+
+        Raises:
+            ValueError: Se o intervalo não contiver a quantidade de registros esperada.
+        """
+        rows = [row for row in csv.reader(io.StringIO(data.decode("utf-8"), newline="")) if row]
+        if len(rows) != row_count:
+            raise ValueError(f"Expected {row_count} rows starting at line {first_row}, found {len(rows)}.")
+
+        valid_rows, invalid_rows = self.row_validator.validate_batch(columns, rows, first_row)
+        for invalid_row in invalid_rows:
+            logger.error(f"Invalid row at line {invalid_row['line_number']}: {invalid_row['error']}")
+        if invalid_rows:
+            logger.warning(f"{len(invalid_rows)} invalid rows detected and skipped.")
+
+        return [
+            IngestRow(
+                row["name"],
+                row["governmentId"],
+                row["email"],
+                row["debtAmount"],
+                row["debtDueDate"],
+                row["debtId"],
+            )
+            for row in valid_rows
+        ]
+
+    async def process_trusted_chunk(
+        self, file_id: UUID, rows: List[IngestRow], chunk_key: Optional[str] = None
+    ) -> List[UUID]:
+        """
+        Insere no banco um chunk cujas linhas já foram validadas.
 
         Args:
             file_id (UUID): ID do arquivo que originou os chunks.
-            chunk (List[dict]): Chunk contendo os dados validados.
+            rows (List[IngestRow]): Linhas validadas.
+            chunk_key (Optional[str]): Identificador do chunk no acompanhamento da importação.
+
+        Returns:
+            List[UUID]: Arquivos concluídos que precisam da geração de boletos.
         """
+        return await self.ingest_chunks([PreparedChunk(file_id, rows, chunk_key)])
+
+    async def ingest_chunks(self, chunks: List[PreparedChunk]) -> List[UUID]:
+        """
+        Insere vários chunks já validados em uma única transação.
+
+        Os chunks com `chunk_key` são registrados no progresso da importação do
+        arquivo na mesma transação, inclusive os que não têm linhas válidas.
+
+        Args:
+            chunks (List[PreparedChunk]): Chunks validados.
+
+        Returns:
+            List[UUID]: Arquivos concluídos que precisam da geração de boletos.
+        """
+        row_count = sum(len(chunk.rows) for chunk in chunks)
+        has_progress = any(chunk.chunk_key for chunk in chunks)
+        if not row_count:
+            logger.warning("No valid rows to process in this chunk.")
+            if not has_progress:
+                return []
+
+        # Mapear usuários
+        users = {
+            row.government_id: {
+                "id": row.government_id,
+                "name": row.name,
+                "government_id": row.government_id,
+                "email": row.email
+            }
+            for chunk in chunks
+            for row in chunk.rows
+        }
+
+        # Mapear dívidas
+        debts = [
+            {
+                "file_id": chunk.file_id,
+                "user_id": row.government_id,
+                "debt_amount": row.debt_amount,
+                "debt_due_date": row.debt_due_date,
+                "debt_id": row.debt_id
+            }
+            for chunk in chunks
+            for row in chunk.rows
+        ]
+
+        # Usuários já conhecidos não precisam do upsert
+        cached_ids = self.user_cache.known(users)
+        pending_users = [user for government_id, user in users.items() if government_id not in cached_ids]
+
         try:
-            async with self.session_factory() as session:
-                async with session.begin():
-                    user_repo = UserRepository(session)
-                    debt_repo = DebtRepository(session)
-
-                    # Validar e mapear dados
-                    valid_rows = []
-                    invalid_rows = []
-
-                    for row in chunk:
-                        try:
-                            validated_row = ChunkRow(**row)
-                            valid_rows.append(validated_row)
-                        except Exception as e:
-                            logger.error(f"Invalid row: {row} - {e}")
-                            invalid_rows.append(row)
-
-                    if invalid_rows:
-                        logger.warning(f"{len(invalid_rows)} invalid rows detected and skipped.")
-
-                    if not valid_rows:
-                        logger.warning("No valid rows to process in this chunk.")
-                        return
-
-                    # Mapear usuários
-                    users = {
-                        row.governmentId: {
-                            "id": row.governmentId,
-                            "name": row.name,
-                            "government_id": row.governmentId,
-                            "email": row.email
-                        }
-                        for row in valid_rows
-                    }
-
-                    # Mapear dívidas
-                    debts = [
-                        {
-                            "file_id": file_id,
-                            "user_id": row.governmentId,
-                            "debt_amount": row.debtAmount,
-                            "debt_due_date": row.debtDueDate,
-                            "debt_id": row.debtId
-                        }
-                        for row in valid_rows
-                    ]
-
-                    # Inserir usuários com ON CONFLICT DO NOTHING
-                    try:
-                        await user_repo.insert_users(list(users.values()))
-                        logger.info("Users inserted successfully with conflict handling.")
-                    except IntegrityError as ie:
-                        logger.error(f"Integrity error while inserting users: {ie}")
-                        raise
-
-                    # Inserir dívidas com ON CONFLICT DO NOTHING
-                    try:
-                        await debt_repo.insert_debts(debts)
-                        logger.info("Debts inserted successfully with conflict handling.")
-                    except IntegrityError as ie:
-                        logger.error(f"Integrity error while inserting debts: {ie}")
-                        raise
-
-                    logger.info(f"Chunk with {len(valid_rows)} valid rows processed successfully.")
+            try:
+                completed_files = await self._write(pending_users, debts, chunks, row_count)
+            except IntegrityError:
+                if not cached_ids:
+                    raise
+                # Cache desatualizado (ex.: usuário removido): regrava com todos os usuários
+                logger.warning(
+                    f"Integrity error with {len(cached_ids)} cached users skipped; retrying with all users."
+                )
+                self.user_cache.discard(cached_ids)
+                completed_files = await self._write(list(users.values()), debts, chunks, row_count)
         except SQLAlchemyError as sae:
             logger.error(f"Database error while processing chunk: {sae}")
             raise
         except Exception as e:
             logger.error(f"Unexpected error while processing chunk: {e}")
-            raise
\ No newline at end of file
+            raise
+
+        self.user_cache.add(users)
+        return completed_files
+
+    async def _write(
+        self, users: List[dict], debts: List[dict], chunks: List[PreparedChunk], row_count: int
+    ) -> List[UUID]:
+        """
+        Grava usuários, dívidas e o progresso da importação em uma única transação.
+        """
+        chunk_keys: Dict[UUID, List[str]] = defaultdict(list)
+        for chunk in chunks:
+            if chunk.chunk_key:
+                chunk_keys[chunk.file_id].append(chunk.chunk_key)
+
+        completed_files = []
+        started_at = time.perf_counter()
+        async with self.session_factory() as session:
+            async with session.begin():
+                user_repository_class, debt_repository_class = self.INGEST_STRATEGIES[self.ingest_strategy]
+                user_repo = user_repository_class(session)
+                debt_repo = debt_repository_class(session)
+
+                # Inserir usuários com ON CONFLICT DO NOTHING
+                try:
+                    await user_repo.insert_users(users)
+                    logger.info("Users inserted successfully with conflict handling.")
+                except IntegrityError as ie:
+                    logger.error(f"Integrity error while inserting users: {ie}")
+                    raise
+
+                # Inserir dívidas com ON CONFLICT DO NOTHING
+                try:
+                    await debt_repo.insert_debts(debts)
+                    logger.info("Debts inserted successfully with conflict handling.")
+                except IntegrityError as ie:
+                    logger.error(f"Integrity error while inserting debts: {ie}")
+                    raise
+
+                # Progresso da importação por último: bloqueia a linha do arquivo só até o commit
+                file_import_repo = FileImportRepository(session)
+                for file_id, keys in chunk_keys.items():
+                    progress = await file_import_repo.record_chunks(file_id, keys)
+                    if progress is not None and progress.needs_boletos:
+                        completed_files.append(file_id)
+
+                if len(chunks) == 1:
+                    logger.info(f"Chunk with {row_count} valid rows processed successfully.")
+                else:
+                    logger.info(f"Batch of {len(chunks)} chunks with {row_count} valid rows processed successfully.")
+
+        elapsed = time.perf_counter() - started_at
+        if row_count:
+            CHUNK_INGEST_SECONDS.observe(elapsed)
+            CHUNK_INGEST_ROWS.inc(row_count)
+            self.chunk_sizer.record(row_count, elapsed)
+        return completed_files
@@ -0,0 +1,243 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+from uuid import UUID, uuid4
+
+import email_validator
+import numpy as np
+import pandas as pd
+
+from app.schemas.chunk import ChunkRow
+
+# Campos obrigatórios do ChunkRow, na ordem em que aparecem em `ChunkRow.dict()`
+ROW_FIELDS = tuple(ChunkRow.model_fields)
+
+# Os padrões abaixo aceitam apenas um subconjunto estrito do que o ChunkRow aceita.
+# Qualquer valor fora desse subconjunto é revalidado pelo ChunkRow, que é quem decide.
+INTEGER_PATTERN = r"[0-9]{1,18}"
+DECIMAL_PATTERN = r"-?[0-9]{1,15}(?:\.[0-9]{1,15})?"
+DATE_PATTERN = r"[0-9]{4}-[0-9]{2}-[0-9]{2}"
+UUID_PATTERN = r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}"
+EMAIL_PATTERN = (
+    r"[A-Za-z0-9_%+-]+(?:\.[A-Za-z0-9_%+-]+)*"
+    r"@(?:(?=[A-Za-z0-9-]{1,63}\.)[A-Za-z0-9]+(?:-[A-Za-z0-9]+)*\.)+[A-Za-z]{2,24}"  # rótulos de até 63 caracteres
+)
+MAX_EMAIL_LOCAL_PART_LENGTH = 64
+MAX_EMAIL_LENGTH = 254
+SPECIAL_USE_DOMAIN_NAMES = tuple(
+    getattr(
+        email_validator,
+        "SPECIAL_USE_DOMAIN_NAMES",
+        ["arpa", "invalid", "local", "localhost", "onion", "test"],
+    )
+)
+
+ValidationResult = Tuple[List[dict], List[dict]]
+
+
+def row_to_dict(fieldnames: Sequence[str], row: List[str]) -> dict:
+    """
+    Monta o dicionário de uma linha exatamente como o `csv.DictReader` faria.
+
+    Args:
+        fieldnames (Sequence[str]): Cabeçalho do CSV.
+        row (List[str]): Valores da linha.
+
+    Returns:
+        dict: Linha indexada pelo cabeçalho.
+    """
+    row_dict = dict(zip(fieldnames, row))
+    if len(row) > len(fieldnames):
+        row_dict[None] = row[len(fieldnames):]
+    elif len(row) < len(fieldnames):
+        for key in fieldnames[len(row):]:
+            row_dict[key] = None
+    return row_dict
+
+
+def invalid_row_entry(line_number: int, row: dict, error: Exception) -> dict:
+    """
+    Monta o registro de linha inválida usado no relatório de processamento.
+    """
+    row["debt_id"] = str(uuid4())
+    return {"line_number": line_number, "row": row, "error": str(error)}
+
+
+class PydanticRowValidator:
+    """
+    Valida linha a linha com o modelo `ChunkRow`.
+    """
+
+    name = "pydantic"
+
+    def validate_batch(
+        self, fieldnames: Sequence[str], rows: List[List[str]], first_line_number: int
+    ) -> ValidationResult:
+        """
+        Valida um lote de linhas.
+
+        Args:
+            fieldnames (Sequence[str]): Cabeçalho do CSV.
+            rows (List[List[str]]): Linhas do lote, como retornadas pelo `csv.reader`.
+            first_line_number (int): Número da primeira linha do lote (base 1, sem o cabeçalho).
+
+        Returns:
+            Tuple[List[dict], List[dict]]: Linhas válidas e registros de linhas inválidas.
+        """
+        valid_rows = []
+        invalid_rows = []
+        for offset, row in enumerate(rows):
+            row_dict = row_to_dict(fieldnames, row)
+            try:
+                valid_rows.append(ChunkRow(**row_dict).dict())
+            except Exception as e:
+                invalid_rows.append(invalid_row_entry(first_line_number + offset, row_dict, e))
+        return valid_rows, invalid_rows
+
+
+class ColumnarRowValidator:
+    """
+    Valida lotes de linhas por coluna, com operações vetorizadas do pandas/numpy.
+
+    Linhas aceitas pelos filtros vetorizados são convertidas diretamente para os tipos
+    do `ChunkRow`. Linhas rejeitadas (ou com número de colunas diferente do cabeçalho)
+    são revalidadas pelo `PydanticRowValidator`, o que garante o mesmo resultado e as
+    mesmas mensagens de erro do caminho linha a linha.
+    """
+
+    name = "columnar"
+
+    def __init__(self):
+        self.fallback = PydanticRowValidator()
+
+    def validate_batch(
+        self, fieldnames: Sequence[str], rows: List[List[str]], first_line_number: int
+    ) -> ValidationResult:
+        """
+        Valida um lote de linhas.
+
+        Args:
+            fieldnames (Sequence[str]): Cabeçalho do CSV.
+            rows (List[List[str]]): Linhas do lote, como retornadas pelo `csv.reader`.
+            first_line_number (int): Número da primeira linha do lote (base 1, sem o cabeçalho).
+
+        Returns:
+            Tuple[List[dict], List[dict]]: Linhas válidas e registros de linhas inválidas.
+        """
+        column_index = self._column_index(fieldnames)
+        if column_index is None or not rows:
+            return self.fallback.validate_batch(fieldnames, rows, first_line_number)
+
+        width = len(fieldnames)
+        well_formed = np.fromiter((len(row) == width for row in rows), dtype=bool, count=len(rows))
+        if not well_formed.any():
+            return self.fallback.validate_batch(fieldnames, rows, first_line_number)
+
+        positions = np.flatnonzero(well_formed)
+        candidate_rows = [rows[i] for i in positions] if len(positions) < len(rows) else rows
+        columns = list(zip(*candidate_rows))
+        values = {field: pd.Series(columns[index], dtype=object) for field, index in column_index.items()}
+
+        accepted, converted = self._validate_columns(values)
+        accepted_positions = positions[accepted]
+
+        valid_by_position: Dict[int, dict] = dict(
+            zip(
+                accepted_positions.tolist(),
+                (
+                    dict(zip(ROW_FIELDS, fields))
+                    for fields in zip(*(converted[field] for field in ROW_FIELDS))
+                ),
+            )
+        )
+        if len(valid_by_position) == len(rows):
+            return list(valid_by_position.values()), []
+
+        # Linhas rejeitadas pelos filtros vetorizados passam pelo ChunkRow
+        valid_rows = []
+        invalid_rows = []
+        for position, row in enumerate(rows):
+            valid_row = valid_by_position.get(position)
+            if valid_row is not None:
+                valid_rows.append(valid_row)
+                continue
+            fallback_valid, fallback_invalid = self.fallback.validate_batch(
+                fieldnames, [row], first_line_number + position
+            )
+            valid_rows.extend(fallback_valid)
+            invalid_rows.extend(fallback_invalid)
+        return valid_rows, invalid_rows
+
+    @staticmethod
+    def _column_index(fieldnames: Sequence[str]) -> Optional[Dict[str, int]]:
+        """Índice de cada campo do ChunkRow no cabeçalho, ou None se faltar algum campo."""
+        index = {}
+        for position, field in enumerate(fieldnames):
+            index.setdefault(field, position)
+        if any(field not in index for field in ROW_FIELDS):
+            return None
+        return {field: index[field] for field in ROW_FIELDS}
+
+    def _validate_columns(self, values: Dict[str, pd.Series]) -> Tuple[np.ndarray, Dict[str, list]]:
+        """
+        Aplica os filtros vetorizados e converte as colunas das linhas aceitas.
+
+        Returns:
+            Tuple[np.ndarray, Dict[str, list]]: Máscara das linhas aceitas e colunas convertidas.
+        """
+        government_ids = values["governmentId"]
+        amounts = values["debtAmount"]
+        due_dates = values["debtDueDate"]
+        debt_ids = values["debtId"]
+        emails = values["email"]
+
+        mask = government_ids.str.fullmatch(INTEGER_PATTERN).to_numpy(dtype=bool)
+        mask &= amounts.str.fullmatch(DECIMAL_PATTERN).to_numpy(dtype=bool)
+        mask &= debt_ids.str.fullmatch(UUID_PATTERN).to_numpy(dtype=bool)
+        mask &= self._email_mask(emails)
+
+        date_format_ok = due_dates.str.fullmatch(DATE_PATTERN).to_numpy(dtype=bool)
+        parsed_dates = pd.to_datetime(due_dates.where(date_format_ok), format="%Y-%m-%d", errors="coerce")
+        mask &= parsed_dates.notna().to_numpy()
+
+        domains_lowered = emails[mask].str.rsplit("@", n=1)
+        converted = {
+            "name": values["name"][mask].tolist(),
+            "governmentId": government_ids[mask].to_numpy().astype(np.int64).tolist(),
+            "email": [f"{local}@{domain.lower()}" for local, domain in domains_lowered],
+            "debtAmount": amounts[mask].to_numpy().astype(np.float64).tolist(),
+            "debtDueDate": parsed_dates[mask].dt.date.tolist(),
+            "debtId": [UUID(value) for value in debt_ids[mask]],
+        }
+        return mask, converted
+
+    @staticmethod
+    def _email_mask(emails: pd.Series) -> np.ndarray:
+        mask = emails.str.fullmatch(EMAIL_PATTERN).to_numpy(dtype=bool)
+        mask &= (emails.str.len() <= MAX_EMAIL_LENGTH).to_numpy(dtype=bool)
+        mask &= (emails.str.find("@") <= MAX_EMAIL_LOCAL_PART_LENGTH).to_numpy(dtype=bool)
+        top_level_domains = emails.str.rsplit(".", n=1).str[-1].str.lower()
+        mask &= ~top_level_domains.isin(SPECIAL_USE_DOMAIN_NAMES).to_numpy(dtype=bool)
+        return mask
+
+
+ROW_VALIDATORS = {
+    PydanticRowValidator.name: PydanticRowValidator,
+    ColumnarRowValidator.name: ColumnarRowValidator,
+}
+
+
+def build_row_validator(engine: str):
+    """
+    Cria o validador de linhas correspondente ao engine configurado.
+
+    Args:
+        engine (str): "pydantic" ou "columnar".
+
+    Raises:
+        ValueError: Se o engine não existir.
+    """
+    try:
+        return ROW_VALIDATORS[engine]()
+    except KeyError:
+        raise ValueError(
+            f"Invalid CSV validation engine '{engine}'. Expected one of: {', '.join(ROW_VALIDATORS)}."
+        )
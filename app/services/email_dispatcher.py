@@ -0,0 +1,224 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from email.message import EmailMessage
+from email.utils import getaddresses
+from typing import Dict, List, Optional, Sequence
+
+from loguru import logger
+
+from app.config import settings
+from app.core.metrics import (
+    NOTIFICATION_DISPATCH_RATE,
+    NOTIFICATION_EMAIL_SEND_SECONDS,
+    NOTIFICATION_EMAIL_THROTTLE_SECONDS,
+    NOTIFICATION_EMAILS,
+    SMTP_CONNECTIONS_OPENED,
+)
+from app.utils.token_bucket import TokenBucket, TokenBucketRegistry
+
+try:
+    import aiosmtplib
+except ImportError:  # pragma: no cover - aiosmtplib só é necessário com o envio de e-mails ativo
+    aiosmtplib = None
+
+
+class SmtpConnectionPool:
+    """
+    Pool de sessões SMTP persistentes.
+
+    Cada sessão (conexão, STARTTLS e login) é aberta uma vez e reutilizada por muitas
+    mensagens, até `messages_per_connection` envios, quando é encerrada e reaberta.
+    No máximo `size` sessões ficam abertas; quem chega com o pool cheio aguarda uma
+    sessão livre. Sessões derrubadas pelo servidor (ex.: timeout de inatividade) são
+    descartadas e o envio é repetido uma vez em uma sessão nova.
+    """
+
+    def __init__(
+        self,
+        host: str = settings.SMTP_HOST,
+        port: int = settings.SMTP_PORT,
+        size: int = settings.SMTP_POOL_SIZE,
+        username: Optional[str] = settings.SMTP_USERNAME,
+        password: Optional[str] = settings.SMTP_PASSWORD,
+        use_tls: bool = settings.SMTP_USE_TLS,
+        start_tls: bool = settings.SMTP_START_TLS,
+        timeout: float = settings.SMTP_TIMEOUT_SECONDS,
+        messages_per_connection: int = settings.SMTP_MESSAGES_PER_CONNECTION,
+    ):
+        if aiosmtplib is None:
+            raise RuntimeError("aiosmtplib is required to send e-mail notifications.")
+        self.host = host
+        self.port = port
+        self.size = max(1, size)
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.start_tls = start_tls
+        self.timeout = timeout
+        self.messages_per_connection = messages_per_connection
+        self._idle: List["aiosmtplib.SMTP"] = []
+        self._sent: Dict[int, int] = {}
+        self._slots = asyncio.Semaphore(self.size)
+
+    async def _open(self) -> "aiosmtplib.SMTP":
+        client = aiosmtplib.SMTP(
+            hostname=self.host,
+            port=self.port,
+            use_tls=self.use_tls,
+            start_tls=self.start_tls,
+            timeout=self.timeout,
+        )
+        await client.connect()
+        if self.username:
+            await client.login(self.username, self.password or "")
+        self._sent[id(client)] = 0
+        SMTP_CONNECTIONS_OPENED.inc()
+        return client
+
+    async def _discard(self, client: "aiosmtplib.SMTP"):
+        self._sent.pop(id(client), None)
+        try:
+            if client.is_connected:
+                await client.quit()
+        except Exception:
+            client.close()
+
+    @asynccontextmanager
+    async def connection(self):
+        """
+        Empresta uma sessão do pool.
+
+        A sessão volta para o pool se continuar conectada e abaixo do limite de envios;
+        caso contrário, é encerrada.
+        """
+        async with self._slots:
+            client = None
+            while self._idle and client is None:
+                client = self._idle.pop()
+                if not client.is_connected:
+                    await self._discard(client)
+                    client = None
+            if client is None:
+                client = await self._open()
+
+            try:
+                yield client
+            finally:
+                if client.is_connected and self._sent.get(id(client), 0) < self.messages_per_connection:
+                    self._idle.append(client)
+                else:
+                    await self._discard(client)
+
+    async def send(self, message: EmailMessage):
+        """
+        Envia uma mensagem por uma sessão do pool.
+
+        Args:
+            message (EmailMessage): Mensagem com remetente e destinatários.
+
+        Raises:
+            aiosmtplib.SMTPException: Se o servidor recusar a mensagem ou a sessão falhar duas vezes.
+        """
+        for attempt in range(2):
+            async with self.connection() as client:
+                try:
+                    await client.send_message(message)
+                except aiosmtplib.SMTPServerDisconnected:
+                    if attempt:
+                        raise
+                    continue
+                self._sent[id(client)] += 1
+                return
+
+    async def close(self):
+        """Encerra as sessões ociosas."""
+        idle, self._idle = self._idle, []
+        await asyncio.gather(*(self._discard(client) for client in idle))
+
+
+def recipient_domain(message: EmailMessage) -> str:
+    """Domínio do primeiro destinatário da mensagem."""
+    addresses = getaddresses(message.get_all("To", []))
+    if not addresses or "@" not in addresses[0][1]:
+        raise ValueError("E-mail message without a valid recipient.")
+    return addresses[0][1].rsplit("@", 1)[1].lower()
+
+
+class EmailDispatcher:
+    """
+    Envia e-mails em lote pelo `SmtpConnectionPool`, com limites de taxa.
+
+    Cada mensagem consome um token do balde do domínio do destinatário e um do balde
+    do provedor antes de ocupar uma sessão SMTP. Mensagens aguardando tokens não
+    seguram sessões, então um domínio limitado não atrasa os demais.
+    """
+
+    def __init__(
+        self,
+        pool: SmtpConnectionPool,
+        provider_rate: float = settings.NOTIFICATION_PROVIDER_RATE,
+        domain_rate: float = settings.NOTIFICATION_DOMAIN_RATE,
+        domain_rates: Optional[Dict[str, float]] = None,
+        burst_seconds: float = settings.NOTIFICATION_RATE_BURST_SECONDS,
+    ):
+        self.pool = pool
+        self.provider_bucket = TokenBucket(provider_rate, max(1.0, provider_rate * burst_seconds))
+        self.domain_buckets = TokenBucketRegistry(
+            domain_rate,
+            burst_seconds,
+            settings.NOTIFICATION_DOMAIN_RATES if domain_rates is None else domain_rates,
+        )
+
+    async def send(self, message: EmailMessage):
+        """
+        Envia uma mensagem respeitando os limites do domínio e do provedor.
+
+        Args:
+            message (EmailMessage): Mensagem a enviar.
+
+        Raises:
+            ValueError: Se a mensagem não tiver destinatário válido.
+            aiosmtplib.SMTPException: Se o envio falhar.
+        """
+        waiting_since = time.perf_counter()
+        await self.domain_buckets.get(recipient_domain(message)).acquire()
+        await self.provider_bucket.acquire()
+        sending_since = time.perf_counter()
+        NOTIFICATION_EMAIL_THROTTLE_SECONDS.observe(sending_since - waiting_since)
+
+        try:
+            await self.pool.send(message)
+        except Exception:
+            NOTIFICATION_EMAILS.labels(result="failed").inc()
+            raise
+        NOTIFICATION_EMAIL_SEND_SECONDS.observe(time.perf_counter() - sending_since)
+        NOTIFICATION_EMAILS.labels(result="sent").inc()
+
+    async def send_many(self, messages: Sequence[EmailMessage]) -> List[Optional[Exception]]:
+        """
+        Envia várias mensagens em paralelo, limitado pelas sessões do pool.
+
+        Args:
+            messages (Sequence[EmailMessage]): Mensagens a enviar.
+
+        Returns:
+            List[Optional[Exception]]: Erro de cada mensagem, na ordem da entrada (None se enviada).
+        """
+        if not messages:
+            return []
+        started_at = time.perf_counter()
+        results = await asyncio.gather(*(self.send(message) for message in messages), return_exceptions=True)
+        errors = [result if isinstance(result, Exception) else None for result in results]
+
+        elapsed = time.perf_counter() - started_at
+        failed = sum(error is not None for error in errors)
+        if elapsed > 0:
+            NOTIFICATION_DISPATCH_RATE.set((len(messages) - failed) / elapsed)
+        if failed:
+            logger.warning(f"{failed} of {len(messages)} e-mails failed.")
+        return errors
+
+    async def close(self):
+        """Encerra as sessões SMTP."""
+        await self.pool.close()
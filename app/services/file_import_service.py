@@ -0,0 +1,69 @@
+from typing import Iterable
+from uuid import UUID
+
+from loguru import logger
+
+from app.repositories.file_import_repository import FileImportRepository
+
+BOLETO_EXCHANGE = "boleto_exchange"
+BOLETO_ROUTING_KEY = "boleto.generate"
+
+
+class FileImportService:
+    """
+    Acompanha a importação de cada arquivo e dispara a geração de boletos em lote
+    quando todos os chunks do arquivo foram gravados.
+
+    A conclusão pode ser detectada em dois pontos: na gravação do último chunk
+    (ChunkProcessingService) ou ao fim da divisão, se todos os chunks já tiverem
+    sido gravados. Nos dois casos o job publicado é `{"file_id": ...}` em
+    `boleto.generate`, e a geração é idempotente.
+    """
+
+    def __init__(self, session_factory, publisher):
+        self.session_factory = session_factory
+        self.publisher = publisher
+
+    async def start(self, file_id: UUID):
+        """
+        Registra o início da importação, antes da publicação dos chunks.
+
+        Args:
+            file_id (UUID): ID do arquivo.
+        """
+        async with self.session_factory() as session:
+            async with session.begin():
+                await FileImportRepository(session).start(file_id)
+
+    async def finish_split(self, file_id: UUID, total_chunks: int):
+        """
+        Registra o total de chunks publicados e dispara os boletos se o arquivo já estiver concluído.
+
+        Args:
+            file_id (UUID): ID do arquivo.
+            total_chunks (int): Quantidade de chunks publicados.
+        """
+        async with self.session_factory() as session:
+            async with session.begin():
+                progress = await FileImportRepository(session).finish_split(file_id, total_chunks)
+
+        if progress is not None and progress.needs_boletos:
+            await self.request_boletos([file_id])
+
+    async def request_boletos(self, file_ids: Iterable[UUID]):
+        """
+        Publica o job de geração de boletos de cada arquivo concluído.
+
+        Args:
+            file_ids (Iterable[UUID]): Arquivos concluídos.
+        """
+        for file_id in file_ids:
+            await self.publisher.publish(
+                exchange=BOLETO_EXCHANGE,
+                routing_key=BOLETO_ROUTING_KEY,
+                message={"file_id": str(file_id)},
+            )
+            async with self.session_factory() as session:
+                async with session.begin():
+                    await FileImportRepository(session).mark_boletos_requested(file_id)
+            logger.info(f"All chunks of file {file_id} committed; boleto generation requested.")
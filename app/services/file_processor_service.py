@@ -1,24 +1,110 @@
 import csv
-from loguru import logger
-from uuid import uuid4
-from app.schemas.chunk import ChunkRow
-from typing import Generator, List
+import io
+import multiprocessing
 import os
 import json
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from loguru import logger
+from app.config import settings
+from app.schemas.chunk import ChunkSlice
+from app.services.csv_validation import build_row_validator
+from typing import Callable, Dict, Generator, Iterator, List, Sequence, Tuple, Union
+
+ByteRange = Tuple[int, int]
+ValidatedBatch = Tuple[List[dict], List[dict]]
+ChunkSize = Union[int, Callable[[], int]]
+
+# Validadores reaproveitados entre ranges processados pelo mesmo worker
+_worker_validators: Dict[str, object] = {}
+
+
+def validate_byte_range(
+    file_path: str,
+    byte_range: ByteRange,
+    fieldnames: Sequence[str],
+    validation_engine: str,
+    batch_size: int,
+) -> Tuple[List[dict], List[dict], int]:
+    """
+    Lê e valida um intervalo de bytes do arquivo. Executado nos workers do pool de processos.
+
+    Os números de linha retornados são relativos ao início do intervalo (base 1);
+    quem chama soma o deslocamento dos intervalos anteriores.
+
+    Args:
+        file_path (str): Caminho do arquivo.
+        byte_range (ByteRange): Início (inclusivo) e fim (exclusivo) do intervalo, alinhados a quebras de linha.
+        fieldnames (Sequence[str]): Cabeçalho do CSV.
+        validation_engine (str): Engine de validação.
+        batch_size (int): Linhas por lote de validação.
+
+    Returns:
+        Tuple[List[dict], List[dict], int]: Linhas válidas, linhas inválidas e total de linhas do intervalo.
+    """
+    validator = _worker_validators.get(validation_engine)
+    if validator is None:
+        validator = _worker_validators[validation_engine] = build_row_validator(validation_engine)
+
+    start, end = byte_range
+    with open(file_path, "rb") as file:
+        file.seek(start)
+        text = file.read(end - start).decode("utf-8")
+
+    if text.count('"') % 2 and end < os.path.getsize(file_path):
+        # O intervalo termina dentro de um campo entre aspas: os registros seriam cortados
+        raise ValueError(f"Byte range {start}-{end} ends inside a quoted field.")
+
+    reader = csv.reader(io.StringIO(text, newline=""))
+    rows = [row for row in reader if row]
+
+    valid_rows: List[dict] = []
+    invalid_rows: List[dict] = []
+    for offset in range(0, len(rows), batch_size):
+        batch_valid, batch_invalid = validator.validate_batch(fieldnames, rows[offset:offset + batch_size], offset + 1)
+        valid_rows.extend(batch_valid)
+        invalid_rows.extend(batch_invalid)
+    return valid_rows, invalid_rows, len(rows)
 
 
 class FileProcessorService:
     """
     Serviço para dividir arquivos em chunks para processamento paralelo.
+
+    A validação das linhas é feita em lotes pelo engine configurado em
+    `CSV_VALIDATION_ENGINE` ("pydantic" ou "columnar"); ambos produzem os mesmos
+    chunks e o mesmo relatório de linhas inválidas.
+
+    Arquivos grandes são divididos em intervalos de bytes alinhados a quebras de
+    linha e validados em paralelo por um pool de processos. Os resultados são
+    reagrupados na ordem do arquivo, gerando os mesmos chunks e o mesmo relatório
+    do processamento sequencial.
     """
 
-    def process_file(self, file_path: str, chunk_size: int = 200) -> Generator[List[dict], None, None]:
+    def __init__(
+        self,
+        validation_engine: str = settings.CSV_VALIDATION_ENGINE,
+        batch_size: int = settings.CSV_VALIDATION_BATCH_SIZE,
+        workers: int = settings.FILE_SPLIT_WORKERS,
+        parallel_min_bytes: int = settings.FILE_SPLIT_PARALLEL_MIN_BYTES,
+        range_bytes: int = settings.FILE_SPLIT_RANGE_BYTES,
+    ):
+        self.validation_engine = validation_engine
+        self.row_validator = build_row_validator(validation_engine)
+        self.batch_size = batch_size
+        self.workers = workers
+        self.parallel_min_bytes = parallel_min_bytes
+        self.range_bytes = range_bytes
+
+    def process_file(self, file_path: str, chunk_size: ChunkSize = 200) -> Generator[List[dict], None, None]:
         """
         Divide o arquivo em chunks.
 
         Args:
             file_path (str): Caminho do arquivo a ser processado.
-            chunk_size (int): Número de linhas por chunk.
+            chunk_size (ChunkSize): Número de linhas por chunk, ou função consultada
+                no início de cada chunk (ex.: `AdaptiveChunkSizer.current_size`).
 
         Yields:
             List[dict]: Um chunk contendo múltiplos registros validados.
@@ -28,26 +114,30 @@ class FileProcessorService:
         invalid_rows = []
 
         try:
-            with open(file_path, "r", encoding="utf-8") as file:
-                reader = csv.DictReader(file)
-                chunk = []
-                for i, row in enumerate(reader):
-                    row["debt_id"] = str(uuid4())  # Adiciona um ID único para cada dívida
-                    try:
-                        validated_row = ChunkRow(**row)  # Validação com Pydantic
-                        chunk.append(validated_row.dict())
-                        valid_lines += 1
-                    except Exception as e:
-                        logger.error(f"Invalid row at line {i + 1}: {e}")
-                        invalid_rows.append({"line_number": i + 1, "row": row, "error": str(e)})
-                        invalid_lines += 1
-
-                    if len(chunk) >= chunk_size:
+            if self._should_split_in_parallel(file_path):
+                batches = self._iter_parallel_batches(file_path)
+            else:
+                batches = self._iter_sequential_batches(file_path)
+
+            next_chunk_size = self._chunk_size_provider(chunk_size)
+            target_size = next_chunk_size()
+            chunk = []
+            for valid_rows, batch_invalid_rows in batches:
+                for invalid_row in batch_invalid_rows:
+                    logger.error(f"Invalid row at line {invalid_row['line_number']}: {invalid_row['error']}")
+                invalid_rows.extend(batch_invalid_rows)
+                invalid_lines += len(batch_invalid_rows)
+                valid_lines += len(valid_rows)
+
+                for valid_row in valid_rows:
+                    chunk.append(valid_row)
+                    if len(chunk) >= target_size:
                         yield chunk
                         chunk = []
+                        target_size = next_chunk_size()
 
-                if chunk:
-                    yield chunk
+            if chunk:
+                yield chunk
 
             # Log de linhas inválidas
             if invalid_rows:
@@ -62,6 +152,189 @@ class FileProcessorService:
             logger.error(f"Error processing file {file_path}: {e}")
             raise ValueError(f"Error processing file {file_path}: {e}")
 
+    @staticmethod
+    def _chunk_size_provider(chunk_size: ChunkSize) -> Callable[[], int]:
+        if callable(chunk_size):
+            return lambda: max(1, chunk_size())
+        return lambda: max(1, chunk_size)
+
+    def _should_split_in_parallel(self, file_path: str) -> bool:
+        return self.workers > 1 and os.path.getsize(file_path) >= self.parallel_min_bytes
+
+    def _iter_sequential_batches(self, file_path: str) -> Iterator[ValidatedBatch]:
+        """
+        Lê o arquivo em lotes de linhas e valida cada lote no processo atual.
+        """
+        with open(file_path, "r", encoding="utf-8", newline="") as file:
+            reader = csv.reader(file)
+            fieldnames = next(reader, None)
+            if fieldnames is None:
+                return
+
+            line_number = 1
+            # Linhas em branco são ignoradas, assim como no csv.DictReader
+            rows = (row for row in reader if row)
+            while True:
+                batch = list(islice(rows, self.batch_size))
+                if not batch:
+                    break
+                yield self.row_validator.validate_batch(fieldnames, batch, line_number)
+                line_number += len(batch)
+
+    def _iter_parallel_batches(self, file_path: str) -> Iterator[ValidatedBatch]:
+        """
+        Valida os intervalos de bytes do arquivo em um pool de processos, mantendo uma
+        janela limitada de intervalos em andamento e devolvendo os resultados na ordem do arquivo.
+        """
+        fieldnames, byte_ranges = self.split_byte_ranges(file_path, self.range_bytes)
+        if not byte_ranges:
+            return
+
+        logger.info(
+            f"Splitting file {file_path} into {len(byte_ranges)} byte ranges across {self.workers} processes."
+        )
+        executor = ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+        )
+        try:
+            remaining_ranges = iter(byte_ranges)
+            pending = deque()
+
+            def submit_next():
+                byte_range = next(remaining_ranges, None)
+                if byte_range is not None:
+                    pending.append(
+                        executor.submit(
+                            validate_byte_range,
+                            file_path,
+                            byte_range,
+                            fieldnames,
+                            self.validation_engine,
+                            self.batch_size,
+                        )
+                    )
+
+            for _ in range(self.workers * 2):
+                submit_next()
+
+            line_offset = 0
+            while pending:
+                valid_rows, invalid_rows, row_count = pending.popleft().result()
+                submit_next()
+
+                for invalid_row in invalid_rows:
+                    invalid_row["line_number"] += line_offset
+                line_offset += row_count
+                yield valid_rows, invalid_rows
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    @staticmethod
+    def split_byte_ranges(file_path: str, range_bytes: int) -> Tuple[List[str], List[ByteRange]]:
+        """
+        Divide o corpo do arquivo (sem o cabeçalho) em intervalos de bytes alinhados a quebras de linha.
+
+        Assim como em `plan_chunk_slices`, um intervalo só termina em uma quebra de linha
+        com número par de aspas desde o seu início: registros com quebras de linha dentro
+        de campos entre aspas não são divididos entre dois intervalos.
+
+        Args:
+            file_path (str): Caminho do arquivo.
+            range_bytes (int): Tamanho aproximado de cada intervalo.
+
+        Returns:
+            Tuple[List[str], List[ByteRange]]: Cabeçalho e intervalos (início inclusivo, fim exclusivo).
+        """
+        file_size = os.path.getsize(file_path)
+        with open(file_path, "rb") as file:
+            header_line = file.readline()
+            if not header_line:
+                return [], []
+            fieldnames = next(csv.reader([header_line.decode("utf-8")]))
+
+            byte_ranges = []
+            start = file.tell()
+            while start < file_size:
+                open_quotes = file.read(min(range_bytes, file_size - start)).count(b'"')
+                # Avança até o fim da linha corrente e, dentro de aspas, até o fim do registro
+                # (não faz nada no fim do arquivo)
+                line = file.readline()
+                open_quotes += line.count(b'"')
+                while open_quotes % 2 and line:
+                    line = file.readline()
+                    open_quotes += line.count(b'"')
+                end = file.tell()
+                byte_ranges.append((start, end))
+                start = end
+        return fieldnames, byte_ranges
+
+    @staticmethod
+    def read_fieldnames(file_path: str) -> List[str]:
+        """
+        Lê o cabeçalho do arquivo.
+
+        Args:
+            file_path (str): Caminho do arquivo.
+
+        Returns:
+            List[str]: Nomes das colunas, ou lista vazia se o arquivo estiver vazio.
+        """
+        with open(file_path, "r", encoding="utf-8", newline="") as file:
+            return next(csv.reader(file), [])
+
+    @classmethod
+    def plan_chunk_slices(cls, file_path: str, chunk_size: ChunkSize = 200) -> Generator[ChunkSlice, None, None]:
+        """
+        Planeja os chunks do arquivo como intervalos de bytes, sem validar as linhas.
+
+        Usado no modo claim-check: cada intervalo contém `chunk_size` registros do CSV
+        (linhas em branco não contam) e é validado uma única vez pelo consumidor de chunks.
+        Registros com quebras de linha dentro de campos entre aspas são mantidos inteiros,
+        pois um registro só termina em uma quebra de linha com número par de aspas.
+
+        Args:
+            file_path (str): Caminho do arquivo.
+            chunk_size (ChunkSize): Número de registros por chunk, ou função consultada no início de cada chunk.
+
+        Yields:
+            ChunkSlice: Intervalo de bytes de cada chunk, na ordem do arquivo.
+        """
+        with open(file_path, "rb") as file:
+            header_line = file.readline()
+            if not header_line:
+                return
+
+            next_chunk_size = cls._chunk_size_provider(chunk_size)
+            target_size = next_chunk_size()
+            position = start = len(header_line)
+            first_row = 1
+            row_count = 0
+            open_quotes = 0
+            for line in file:
+                position += len(line)
+                if not open_quotes and not line.strip(b"\r\n"):
+                    continue
+
+                open_quotes += line.count(b'"')
+                if open_quotes % 2:
+                    # O registro continua na próxima linha
+                    continue
+                open_quotes = 0
+
+                row_count += 1
+                if row_count >= target_size:
+                    yield ChunkSlice(start, position - start, first_row, row_count)
+                    first_row += row_count
+                    start = position
+                    row_count = 0
+                    target_size = next_chunk_size()
+
+            if open_quotes:
+                # Aspas não fechadas até o fim do arquivo: o csv.reader lê o restante como um registro
+                row_count += 1
+            if row_count:
+                yield ChunkSlice(start, position - start, first_row, row_count)
+
     @staticmethod
     def _log_invalid_rows(file_path: str, invalid_rows: List[dict]):
         """
@@ -78,4 +351,4 @@ class FileProcessorService:
         with open(invalid_log_path, "w", encoding="utf-8") as log_file:
             json.dump(invalid_rows, log_file, indent=4)
 
-        logger.info(f"Invalid rows logged to {invalid_log_path}")
\ No newline at end of file
+        logger.info(f"Invalid rows logged to {invalid_log_path}")
@@ -0,0 +1,107 @@
+from collections import OrderedDict
+from typing import Iterable, Set
+
+from loguru import logger
+
+from app.config import settings
+from app.core.metrics import KNOWN_USER_CACHE_HITS, KNOWN_USER_CACHE_MISSES, KNOWN_USER_CACHE_SIZE
+from app.repositories.user_repository import UserRepository
+
+
+class KnownUserCache:
+    """
+    Cache LRU limitado dos `government_id` que já existem na tabela `users`.
+
+    Usuários presentes no cache não são reenviados no upsert de usuários do chunk.
+    Só são adicionados ids de transações já confirmadas, então o cache não tem
+    falsos positivos, apenas entradas desatualizadas (ex.: usuário removido); nesse
+    caso a violação de chave estrangeira é tratada pelo ChunkProcessingService, que
+    descarta as entradas e regrava o chunk com todos os usuários.
+
+    Usado apenas no event loop; não é thread-safe.
+    """
+
+    def __init__(self, max_size: int = settings.KNOWN_USER_CACHE_SIZE):
+        self.max_size = max_size
+        self._ids: "OrderedDict[int, None]" = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def known(self, government_ids: Iterable[int]) -> Set[int]:
+        """
+        Retorna os ids presentes no cache, renovando a posição deles no LRU.
+
+        Args:
+            government_ids (Iterable[int]): Ids a consultar.
+
+        Returns:
+            Set[int]: Ids já conhecidos.
+        """
+        if not self.enabled:
+            return set()
+
+        hits = set()
+        misses = 0
+        for government_id in government_ids:
+            if government_id in self._ids:
+                self._ids.move_to_end(government_id)
+                hits.add(government_id)
+            else:
+                misses += 1
+
+        KNOWN_USER_CACHE_HITS.inc(len(hits))
+        KNOWN_USER_CACHE_MISSES.inc(misses)
+        return hits
+
+    def add(self, government_ids: Iterable[int]):
+        """
+        Registra ids cuja existência no banco foi confirmada por um commit.
+
+        Args:
+            government_ids (Iterable[int]): Ids confirmados.
+        """
+        if not self.enabled:
+            return
+
+        for government_id in government_ids:
+            self._ids[government_id] = None
+            self._ids.move_to_end(government_id)
+        while len(self._ids) > self.max_size:
+            self._ids.popitem(last=False)
+        KNOWN_USER_CACHE_SIZE.set(len(self._ids))
+
+    def discard(self, government_ids: Iterable[int]):
+        """Remove ids do cache."""
+        for government_id in government_ids:
+            self._ids.pop(government_id, None)
+        KNOWN_USER_CACHE_SIZE.set(len(self._ids))
+
+    async def warm(self, session_factory):
+        """
+        Carrega no cache os usuários mais recentes da tabela `users`.
+
+        Args:
+            session_factory: Fábrica de sessões assíncronas.
+        """
+        if not self.enabled:
+            return
+
+        try:
+            async with session_factory() as session:
+                government_ids = await UserRepository(session).get_recent_government_ids(self.max_size)
+        except Exception as e:
+            logger.warning(f"Could not warm the known-user cache: {e}")
+            return
+
+        # Os mais antigos primeiro, para que os mais recentes fiquem no fim do LRU
+        self.add(reversed(government_ids))
+        logger.info(f"Known-user cache warmed with {len(self._ids)} users.")
+
+
+# Cache compartilhado pelos consumidores de chunks do processo
+known_user_cache = KnownUserCache()
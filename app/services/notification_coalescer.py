@@ -0,0 +1,100 @@
+import asyncio
+from typing import List
+
+from loguru import logger
+
+from app.config import settings
+from app.core.metrics import NOTIFICATION_OUTBOX_CLAIMED
+from app.models.boletos import BoletoStatus
+from app.repositories.notification_outbox_repository import NotificationOutboxRepository
+from app.services.boleto_status_recorder import BoletoStatusRecorder
+from app.services.notification_service import NotificationService
+
+
+class NotificationCoalescer:
+    """
+    Agrupa as notificações de boletos por usuário antes do envio.
+
+    As mensagens de notificação só gravam os boletos na tabela `notification_outbox`
+    (`enqueue`), então o estado acumulado sobrevive a reinícios do worker. A cada
+    `poll_seconds`, `flush_ready` reserva os usuários cuja janela de `window_seconds`
+    (contada a partir do boleto mais antigo) venceu ou que acumularam `max_boletos`, e
+    envia um único e-mail por usuário pelo `NotificationService`.
+
+    A reserva é um lease de `lease_seconds`: boletos cujo envio falhou (ou cujo worker
+    caiu) voltam a ser enviados quando o lease vence. Boletos já notificados são
+    descartados pelo `NotificationService`, então o envio é pelo menos uma vez.
+    """
+
+    def __init__(
+        self,
+        session_factory,
+        notification_service: NotificationService,
+        status_recorder: BoletoStatusRecorder,
+        window_seconds: float = settings.NOTIFICATION_COALESCE_SECONDS,
+        max_boletos: int = settings.NOTIFICATION_COALESCE_MAX_BOLETOS,
+        max_users: int = settings.NOTIFICATION_OUTBOX_MAX_USERS,
+        poll_seconds: float = settings.NOTIFICATION_OUTBOX_POLL_SECONDS,
+        lease_seconds: float = settings.NOTIFICATION_OUTBOX_LEASE_SECONDS,
+    ):
+        self.session_factory = session_factory
+        self.notification_service = notification_service
+        self.status_recorder = status_recorder
+        self.window_seconds = window_seconds
+        self.max_boletos = max_boletos
+        self.max_users = max_users
+        self.poll_seconds = poll_seconds
+        self.lease_seconds = lease_seconds
+
+    async def enqueue(self, boletos: List[dict]):
+        """
+        Grava os boletos de uma mensagem na caixa de saída.
+
+        Args:
+            boletos (List[dict]): Boletos com `boleto_id` e `user_id`.
+        """
+        async with self.session_factory() as session:
+            async with session.begin():
+                await NotificationOutboxRepository(session).enqueue(boletos)
+
+    async def flush_ready(self) -> int:
+        """
+        Envia as notificações agrupadas dos usuários prontos.
+
+        Returns:
+            int: Quantidade de boletos notificados.
+        """
+        notified_total = 0
+        while True:
+            async with self.session_factory() as session:
+                async with session.begin():
+                    boletos = await NotificationOutboxRepository(session).claim_ready(
+                        self.window_seconds, self.max_boletos, self.max_users, self.lease_seconds
+                    )
+            if not boletos:
+                break
+            NOTIFICATION_OUTBOX_CLAIMED.inc(len(boletos))
+
+            result = await self.notification_service.notify_boletos(boletos)
+            await self.status_recorder.record(result.notified, BoletoStatus.NOTIFIED)
+            await self.status_recorder.record(result.failed, BoletoStatus.NOTIFICATION_FAILED)
+            # Boletos com falha continuam reservados e voltam quando o lease vencer
+            async with self.session_factory() as session:
+                async with session.begin():
+                    await NotificationOutboxRepository(session).delete(result.notified + result.skipped)
+            notified_total += len(result.notified)
+
+            users = len({boleto["user_id"] for boleto in boletos})
+            logger.info(f"Notified {len(result.notified)} boletos in {users} digests.")
+            if users < self.max_users:
+                break
+        return notified_total
+
+    async def run(self):
+        """Envia as notificações prontas a cada `poll_seconds`, até ser cancelado."""
+        while True:
+            try:
+                await self.flush_ready()
+            except Exception as e:
+                logger.error(f"Notification coalescer error: {e}")
+            await asyncio.sleep(self.poll_seconds)
@@ -1,31 +1,145 @@
+import asyncio
+from email.message import EmailMessage
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from uuid import UUID
+
 from loguru import logger
 
+from app.config import settings
+from app.core.content_store import ContentStore
+from app.core.metrics import NOTIFICATION_DIGEST_SIZE
+from app.repositories.boleto_repository import BoletoRepository
+from app.services.email_dispatcher import EmailDispatcher
+
+
+class NotificationDeliveryError(Exception):
+    """
+    Erro lançado quando parte dos e-mails de um lote não foi entregue.
+    """
+
+
+class NotificationResult(NamedTuple):
+    notified: List[UUID]  # boletos notificados agora
+    failed: List[UUID]  # boletos cujo envio falhou
+    skipped: List[UUID]  # boletos já notificados, com falha na geração ou sem pagador
+
+
 class NotificationService:
     """
     Serviço responsável por notificar os usuários sobre boletos gerados.
+
+    Os boletos de um lote são agrupados por pagador: cada usuário recebe um único
+    e-mail com todos os seus boletos (linha digitável e PDF em anexo, quando já
+    gerado), enviado pelo `EmailDispatcher` em paralelo com os dos demais usuários.
+    Os pagadores são buscados em uma única consulta por lote, que também descarta os
+    boletos já notificados. Sem dispatcher, as notificações são apenas registradas no log.
     """
 
-    def __init__(self):
-        # Aqui você pode configurar serviços externos de notificação, como email ou SMS
-        pass
+    def __init__(
+        self,
+        session_factory=None,
+        dispatcher: Optional[EmailDispatcher] = None,
+        store: Optional[ContentStore] = None,
+        sender: str = settings.NOTIFICATION_FROM_ADDRESS,
+    ):
+        if dispatcher is not None and session_factory is None:
+            raise ValueError("E-mail notifications require a session factory to look up the payers.")
+        self.session_factory = session_factory
+        self.dispatcher = dispatcher
+        self.store = store or ContentStore()
+        self.sender = sender
 
-    async def notify_user(self, user_id: str, boleto_id: str):
+    async def notify_boletos(self, boletos: List[dict]) -> NotificationResult:
         """
-        Notifica um usuário que um boleto foi gerado.
+        Notifica os pagadores de um lote de boletos, com um e-mail por usuário.
 
         Args:
-            user_id (str): ID do usuário.
-            boleto_id (str): ID do boleto gerado.
+            boletos (List[dict]): Boletos com `boleto_id` e `user_id`, e opcionalmente
+                `digitable_line` e `document_digest`.
+
+        Returns:
+            NotificationResult: Boletos notificados, com falha e ignorados.
 
         Raises:
-            ValueError: Se parâmetros obrigatórios estiverem faltando.
+            ValueError: Se algum boleto não tiver `user_id` ou `boleto_id`.
         """
-        if not user_id or not boleto_id:
-            raise ValueError("Both 'user_id' and 'boleto_id' are required for notification.")
-
-        try:
-            # Implementar aqui logica envio de notificaçao para usuario relacionado ao boleto.
-            logger.info(f"Notifying User ID: {user_id} about Boleto ID: {boleto_id}")
-        except Exception as e:
-            logger.error(f"Failed to notify user {user_id} about boleto {boleto_id}: {e}")
-            raise
+        for boleto in boletos:
+            if not boleto.get("user_id") or not boleto.get("boleto_id"):
+                raise ValueError("Both 'user_id' and 'boleto_id' are required for notification.")
+        ids = [UUID(str(boleto["boleto_id"])) for boleto in boletos]
+
+        if self.dispatcher is None:
+            for user_id, user_boletos in self._by_user(zip(ids, boletos)).items():
+                logger.info(f"Notifying User ID: {user_id} about {len(user_boletos)} boletos")
+            return NotificationResult(ids, [], [])
+
+        async with self.session_factory() as session:
+            recipients = await BoletoRepository(session).notification_recipients(ids)
+
+        digests = self._by_user(
+            (boleto_id, boleto) for boleto_id, boleto in zip(ids, boletos) if boleto_id in recipients
+        )
+        messages = await asyncio.gather(
+            *(self.build_email(*recipients[user_boletos[0][0]], user_boletos) for user_boletos in digests.values())
+        )
+        errors = await self.dispatcher.send_many(messages)
+
+        notified, failed = [], []
+        for (user_id, user_boletos), error in zip(digests.items(), errors):
+            digest_ids = [boleto_id for boleto_id, _ in user_boletos]
+            if error is None:
+                notified.extend(digest_ids)
+            else:
+                logger.error(f"Failed to notify user {user_id} about {len(digest_ids)} boletos: {error}")
+                failed.extend(digest_ids)
+            NOTIFICATION_DIGEST_SIZE.observe(len(digest_ids))
+        skipped = [boleto_id for boleto_id in ids if boleto_id not in recipients]
+        return NotificationResult(notified, failed, skipped)
+
+    @staticmethod
+    def _by_user(boletos: Iterable[Tuple[UUID, dict]]) -> Dict[int, List[Tuple[UUID, dict]]]:
+        """Agrupa os boletos por usuário, na ordem de chegada."""
+        grouped: Dict[int, List[Tuple[UUID, dict]]] = {}
+        for boleto_id, boleto in boletos:
+            grouped.setdefault(int(boleto["user_id"]), []).append((boleto_id, boleto))
+        return grouped
+
+    async def build_email(self, email: str, name: str, boletos: List[Tuple[UUID, dict]]) -> EmailMessage:
+        """
+        Monta o e-mail de um pagador com todos os seus boletos.
+
+        Args:
+            email (str): E-mail do pagador.
+            name (str): Nome do pagador.
+            boletos (List[Tuple[UUID, dict]]): ID e dados de cada boleto na mensagem de notificação.
+
+        Returns:
+            EmailMessage: E-mail pronto para envio.
+        """
+        message = EmailMessage()
+        message["From"] = self.sender
+        message["To"] = email
+        if len(boletos) == 1:
+            message["Subject"] = "Seu boleto está disponível"
+            lines = [f"Olá, {name}.", "", "Seu boleto foi gerado."]
+        else:
+            message["Subject"] = f"Você tem {len(boletos)} boletos disponíveis"
+            lines = [f"Olá, {name}.", "", f"Seus {len(boletos)} boletos foram gerados."]
+        for _, boleto in boletos:
+            if boleto.get("digitable_line"):
+                lines.append(f"Linha digitável: {boleto['digitable_line']}")
+        message.set_content("\n".join(lines))
+
+        for boleto_id, boleto in boletos:
+            digest = boleto.get("document_digest")
+            if not digest:
+                continue
+            try:
+                document = await asyncio.to_thread(self.store.get, digest)
+            except (FileNotFoundError, ValueError) as e:
+                logger.warning(f"Boleto {boleto_id} document {digest} unavailable: {e}")
+                continue
+            message.add_attachment(
+                document, maintype="application", subtype="pdf", filename=f"boleto-{boleto_id}.pdf"
+            )
+        return message
@@ -1,10 +1,32 @@
+import asyncio
+import hashlib
 import os
 import uuid
+from dataclasses import dataclass
+from typing import BinaryIO, Optional
 from loguru import logger
 from fastapi import UploadFile
+from app.config import settings
 from app.core.message_broker import MessageBroker
 
-TEMP_DIR = "/tmp"
+TEMP_DIR = settings.UPLOAD_DIR
+
+
+class FileTooLargeError(ValueError):
+    """
+    Erro lançado quando o arquivo enviado excede o tamanho máximo permitido.
+    """
+
+
+@dataclass(frozen=True)
+class StoredFile:
+    """
+    Metadados de um arquivo salvo em disco.
+    """
+
+    path: str
+    size: int
+    sha256: str
 
 
 class UploadService:
@@ -12,9 +34,17 @@ class UploadService:
     Serviço responsável por salvar arquivos temporariamente e enfileirar mensagens para processamento.
     """
 
-    def __init__(self, message_broker: MessageBroker, temp_dir: str = TEMP_DIR):
+    def __init__(
+        self,
+        message_broker: MessageBroker,
+        temp_dir: str = TEMP_DIR,
+        max_file_size: int = settings.UPLOAD_MAX_SIZE_BYTES,
+        block_size: int = settings.UPLOAD_BLOCK_SIZE_BYTES,
+    ):
         self.message_broker = message_broker
         self.temp_dir = temp_dir
+        self.max_file_size = max_file_size
+        self.block_size = block_size
         self.ensure_temp_dir_exists()
 
     def ensure_temp_dir_exists(self):
@@ -39,30 +69,107 @@ class UploadService:
             )
             raise ValueError("Only CSV files are allowed.")
 
-    async def save_file(self, file: UploadFile) -> str:
+    async def save_file(self, file: UploadFile) -> StoredFile:
         """
-        Salva o arquivo em um diretório temporário.
+        Salva o arquivo em um diretório temporário, em blocos de tamanho fixo.
+
+        O conteúdo nunca é carregado inteiro em memória: cada bloco lido do upload
+        é escrito em disco por uma thread auxiliar, sem bloquear o event loop, e o
+        tamanho e o SHA-256 são calculados durante a escrita.
 
         Args:
             file (UploadFile): Arquivo enviado pelo cliente.
 
         Returns:
-            str: Caminho completo do arquivo salvo.
+            StoredFile: Caminho, tamanho e SHA-256 do arquivo salvo.
+
+        Raises:
+            FileTooLargeError: Se o arquivo exceder o tamanho máximo permitido.
+            ValueError: Se houver erro ao salvar o arquivo.
         """
         file_path = os.path.join(self.temp_dir, file.filename)
+
+        # Falha rápida quando o cliente informa o tamanho do arquivo
+        if file.size is not None and file.size > self.max_file_size:
+            raise self._file_too_large(file)
+
         try:
-            with open(file_path, "wb") as temp_file:
-                temp_file.write(await file.read())
-            logger.info(f"File saved at {file_path}")
-            return file_path
+            size, sha256 = await self._stream_to_disk(file, file_path)
+            logger.info(
+                f"File saved at {file_path}",
+                extra={"file_name": file.filename, "size": size, "sha256": sha256},
+            )
+            return StoredFile(path=file_path, size=size, sha256=sha256)
+        except FileTooLargeError:
+            await asyncio.to_thread(self._remove_partial_file, file_path)
+            raise
         except Exception as e:
+            await asyncio.to_thread(self._remove_partial_file, file_path)
             logger.error(
                 "Failed to save file",
                 extra={"file_name": file.filename, "error": str(e)},
             )
             raise ValueError(f"Error saving file: {str(e)}")
 
-    async def enqueue_file(self, file_id: str, file_path: str, file_name: str):
+    async def _stream_to_disk(self, file: UploadFile, file_path: str):
+        """
+        Copia o upload para o disco bloco a bloco.
+
+        Args:
+            file (UploadFile): Arquivo enviado pelo cliente.
+            file_path (str): Caminho de destino.
+
+        Returns:
+            tuple: Tamanho em bytes e SHA-256 (hexadecimal) do conteúdo.
+        """
+        hasher = hashlib.sha256()
+        size = 0
+        temp_file = await asyncio.to_thread(open, file_path, "wb")
+        try:
+            while True:
+                block = await file.read(self.block_size)
+                if not block:
+                    break
+
+                size += len(block)
+                if size > self.max_file_size:
+                    raise self._file_too_large(file)
+
+                await asyncio.to_thread(self._write_block, temp_file, hasher, block)
+        finally:
+            await asyncio.to_thread(temp_file.close)
+
+        return size, hasher.hexdigest()
+
+    @staticmethod
+    def _write_block(temp_file: BinaryIO, hasher, block: bytes):
+        """Escreve um bloco em disco e atualiza o hash (executado fora do event loop)."""
+        temp_file.write(block)
+        hasher.update(block)
+
+    @staticmethod
+    def _remove_partial_file(file_path: str):
+        """Remove o arquivo parcialmente escrito, se existir."""
+        if os.path.exists(file_path):
+            os.remove(file_path)
+
+    def _file_too_large(self, file: UploadFile) -> FileTooLargeError:
+        logger.warning(
+            "File exceeds maximum allowed size.",
+            extra={"file_name": file.filename, "max_size": self.max_file_size},
+        )
+        return FileTooLargeError(
+            f"File exceeds the maximum allowed size of {self.max_file_size} bytes."
+        )
+
+    async def enqueue_file(
+        self,
+        file_id: str,
+        file_path: str,
+        file_name: str,
+        file_size: Optional[int] = None,
+        sha256: Optional[str] = None,
+    ):
         """
         Enfileira uma mensagem para processamento do arquivo.
 
@@ -70,12 +177,18 @@ class UploadService:
             file_id (str): Identificador único do arquivo.
             file_path (str): Caminho do arquivo salvo.
             file_name (str): Nome original do arquivo.
+            file_size (Optional[int]): Tamanho do arquivo em bytes.
+            sha256 (Optional[str]): SHA-256 do conteúdo do arquivo.
         """
         message = {
             "file_id": file_id,
             "file_name": file_name,
             "file_path": file_path,
         }
+        if file_size is not None:
+            message["file_size"] = file_size
+        if sha256 is not None:
+            message["sha256"] = sha256
         try:
             await self.message_broker.publish_to_queue(
                 exchange="file_exchange",
@@ -107,6 +220,12 @@ class UploadService:
         self.validate_file_format(file)
 
         file_id = str(uuid.uuid4())  # Gera um identificador único para o arquivo
-        file_path = await self.save_file(file)
-        await self.enqueue_file(file_id, file_path, file.filename)
+        stored_file = await self.save_file(file)
+        await self.enqueue_file(
+            file_id,
+            stored_file.path,
+            file.filename,
+            file_size=stored_file.size,
+            sha256=stored_file.sha256,
+        )
         return f"File {file.filename} uploaded and enqueued successfully with ID {file_id}."
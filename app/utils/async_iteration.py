@@ -0,0 +1,73 @@
+import asyncio
+import concurrent.futures
+import threading
+from typing import AsyncIterator, Callable, Iterable, TypeVar
+
+T = TypeVar("T")
+
+_ITEM = "item"
+_DONE = "done"
+_ERROR = "error"
+
+# Intervalo em que a thread produtora verifica se o consumidor desistiu da iteração
+_PRODUCER_POLL_SECONDS = 0.1
+
+
+async def iterate_in_thread(factory: Callable[[], Iterable[T]], max_queue_size: int = 8) -> AsyncIterator[T]:
+    """
+    Consome um iterável síncrono (e bloqueante) em uma thread auxiliar, entregando
+    os itens ao event loop por uma fila limitada.
+
+    A fila limitada aplica backpressure: a thread produtora fica bloqueada enquanto
+    houver `max_queue_size` itens aguardando consumo, o que mantém a memória limitada.
+    Exceções do iterável são propagadas para quem consome. Use com
+    `contextlib.aclosing` para que a thread seja liberada se a iteração for interrompida.
+
+    Args:
+        factory (Callable[[], Iterable[T]]): Função que cria o iterável, chamada na thread auxiliar.
+        max_queue_size (int): Número máximo de itens produzidos e ainda não consumidos.
+
+    Yields:
+        T: Itens produzidos pelo iterável.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+    stopped = threading.Event()
+
+    def put(entry) -> bool:
+        future = asyncio.run_coroutine_threadsafe(queue.put(entry), loop)
+        while True:
+            try:
+                future.result(timeout=_PRODUCER_POLL_SECONDS)
+                return True
+            except concurrent.futures.TimeoutError:
+                if stopped.is_set():
+                    future.cancel()
+                    return False
+
+    def produce():
+        iterator = iter(factory())
+        try:
+            for item in iterator:
+                if not put((_ITEM, item)):
+                    return
+            put((_DONE, None))
+        except BaseException as e:
+            put((_ERROR, e))
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
+
+    producer = loop.run_in_executor(None, produce)
+    try:
+        while True:
+            kind, value = await queue.get()
+            if kind == _DONE:
+                break
+            if kind == _ERROR:
+                raise value
+            yield value
+    finally:
+        stopped.set()
+        await producer
@@ -0,0 +1,44 @@
+from typing import List
+
+from app.schemas.chunk import CLAIM_CHECK_TRANSPORT, ChunkClaimCheck, ChunkSlice
+
+
+def build_claim_check(file_id: str, columns: List[str], chunk_slice: ChunkSlice) -> dict:
+    """
+    Monta a mensagem de um chunk no modo claim-check.
+
+    Args:
+        file_id (str): Identificador do arquivo no spool.
+        columns (List[str]): Cabeçalho do CSV.
+        chunk_slice (ChunkSlice): Intervalo de bytes do chunk.
+
+    Returns:
+        dict: Mensagem pronta para publicação.
+    """
+    return {
+        "transport": CLAIM_CHECK_TRANSPORT,
+        "file_id": str(file_id),
+        "offset": chunk_slice.offset,
+        "length": chunk_slice.length,
+        "first_row": chunk_slice.first_row,
+        "row_count": chunk_slice.row_count,
+        "columns": list(columns),
+    }
+
+
+def is_claim_check(message: dict) -> bool:
+    """Indica se a mensagem referencia um intervalo do spool em vez de carregar linhas."""
+    return message.get("transport") == CLAIM_CHECK_TRANSPORT
+
+
+def parse_claim_check(message: dict) -> ChunkClaimCheck:
+    """
+    Valida os campos de uma mensagem claim-check.
+
+    Args:
+        message (dict): Mensagem recebida.
+
+    Returns:
+        ChunkClaimCheck: Referência ao intervalo do chunk.
+    """
+    return ChunkClaimCheck(**{key: value for key, value in message.items() if key != "transport"})
@@ -1,18 +1,63 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Hashable, List, NamedTuple
+
 import aio_pika
-import json
+from aio_pika.abc import AbstractChannel
+from pamqp.commands import Basic
+from app.config import settings
+from app.core.codecs import encode_message, json_default
+from app.core.metrics import PUBLISH_CONFIRMS, PUBLISH_OUTSTANDING
 from app.core.rabbitmq_connection_params import RabbitMQConnectionParams
-from datetime import datetime, date
-from uuid import UUID
+from app.core.rabbitmq_connection_manager import RabbitMQConnectionManager
 from loguru import logger
 
 
+class PublishConfirmError(Exception):
+    """
+    Erro lançado quando publicações não foram confirmadas pelo broker, mesmo após as retentativas.
+    """
+
+    def __init__(self, unconfirmed: List[Hashable]):
+        self.unconfirmed = unconfirmed
+        super().__init__(f"{len(unconfirmed)} messages were not confirmed by the broker: {unconfirmed[:20]}")
+
+
 class MessagePublisher:
     """
     Serviço dedicado para publicar mensagens no RabbitMQ.
+
+    Utiliza a conexão persistente e o pool de canais do `RabbitMQConnectionManager`,
+    compartilhados por todos os publicadores com os mesmos parâmetros de conexão.
+
+    O corpo é serializado pelo codec configurado em `MESSAGE_CODEC` e identificado
+    pelo `content_type`/`content_encoding` da mensagem AMQP (ver `app.core.codecs`).
+
+    `publish` aguarda a confirmação de cada mensagem antes de retornar. Para fluxos
+    longos (ex.: os chunks de um arquivo), `confirm_window` mantém várias publicações
+    aguardando confirmação ao mesmo tempo.
     """
 
-    def __init__(self, connection_params: RabbitMQConnectionParams):
+    def __init__(
+        self,
+        connection_params: RabbitMQConnectionParams,
+        codec: str = settings.MESSAGE_CODEC,
+        compression_min_bytes: int = settings.MESSAGE_COMPRESSION_MIN_BYTES,
+    ):
         self.connection_params = connection_params
+        self.connection_manager = RabbitMQConnectionManager.for_params(connection_params)
+        self.codec = codec
+        self.compression_min_bytes = compression_min_bytes
+
+    def build_message(self, message: dict) -> aio_pika.Message:
+        """Serializa a mensagem com o codec configurado, como mensagem persistente."""
+        body, content_type, content_encoding = encode_message(message, self.codec, self.compression_min_bytes)
+        return aio_pika.Message(
+            body=body,
+            content_type=content_type,
+            content_encoding=content_encoding,
+            delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+        )
 
     async def publish(self, exchange: str, routing_key: str, message: dict):
         """
@@ -23,33 +68,160 @@ class MessagePublisher:
             routing_key (str): Chave de roteamento.
             message (dict): Mensagem a ser publicada.
         """
-        connection = await self.connection_params.get_connection()
-        async with connection:
-            channel = await connection.channel()
-            exchange_instance = await channel.get_exchange(exchange)
+        async with self.connection_manager.acquire_channel() as channel:
+            exchange_instance = await self.connection_manager.get_exchange(channel, exchange)
 
             try:
-                # Serializa a mensagem com tratamento de datetime
-                message_body = json.dumps(message, default=self._json_serializer)
-                await exchange_instance.publish(
-                    aio_pika.Message(
-                        body=message_body.encode(),
-                        delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
-                    ),
-                    routing_key=routing_key,
-                )
+                await exchange_instance.publish(self.build_message(message), routing_key=routing_key)
                 logger.info(f"Message published to exchange '{exchange}' with routing key '{routing_key}'")
             except Exception as e:
                 logger.error(f"Failed to publish message to exchange '{exchange}': {e}")
                 raise
 
-    @staticmethod
-    def _json_serializer(obj):
+    @asynccontextmanager
+    async def confirm_window(
+        self,
+        size: int = settings.PUBLISH_CONFIRM_WINDOW,
+        timeout: float = settings.PUBLISH_CONFIRM_TIMEOUT_SECONDS,
+        retries: int = settings.PUBLISH_CONFIRM_RETRIES,
+    ) -> AsyncIterator["ConfirmedPublishWindow"]:
         """
-        Serializador customizado para lidar com tipos não suportados pelo JSON, como datetime e UUID.
+        Abre uma janela de publicações confirmadas em um canal do pool.
+
+        Ao sair do bloco sem erro, aguarda todas as confirmações (ver `ConfirmedPublishWindow.drain`).
+
+        Args:
+            size (int): Publicações aguardando confirmação ao mesmo tempo.
+            timeout (float): Espera máxima pela confirmação de cada mensagem.
+            retries (int): Retentativas de cada mensagem não confirmada.
+
+        Yields:
+            ConfirmedPublishWindow: Janela para publicar as mensagens.
         """
-        if isinstance(obj, (datetime, date)):
-            return obj.isoformat()  # Converte datetime para string no formato ISO
-        if isinstance(obj, UUID):
-            return str(obj)  # Converte UUID para string
-        raise TypeError(f"Type {type(obj)} not serializable")
+        async with self.connection_manager.acquire_channel() as channel:
+            window = ConfirmedPublishWindow(self, channel, size, timeout, retries)
+            try:
+                yield window
+            except BaseException:
+                await window.cancel()
+                raise
+            await window.drain()
+
+    # Serializador JSON para datetime e UUID, mantido para compatibilidade
+    _json_serializer = staticmethod(json_default)
+
+
+class PendingPublish(NamedTuple):
+    tag: Hashable  # identificador escolhido por quem publica (ex.: índice do chunk)
+    exchange: str
+    routing_key: str
+    message: aio_pika.Message
+    attempt: int
+
+
+class ConfirmedPublishWindow:
+    """
+    Publicações com confirmação do broker em uma janela deslizante.
+
+    `publish` envia a mensagem e retorna sem esperar o ack, enquanto houver menos de
+    `size` mensagens aguardando confirmação; com a janela cheia, aguarda a próxima
+    confirmação. A vazão deixa de depender da latência de ida e volta ao broker.
+
+    Cada mensagem é identificada por uma `tag` de quem publica. Mensagens recusadas
+    (nack), sem confirmação em `timeout` segundos ou perdidas em uma queda do canal
+    são republicadas até `retries` vezes; `drain` aguarda todas as confirmações e
+    lança `PublishConfirmError` com as tags que continuaram sem confirmação.
+    """
+
+    def __init__(
+        self,
+        publisher: MessagePublisher,
+        channel: AbstractChannel,
+        size: int,
+        timeout: float,
+        retries: int,
+    ):
+        self.publisher = publisher
+        self.channel = channel
+        self.size = max(1, size)
+        self.timeout = timeout
+        self.retries = retries
+        self.confirmed = 0
+        self._slots = asyncio.Semaphore(self.size)
+        self._pending: Dict[asyncio.Task, PendingPublish] = {}
+        self._failed: List[PendingPublish] = []
+
+    async def publish(self, exchange: str, routing_key: str, message: dict, tag: Hashable):
+        """
+        Publica uma mensagem sem aguardar a confirmação.
+
+        Args:
+            exchange (str): Nome da exchange.
+            routing_key (str): Chave de roteamento.
+            message (dict): Mensagem a ser publicada.
+            tag (Hashable): Identificador da mensagem nos erros de confirmação.
+        """
+        await self._send(PendingPublish(tag, exchange, routing_key, self.publisher.build_message(message), 0))
+
+    async def _send(self, pending: PendingPublish):
+        await self._slots.acquire()
+        try:
+            if self.channel.is_closed:
+                await self.channel.reopen()
+            exchange = await self.publisher.connection_manager.get_exchange(self.channel, pending.exchange)
+        except BaseException:
+            self._slots.release()
+            raise
+        task = asyncio.ensure_future(
+            exchange.publish(pending.message, routing_key=pending.routing_key, timeout=self.timeout)
+        )
+        self._pending[task] = pending
+        PUBLISH_OUTSTANDING.inc()
+        task.add_done_callback(self._on_confirmation)
+
+    def _on_confirmation(self, task: asyncio.Task):
+        pending = self._pending.pop(task)
+        self._slots.release()
+        PUBLISH_OUTSTANDING.dec()
+        if task.cancelled():
+            return
+        error = task.exception()
+        if error is None and isinstance(task.result(), Basic.Ack):
+            self.confirmed += 1
+            PUBLISH_CONFIRMS.labels(result="ack").inc()
+            return
+        PUBLISH_CONFIRMS.labels(result="nack" if error is None else "error").inc()
+        logger.warning(f"Message {pending.tag!r} to '{pending.exchange}' not confirmed: {error or task.result()}")
+        self._failed.append(pending)
+
+    async def drain(self):
+        """
+        Aguarda as confirmações pendentes e republica as mensagens não confirmadas.
+
+        Raises:
+            PublishConfirmError: Se alguma mensagem continuar sem confirmação após as retentativas.
+        """
+        unconfirmed = []
+        while True:
+            if self._pending:
+                await asyncio.wait(list(self._pending))
+            if not self._failed:
+                break
+
+            failed, self._failed = self._failed, []
+            for pending in failed:
+                if pending.attempt >= self.retries:
+                    unconfirmed.append(pending.tag)
+                    continue
+                PUBLISH_CONFIRMS.labels(result="retry").inc()
+                await self._send(pending._replace(attempt=pending.attempt + 1))
+
+        if unconfirmed:
+            raise PublishConfirmError(unconfirmed)
+
+    async def cancel(self):
+        """Descarta a espera pelas confirmações pendentes."""
+        for task in list(self._pending):
+            task.cancel()
+        if self._pending:
+            await asyncio.wait(list(self._pending))
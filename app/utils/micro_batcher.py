@@ -0,0 +1,90 @@
+import asyncio
+from typing import Awaitable, Callable, Generic, List, Optional, Set, TypeVar
+
+from loguru import logger
+
+T = TypeVar("T")
+
+
+class MicroBatcher(Generic[T]):
+    """
+    Agrupa itens enviados por tarefas concorrentes em lotes, processados por uma
+    única chamada de `flush`.
+
+    Um lote é enviado quando a soma dos tamanhos atinge `max_size` ou quando o
+    primeiro item do lote espera `linger_seconds`. Quem chamou `submit` só retorna
+    depois que o lote foi processado, ou recebe a exceção do `flush`.
+    """
+
+    def __init__(
+        self,
+        flush: Callable[[List[T]], Awaitable[None]],
+        max_size: int,
+        linger_seconds: float,
+        size_of: Callable[[T], int] = lambda item: 1,
+    ):
+        self.flush = flush
+        self.max_size = max_size
+        self.linger_seconds = linger_seconds
+        self.size_of = size_of
+        self._items: List[T] = []
+        self._futures: List[asyncio.Future] = []
+        self._size = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flushing: Set[asyncio.Task] = set()
+
+    async def submit(self, item: T):
+        """
+        Adiciona um item ao lote corrente e aguarda o processamento do lote.
+
+        Args:
+            item (T): Item a ser processado.
+
+        Raises:
+            Exception: A exceção lançada pelo `flush` do lote.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._items.append(item)
+        self._futures.append(future)
+        self._size += self.size_of(item)
+
+        if self._size >= self.max_size:
+            self._flush_pending()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.linger_seconds, self._flush_pending)
+
+        await future
+
+    def _flush_pending(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        items, futures = self._items, self._futures
+        self._items, self._futures, self._size = [], [], 0
+        if not items:
+            return
+
+        task = asyncio.create_task(self._run_flush(items, futures))
+        self._flushing.add(task)
+        task.add_done_callback(self._flushing.discard)
+
+    async def _run_flush(self, items: List[T], futures: List[asyncio.Future]):
+        try:
+            await self.flush(items)
+        except Exception as e:
+            logger.warning(f"Batch of {len(items)} items failed: {e}")
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for future in futures:
+                if not future.done():
+                    future.set_result(None)
+
+    async def close(self):
+        """Envia o lote pendente e aguarda os lotes em andamento."""
+        self._flush_pending()
+        if self._flushing:
+            await asyncio.gather(*self._flushing, return_exceptions=True)
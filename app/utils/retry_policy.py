@@ -0,0 +1,55 @@
+import random
+from typing import Callable, Optional, Sequence
+
+from app.config import settings
+
+
+class RetryPolicy:
+    """
+    Escalonamento das retentativas de mensagens em níveis de atraso.
+
+    A n-ésima retentativa de uma mensagem (contada pelo header `x-retry-count`) espera
+    `delays[n]` segundos; a partir do último nível, o atraso se repete. Depois de
+    `max_retries` retentativas, `delay_for` retorna None e a mensagem vai para a DLQ.
+
+    Cada nível é uma fila com TTL (`x-message-ttl`). O jitter é aplicado como
+    `expiration` da mensagem, sempre para baixo, para espalhar as mensagens que
+    falharam juntas (ex.: em uma queda do banco) sem ultrapassar o TTL da fila.
+    """
+
+    def __init__(
+        self,
+        delays: Sequence[float] = settings.RETRY_DELAYS_SECONDS,
+        max_retries: int = settings.RETRY_MAX_ATTEMPTS,
+        jitter: float = settings.RETRY_JITTER,
+        rand: Callable[[], float] = random.random,
+    ):
+        if not delays:
+            raise ValueError("At least one retry delay is required.")
+        self.delays = sorted(set(float(delay) for delay in delays))
+        self.max_retries = max_retries
+        self.jitter = min(max(jitter, 0.0), 1.0)
+        self._random = rand
+
+    def delay_for(self, retry_count: int) -> Optional[float]:
+        """
+        Nível de atraso da próxima retentativa.
+
+        Args:
+            retry_count (int): Retentativas já feitas.
+
+        Returns:
+            Optional[float]: Atraso do nível em segundos, ou None se as retentativas acabaram.
+        """
+        if retry_count >= self.max_retries:
+            return None
+        return self.delays[min(retry_count, len(self.delays) - 1)]
+
+    def expiration_for(self, delay: float) -> float:
+        """Atraso com jitter, entre `delay * (1 - jitter)` e `delay`."""
+        return delay * (1 - self.jitter * self._random())
+
+    @staticmethod
+    def label(delay: float) -> str:
+        """Sufixo do nível nos nomes de fila e chaves de roteamento (ex.: `10s`)."""
+        return f"{delay:g}s"
@@ -0,0 +1,100 @@
+from typing import Generic, List, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class HierarchicalTimeWheel(Generic[T]):
+    """
+    Agenda itens por prazo em uma roda de tempo hierárquica.
+
+    O nível 0 tem um slot por tick; cada nível seguinte cobre a volta inteira do
+    nível anterior em cada slot (ex.: minutos, horas, dias). Inserir e liberar um
+    item custa O(1) por nível, independentemente de quantos itens estão agendados:
+    quando o tempo entra no intervalo de um slot de nível superior, os itens dele
+    descem para o nível de baixo. Prazos além da última volta ficam em uma lista
+    de overflow, reavaliada a cada volta completa.
+
+    Os tempos são números (ex.: `time.time()`); o tick define a precisão da liberação.
+    """
+
+    def __init__(self, tick_seconds: float, slots_per_level: Sequence[int], start: float):
+        if tick_seconds <= 0 or not slots_per_level or any(slots < 2 for slots in slots_per_level):
+            raise ValueError("tick_seconds must be positive and every level needs at least 2 slots.")
+        self.tick_seconds = tick_seconds
+        self.slots_per_level = tuple(slots_per_level)
+        # Ticks cobertos por um slot de cada nível
+        self._spans: List[int] = []
+        span = 1
+        for slots in self.slots_per_level:
+            self._spans.append(span)
+            span *= slots
+        self._full_turn = span
+        self._levels: List[List[List[Tuple[int, T]]]] = [[[] for _ in range(slots)] for slots in self.slots_per_level]
+        self._overflow: List[Tuple[int, T]] = []
+        self._ready: List[T] = []
+        self._current_tick = self._tick_of(start)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _tick_of(self, moment: float) -> int:
+        return int(moment // self.tick_seconds)
+
+    def add(self, deadline: float, item: T):
+        """
+        Agenda um item. Prazos já vencidos são liberados no próximo `advance`.
+
+        Args:
+            deadline (float): Momento da liberação.
+            item (T): Item agendado.
+        """
+        self._size += 1
+        self._place(self._tick_of(deadline), item)
+
+    def _place(self, deadline_tick: int, item: T):
+        if deadline_tick <= self._current_tick:
+            self._ready.append(item)
+            return
+        for level, (span, slots) in enumerate(zip(self._spans, self.slots_per_level)):
+            if deadline_tick // span - self._current_tick // span < slots:
+                self._levels[level][(deadline_tick // span) % slots].append((deadline_tick, item))
+                return
+        self._overflow.append((deadline_tick, item))
+
+    def advance(self, now: float) -> List[T]:
+        """
+        Avança a roda até `now` e retorna os itens cujo prazo chegou.
+
+        Args:
+            now (float): Momento atual.
+
+        Returns:
+            List[T]: Itens liberados, na ordem dos ticks.
+        """
+        target_tick = self._tick_of(now)
+        while self._current_tick < target_tick:
+            self._current_tick += 1
+            tick = self._current_tick
+
+            if tick % self._full_turn == 0 and self._overflow:
+                overflow, self._overflow = self._overflow, []
+                for deadline_tick, item in overflow:
+                    self._place(deadline_tick, item)
+
+            # Os níveis superiores descem antes da leitura do nível 0
+            for level in range(len(self._spans) - 1, 0, -1):
+                span = self._spans[level]
+                if tick % span == 0:
+                    slot_index = (tick // span) % self.slots_per_level[level]
+                    entries, self._levels[level][slot_index] = self._levels[level][slot_index], []
+                    for deadline_tick, item in entries:
+                        self._place(deadline_tick, item)
+
+            slot_index = tick % self.slots_per_level[0]
+            entries, self._levels[0][slot_index] = self._levels[0][slot_index], []
+            self._ready.extend(item for _, item in entries)
+
+        ready, self._ready = self._ready, []
+        self._size -= len(ready)
+        return ready
@@ -0,0 +1,86 @@
+import asyncio
+import time
+from typing import Callable, Dict, Optional
+
+
+class TokenBucket:
+    """
+    Limitador de taxa por token bucket.
+
+    O balde começa cheio com `capacity` tokens e ganha `rate` tokens por segundo,
+    então até `capacity` chamadas passam de imediato (rajada) e, depois disso, a
+    vazão converge para `rate` por segundo. Quem chama `acquire` sem tokens
+    disponíveis dorme o tempo exato até o próximo token, sem ocupar o event loop.
+    """
+
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic):
+        if rate <= 0 or capacity < 1:
+            raise ValueError("TokenBucket requires a positive rate and a capacity of at least 1 token.")
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self._tokens = capacity
+        self._updated_at = clock()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = self.clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def try_acquire(self, tokens: float = 1) -> bool:
+        """
+        Consome tokens se estiverem disponíveis, sem esperar.
+
+        Returns:
+            bool: True se os tokens foram consumidos.
+        """
+        self._refill()
+        if self._tokens >= tokens:
+            self._tokens -= tokens
+            return True
+        return False
+
+    async def acquire(self, tokens: float = 1):
+        """
+        Consome tokens, aguardando até que estejam disponíveis.
+
+        As esperas são atendidas em ordem de chegada.
+
+        Args:
+            tokens (float): Tokens a consumir.
+        """
+        async with self._lock:
+            while not self.try_acquire(tokens):
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+
+
+class TokenBucketRegistry:
+    """
+    Um `TokenBucket` por chave (ex.: domínio do destinatário), criado no primeiro uso.
+
+    Chaves com limite próprio em `overrides` usam essa taxa; as demais usam `rate`.
+    A capacidade de cada balde é `burst_seconds` segundos de vazão.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst_seconds: float = 1.0,
+        overrides: Optional[Dict[str, float]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.rate = rate
+        self.burst_seconds = burst_seconds
+        self.overrides = {key.lower(): value for key, value in (overrides or {}).items()}
+        self.clock = clock
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    def get(self, key: str) -> TokenBucket:
+        """Balde da chave, criado na primeira chamada."""
+        key = key.lower()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            rate = self.overrides.get(key, self.rate)
+            bucket = self._buckets[key] = TokenBucket(rate, max(1.0, rate * self.burst_seconds), self.clock)
+        return bucket
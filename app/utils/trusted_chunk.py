@@ -0,0 +1,122 @@
+import hashlib
+import hmac
+import json
+from datetime import date
+from typing import List, Optional, Tuple
+from uuid import UUID
+
+from app.config import settings
+from app.schemas.chunk import IngestRow, TRUSTED_CHUNK_COLUMNS, TRUSTED_CHUNK_SCHEMA_VERSION
+
+
+def _signing_key(key: Optional[str]) -> Optional[str]:
+    """Chave informada ou `CHUNK_SIGNING_KEY`; None (ou vazia) desativa a assinatura."""
+    key = settings.CHUNK_SIGNING_KEY if key is None else key
+    return key or None
+
+
+def _signature(file_id: str, schema_version: int, rows: list, key: str) -> str:
+    """
+    HMAC-SHA256 sobre a forma canônica (JSON compacto) do conteúdo do chunk.
+    """
+    canonical = json.dumps([file_id, schema_version, rows], separators=(",", ":"))
+    return hmac.new(key.encode(), canonical.encode(), hashlib.sha256).hexdigest()
+
+
+def build_trusted_chunk(file_id: str, chunk: List[dict], key: Optional[str] = None) -> dict:
+    """
+    Monta a mensagem de um chunk gerado e validado pelo nosso splitter.
+
+    As linhas são enviadas como listas na ordem de `TRUSTED_CHUNK_COLUMNS`, junto com
+    a versão do contrato e uma assinatura HMAC que comprova a origem e a integridade.
+    Sem chave configurada, a mensagem segue sem assinatura e o consumidor de chunks
+    valida todas as linhas.
+
+    Args:
+        file_id (str): Identificador do arquivo original.
+        chunk (List[dict]): Linhas validadas (formato de `ChunkRow.dict()`).
+        key (Optional[str]): Chave compartilhada de assinatura (padrão: `CHUNK_SIGNING_KEY`).
+
+    Returns:
+        dict: Mensagem pronta para publicação.
+    """
+    file_id = str(file_id)
+    rows = [
+        [
+            row["name"],
+            row["governmentId"],
+            row["email"],
+            row["debtAmount"],
+            row["debtDueDate"].isoformat(),
+            str(row["debtId"]),
+        ]
+        for row in chunk
+    ]
+    key = _signing_key(key)
+    return {
+        "file_id": file_id,
+        "schema_version": TRUSTED_CHUNK_SCHEMA_VERSION,
+        "columns": list(TRUSTED_CHUNK_COLUMNS),
+        "rows": rows,
+        "signature": _signature(file_id, TRUSTED_CHUNK_SCHEMA_VERSION, rows, key) if key else None,
+    }
+
+
+def is_trusted_chunk(message: dict, key: Optional[str] = None) -> bool:
+    """
+    Verifica se a mensagem segue o contrato de chunk confiável e se a assinatura confere.
+
+    Args:
+        message (dict): Mensagem recebida.
+        key (Optional[str]): Chave compartilhada de assinatura (padrão: `CHUNK_SIGNING_KEY`).
+
+    Returns:
+        bool: True se o chunk pode ser processado sem revalidação; sempre False sem chave.
+    """
+    key = _signing_key(key)
+    if key is None:
+        return False
+    if message.get("schema_version") != TRUSTED_CHUNK_SCHEMA_VERSION:
+        return False
+    if tuple(message.get("columns") or ()) != TRUSTED_CHUNK_COLUMNS:
+        return False
+
+    signature = message.get("signature")
+    rows = message.get("rows")
+    if not isinstance(signature, str) or not isinstance(rows, list):
+        return False
+
+    expected = _signature(str(message.get("file_id")), TRUSTED_CHUNK_SCHEMA_VERSION, rows, key)
+    return hmac.compare_digest(signature, expected)
+
+
+def decode_trusted_chunk(message: dict) -> Tuple[UUID, List[IngestRow]]:
+    """
+    Converte um chunk confiável (já verificado) em linhas prontas para inserção.
+
+    Args:
+        message (dict): Mensagem verificada com `is_trusted_chunk`.
+
+    Returns:
+        Tuple[UUID, List[IngestRow]]: ID do arquivo e linhas tipadas.
+    """
+    rows = [
+        IngestRow(name, government_id, email, debt_amount, date.fromisoformat(due_date), UUID(debt_id))
+        for name, government_id, email, debt_amount, due_date, debt_id in message["rows"]
+    ]
+    return UUID(message["file_id"]), rows
+
+
+def untrusted_rows_as_dicts(message: dict) -> Optional[List[dict]]:
+    """
+    Converte as linhas de uma mensagem no formato de chunk confiável, mas sem assinatura
+    válida, para dicionários que passam pela validação completa.
+
+    Returns:
+        Optional[List[dict]]: Linhas como dicionários, ou None se a mensagem não tiver linhas.
+    """
+    rows = message.get("rows")
+    if not isinstance(rows, list):
+        return None
+    columns = message.get("columns") or TRUSTED_CHUNK_COLUMNS
+    return [dict(zip(columns, row)) for row in rows]
@@ -0,0 +1,278 @@
+"""
+Processo de workers: executa os consumidores fora da API, em vários processos.
+
+Uso:
+    python -m app.worker --queues chunk,boleto --processes 8
+
+O processo principal apenas supervisiona: inicia `--processes` processos filhos,
+cada um com o seu event loop executando os consumidores das filas escolhidas,
+reinicia os que terminarem com erro e, ao receber SIGTERM/SIGINT, repassa o sinal
+e aguarda os filhos drenarem as mensagens em processamento.
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import signal
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+from loguru import logger
+from prometheus_client import start_http_server
+
+from app.config import settings
+from app.consumers.base_consumer import BaseConsumer
+from app.consumers.boleto_generation_consumer import BoletoGenerationConsumer
+from app.consumers.chunk_processing_consumer import ChunkProcessingConsumer
+from app.consumers.file_processing_consumer import FileProcessingConsumer
+from app.consumers.notification_consumer import NotificationConsumer
+from app.core.database import dispose_engines, get_session_factory
+from app.core.metrics import monitor_event_loop_lag
+from app.core.rabbitmq_connection_manager import RabbitMQConnectionManager
+from app.core.rabbitmq_connection_params import RabbitMQConnectionParams
+from app.services.boleto_scheduler import BoletoScheduler
+from app.services.known_user_cache import known_user_cache
+from app.utils.message_publisher import MessagePublisher
+
+# Consumidores disponíveis, pelo nome usado em `--queues`
+CONSUMERS: Dict[str, Callable[[RabbitMQConnectionParams], BaseConsumer]] = {
+    "file": FileProcessingConsumer,
+    "chunk": ChunkProcessingConsumer,
+    "boleto": BoletoGenerationConsumer,
+    "notification": NotificationConsumer,
+}
+
+# Filhos que terminam antes disso são reiniciados com espera crescente, até o máximo
+RESTART_STABLE_SECONDS = 30.0
+RESTART_BACKOFF_MAX_SECONDS = 60.0
+
+
+def parse_queues(value: str) -> List[str]:
+    """
+    Converte a lista de filas separada por vírgulas.
+
+    A fila `file` exige a fila `chunk` no mesmo processo: o tamanho dos chunks
+    (`AdaptiveChunkSizer`) é ajustado pela latência medida pelos consumidores de
+    chunks do próprio processo.
+
+    Raises:
+        ValueError: Se alguma fila não for conhecida, ou se `file` vier sem `chunk`.
+    """
+    queues = [name.strip() for name in value.split(",") if name.strip()]
+    unknown = [name for name in queues if name not in CONSUMERS]
+    if unknown or not queues:
+        raise ValueError(f"Invalid queues {unknown or value!r}. Expected some of: {', '.join(CONSUMERS)}.")
+    if "file" in queues and "chunk" not in queues:
+        raise ValueError("The 'file' queue requires the 'chunk' queue in the same process to size its chunks.")
+    return queues
+
+
+def configure_logging(name: str):
+    """Envia os logs do processo para o logstash, identificados pelo nome do processo."""
+    logger.remove()
+    logger.add(
+        "tcp://logstash:5044",
+        level="INFO",
+        format="{time} {level} {message} {extra}",
+        serialize=True,
+    )
+    logger.configure(extra={"process": name, "pid": os.getpid()})
+
+
+async def run_worker(queues: Sequence[str], index: int, run_scheduler: bool):
+    """
+    Executa os consumidores das filas até receber SIGTERM/SIGINT.
+
+    Args:
+        queues (Sequence[str]): Nomes das filas (ver `CONSUMERS`).
+        index (int): Índice do processo no supervisor.
+        run_scheduler (bool): Se este processo executa o agendador de boletos.
+
+    Raises:
+        RuntimeError: Se algum consumidor parar sem ter sido solicitado.
+    """
+    connection_params = RabbitMQConnectionParams(host=settings.RABBITMQ_HOST, port=settings.RABBITMQ_PORT)
+    # Os sinais são tratados antes da declaração das filas: um SIGTERM durante a conexão
+    # com o broker não deve derrubar o processo sem passar pelo encerramento
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(signum, stopping.set)
+
+    consumers = [CONSUMERS[name](connection_params) for name in queues]
+    for consumer in consumers:
+        await consumer.declare_infrastructure()
+
+    background_tasks = [asyncio.create_task(monitor_event_loop_lag(settings.EVENT_LOOP_LAG_INTERVAL_SECONDS))]
+    for consumer in consumers:
+        if isinstance(consumer, ChunkProcessingConsumer):
+            background_tasks.append(asyncio.create_task(known_user_cache.warm(get_session_factory("worker"))))
+        if isinstance(consumer, NotificationConsumer) and consumer.coalescer is not None:
+            background_tasks.append(asyncio.create_task(consumer.coalescer.run()))
+    if run_scheduler:
+        scheduler = BoletoScheduler(get_session_factory("worker"), MessagePublisher(connection_params))
+        background_tasks.append(asyncio.create_task(scheduler.run()))
+
+    consumer_tasks = [asyncio.create_task(consumer.start_consuming()) for consumer in consumers]
+    stop_task = asyncio.create_task(stopping.wait())
+    logger.info(f"Worker {index} consuming {', '.join(queues)}.")
+    try:
+        done, _ = await asyncio.wait([stop_task, *consumer_tasks], return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        # Para de receber mensagens e aguarda as que estão em processamento
+        for task in background_tasks:
+            task.cancel()
+        await asyncio.gather(*(consumer.stop() for consumer in consumers))
+        stop_task.cancel()
+        await RabbitMQConnectionManager.close_all()
+        await dispose_engines()
+
+    if stop_task not in done:
+        crashed = next(task for task in consumer_tasks if task in done)
+        error = None if crashed.cancelled() else crashed.exception()
+        raise RuntimeError(f"Consumer stopped unexpectedly: {error or 'connection closed'}")
+    logger.info(f"Worker {index} stopped.")
+
+
+def worker_main(queues: Sequence[str], index: int, run_scheduler: bool):
+    """Ponto de entrada de cada processo filho."""
+    configure_logging(f"worker-{index}")
+    if settings.WORKER_METRICS_PORT:
+        start_http_server(settings.WORKER_METRICS_PORT + index)
+    try:
+        asyncio.run(run_worker(queues, index, run_scheduler))
+    except Exception as e:
+        logger.error(f"Worker {index} failed: {e}")
+        sys.exit(1)
+
+
+class WorkerSupervisor:
+    """
+    Supervisiona os processos de workers.
+
+    Filhos que terminam com erro (ou são encerrados pelo sistema) são reiniciados;
+    se morrerem em menos de `RESTART_STABLE_SECONDS`, o reinício espera o dobro da
+    vez anterior, até `RESTART_BACKOFF_MAX_SECONDS`. No desligamento, cada filho
+    recebe SIGTERM e tem `shutdown_timeout` segundos para drenar antes do SIGKILL.
+
+    Só o processo de índice 0 executa o agendador de boletos.
+    """
+
+    def __init__(
+        self,
+        queues: Sequence[str],
+        processes: int,
+        run_scheduler: bool = settings.BOLETO_SCHEDULER_ENABLED,
+        shutdown_timeout: float = settings.WORKER_SHUTDOWN_TIMEOUT_SECONDS,
+        target: Callable = worker_main,
+        context=None,
+    ):
+        self.queues = list(queues)
+        self.processes = max(1, processes)
+        self.run_scheduler = run_scheduler
+        self.shutdown_timeout = shutdown_timeout
+        self.target = target
+        self.context = context or multiprocessing.get_context("spawn")
+        self.children: Dict[int, multiprocessing.Process] = {}
+        self._started_at: Dict[int, float] = {}
+        self._backoff: Dict[int, float] = {}
+        self._restart_at: Dict[int, float] = {}
+        self._stopping = False
+
+    def _spawn(self, index: int):
+        process = self.context.Process(
+            target=self.target,
+            args=(self.queues, index, self.run_scheduler and index == 0),
+            name=f"worker-{index}",
+        )
+        process.start()
+        self.children[index] = process
+        self._started_at[index] = time.monotonic()
+        logger.info(f"Started worker {index} (pid {process.pid}).")
+
+    def start(self):
+        """Inicia todos os processos."""
+        for index in range(self.processes):
+            self._spawn(index)
+
+    def check(self):
+        """Reinicia os processos que terminaram, respeitando a espera de cada um."""
+        now = time.monotonic()
+        for index, process in list(self.children.items()):
+            if process.is_alive():
+                continue
+            if index not in self._restart_at:
+                uptime = now - self._started_at[index]
+                backoff = 0.0
+                if uptime < RESTART_STABLE_SECONDS:
+                    backoff = min(max(1.0, self._backoff.get(index, 0.0) * 2), RESTART_BACKOFF_MAX_SECONDS)
+                self._backoff[index] = backoff
+                self._restart_at[index] = now + backoff
+                logger.warning(
+                    f"Worker {index} (pid {process.pid}) exited with code {process.exitcode}; "
+                    f"restarting in {backoff:.0f}s."
+                )
+            if now >= self._restart_at[index]:
+                del self._restart_at[index]
+                self._spawn(index)
+
+    def stop(self):
+        """Envia SIGTERM aos processos e aguarda a drenagem, forçando o encerramento após o timeout."""
+        self._stopping = True
+        for process in self.children.values():
+            if process.is_alive():
+                process.terminate()
+        deadline = time.monotonic() + self.shutdown_timeout
+        for index, process in self.children.items():
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                logger.error(f"Worker {index} (pid {process.pid}) did not drain in time; killing it.")
+                process.kill()
+                process.join()
+
+    def run(self, poll_seconds: float = 1.0):
+        """Inicia os processos e os supervisiona até receber SIGTERM/SIGINT."""
+        def request_stop(signum, frame):
+            self._stopping = True
+
+        signal.signal(signal.SIGTERM, request_stop)
+        signal.signal(signal.SIGINT, request_stop)
+        self.start()
+        while not self._stopping:
+            self.check()
+            time.sleep(poll_seconds)
+        logger.info(f"Stopping {len(self.children)} workers.")
+        self.stop()
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    parser = argparse.ArgumentParser(description="Executa os consumidores em processos de workers.")
+    parser.add_argument(
+        "--queues",
+        type=parse_queues,
+        default=parse_queues(settings.WORKER_QUEUES),
+        help=f"Filas consumidas por cada processo, separadas por vírgula ({', '.join(CONSUMERS)}).",
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=settings.WORKER_PROCESSES or os.cpu_count() or 1,
+        help="Quantidade de processos (padrão: WORKER_PROCESSES ou a quantidade de CPUs).",
+    )
+    parser.add_argument(
+        "--no-scheduler",
+        action="store_true",
+        help="Não executa o agendador de boletos (ex.: outras instâncias já executam).",
+    )
+    args = parser.parse_args(argv)
+
+    configure_logging("supervisor")
+    supervisor = WorkerSupervisor(
+        args.queues, args.processes, run_scheduler=settings.BOLETO_SCHEDULER_ENABLED and not args.no_scheduler
+    )
+    supervisor.run()
+
+
+if __name__ == "__main__":
+    main()
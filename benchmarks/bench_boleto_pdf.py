@@ -0,0 +1,95 @@
+"""
+Benchmark da geração dos PDFs dos boletos.
+
+Mede PDFs/s gerando no próprio processo (template em cache) e pelo `BoletoRenderer`
+com 1..N processos, gravando no `ContentStore` de um diretório temporário:
+
+    python -m benchmarks.bench_boleto_pdf --documents 5000 --workers 4
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from uuid import uuid4
+
+from app.core.content_store import ContentStore
+from app.services.boleto_codes import BoletoCodeEngine, amounts_to_cents, due_date_factors
+from app.services.boleto_pdf import get_template, render_boleto_pdf
+from app.services.boleto_renderer import BoletoRenderer, build_document
+
+TEMPLATE_KEY = ("237", "Smart Billing", "1234", "0012345")
+
+
+def build_documents(count: int):
+    amounts = [Decimal(100 + i) / 7 for i in range(count)]
+    due_dates = [datetime(2025, 3, 1) + timedelta(days=i % 365) for i in range(count)]
+    codes = BoletoCodeEngine("237", "1234", "09", "0012345").compute(
+        amounts_to_cents(amounts), due_date_factors(due_dates), list(range(1, count + 1))
+    )
+    return [
+        build_document(
+            {
+                "digitable_line": codes.digitable_lines[i],
+                "barcode": codes.barcodes[i],
+                "debt_due_date": due_dates[i],
+                "our_number_label": codes.our_numbers[i],
+                "debt_id": uuid4(),
+                "debt_amount": amounts[i],
+                "user_name": f"Customer {i}",
+                "user_id": 1000 + i,
+            }
+        )
+        for i in range(count)
+    ]
+
+
+async def run_pool(documents, workers: int, max_pending: int, batch_size: int, store_root: str) -> float:
+    renderer = BoletoRenderer(
+        workers=workers,
+        max_pending=max_pending,
+        batch_size=batch_size,
+        store=ContentStore(store_root),
+        template_key=TEMPLATE_KEY,
+    )
+    try:
+        # Aquece os processos (spawn e montagem do template) fora da medição
+        await renderer.render_many(documents[:workers * batch_size])
+        start = time.perf_counter()
+        await renderer.render_many(documents)
+        return time.perf_counter() - start
+    finally:
+        renderer.close()
+
+
+def run(args):
+    documents = build_documents(args.documents)
+    template = get_template(*TEMPLATE_KEY)
+
+    start = time.perf_counter()
+    for document in documents:
+        render_boleto_pdf(template, document)
+    inline_elapsed = time.perf_counter() - start
+
+    print(f"documents={args.documents} cpus={os.cpu_count()}")
+    print(f"render only, 1 process: {args.documents / inline_elapsed:10.0f} PDFs/s")
+    for workers in range(1, args.workers + 1):
+        with tempfile.TemporaryDirectory() as store_root:
+            elapsed = asyncio.run(run_pool(documents, workers, args.max_pending, args.batch_size, store_root))
+        rate = args.documents / elapsed
+        print(f"pool + store, {workers} workers: {rate:10.0f} PDFs/s ({rate / workers:8.0f} PDFs/s per worker)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--max-pending", type=int, default=256)
+    parser.add_argument("--batch-size", type=int, default=32)
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark dos engines de validação de CSV do FileProcessorService.
+
+Gera um CSV sintético e mede linhas/s do engine "pydantic" (linha a linha) e do
+engine "columnar" (vetorizado):
+
+    python -m benchmarks.bench_csv_validation --rows 200000 --invalid-ratio 0.01
+"""
+import argparse
+import csv
+import os
+import random
+import tempfile
+import time
+from uuid import uuid4
+
+from loguru import logger
+
+from app.services.file_processor_service import FileProcessorService
+
+FIELDNAMES = ["name", "governmentId", "email", "debtAmount", "debtDueDate", "debtId"]
+
+
+def write_csv(path: str, rows: int, invalid_ratio: float, seed: int = 42):
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(FIELDNAMES)
+        for i in range(rows):
+            row = [
+                f"Customer {i}",
+                str(rng.randint(1000, 99999999)),
+                f"customer{i}@example.com",
+                f"{rng.randint(100, 100000)}.{rng.randint(0, 99):02d}",
+                f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+                str(uuid4()),
+            ]
+            if rng.random() < invalid_ratio:
+                row[rng.randrange(1, len(row))] = "INVALID"
+            writer.writerow(row)
+
+
+def run_engine(engine: str, path: str, chunk_size: int) -> float:
+    service = FileProcessorService(validation_engine=engine)
+    service._log_invalid_rows = lambda *args, **kwargs: None
+    start = time.perf_counter()
+    rows = sum(len(chunk) for chunk in service.process_file(path, chunk_size=chunk_size))
+    elapsed = time.perf_counter() - start
+    return rows, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--invalid-ratio", type=float, default=0.01)
+    parser.add_argument("--chunk-size", type=int, default=200)
+    args = parser.parse_args()
+
+    # Evita que o log por linha inválida domine a medição
+    logger.remove()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "bench.csv")
+        write_csv(path, args.rows, args.invalid_ratio)
+
+        results = {engine: run_engine(engine, path, args.chunk_size) for engine in ("pydantic", "columnar")}
+
+    print(f"rows={args.rows} invalid_ratio={args.invalid_ratio}")
+    for engine, (valid_rows, elapsed) in results.items():
+        print(f"{engine:>9}: {args.rows / elapsed:12.0f} rows/s ({valid_rows} valid rows, {elapsed:.2f}s)")
+    print(f"  speedup: {results['pydantic'][1] / results['columnar'][1]:12.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Benchmark de envio de e-mails de notificação.
+
+Compara uma sessão SMTP por mensagem (conexão, EHLO e QUIT a cada e-mail) com o
+`EmailDispatcher`, que envia em paralelo por sessões persistentes do `SmtpConnectionPool`.
+Os limites de taxa ficam altos para medir só o transporte.
+
+Requer um servidor SMTP acessível, por exemplo o mailhog do docker-compose:
+
+    python -m benchmarks.bench_email_dispatcher --host localhost --port 1025 --messages 2000
+"""
+import argparse
+import asyncio
+import time
+from email.message import EmailMessage
+
+import aiosmtplib
+
+from app.services.email_dispatcher import EmailDispatcher, SmtpConnectionPool
+
+
+def build_message(index: int) -> EmailMessage:
+    message = EmailMessage()
+    message["From"] = "boletos@smartbilling.local"
+    message["To"] = f"user{index}@example{index % 10}.com"
+    message["Subject"] = "Seu boleto está disponível"
+    message.set_content(f"Olá.\n\nSeu boleto foi gerado.\nLinha digitável: 23790.12345 {index:011d}")
+    return message
+
+
+async def send_per_message_session(args, messages):
+    """Reproduz o envio ingênuo: uma sessão SMTP por e-mail, um e-mail por vez."""
+    for message in messages:
+        await aiosmtplib.send(message, hostname=args.host, port=args.port)
+
+
+async def run(args):
+    messages = [build_message(i) for i in range(args.messages)]
+
+    start = time.perf_counter()
+    await send_per_message_session(args, messages)
+    legacy_elapsed = time.perf_counter() - start
+
+    pool = SmtpConnectionPool(
+        host=args.host, port=args.port, size=args.pool_size, username=None, password=None,
+        use_tls=False, start_tls=False, timeout=30, messages_per_connection=args.messages,
+    )
+    dispatcher = EmailDispatcher(pool, provider_rate=1e9, domain_rate=1e9, domain_rates={})
+    start = time.perf_counter()
+    errors = await dispatcher.send_many(messages)
+    pooled_elapsed = time.perf_counter() - start
+    await dispatcher.close()
+
+    print(f"messages={args.messages} pool_size={args.pool_size} failed={sum(e is not None for e in errors)}")
+    print(f"session per message: {args.messages / legacy_elapsed:10.1f} msg/s")
+    print(f"pooled dispatcher:   {args.messages / pooled_elapsed:10.1f} msg/s")
+    print(f"speedup:             {legacy_elapsed / pooled_elapsed:10.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=1025)
+    parser.add_argument("--messages", type=int, default=1000)
+    parser.add_argument("--pool-size", type=int, default=4)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
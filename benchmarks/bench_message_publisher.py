@@ -0,0 +1,108 @@
+"""
+Benchmark de publicação de mensagens no RabbitMQ.
+
+Compara a estratégia antiga (uma conexão e um `get_exchange` por mensagem) com o
+`MessagePublisher` atual, que reutiliza a conexão, o pool de canais e o cache de exchanges.
+
+Requer um RabbitMQ acessível:
+
+    python -m benchmarks.bench_message_publisher --host localhost --messages 2000
+"""
+import argparse
+import asyncio
+import json
+import time
+from uuid import uuid4
+
+import aio_pika
+
+from app.core.rabbitmq_connection_manager import RabbitMQConnectionManager
+from app.core.rabbitmq_connection_params import RabbitMQConnectionParams
+from app.utils.message_publisher import MessagePublisher
+
+EXCHANGE = "bench_publisher_exchange"
+QUEUE = "bench_publisher_queue"
+ROUTING_KEY = "bench.publish"
+
+
+def build_message(rows: int) -> dict:
+    return {
+        "file_id": str(uuid4()),
+        "chunk": [
+            {
+                "name": "John Doe",
+                "governmentId": 12345 + i,
+                "email": "john@example.com",
+                "debtAmount": 1000.0,
+                "debtDueDate": "2024-01-01",
+                "debtId": str(uuid4()),
+            }
+            for i in range(rows)
+        ],
+    }
+
+
+async def publish_per_message_connection(connection_params, message):
+    """Reproduz o comportamento anterior: abre e fecha uma conexão por mensagem."""
+    connection = await connection_params.get_connection()
+    async with connection:
+        channel = await connection.channel()
+        exchange = await channel.get_exchange(EXCHANGE)
+        await exchange.publish(
+            aio_pika.Message(
+                body=json.dumps(message).encode(),
+                delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+            ),
+            routing_key=ROUTING_KEY,
+        )
+
+
+async def declare(connection_params):
+    connection = await connection_params.get_connection()
+    async with connection:
+        channel = await connection.channel()
+        exchange = await channel.declare_exchange(EXCHANGE, aio_pika.ExchangeType.DIRECT, durable=False)
+        queue = await channel.declare_queue(QUEUE, auto_delete=True)
+        await queue.bind(exchange, routing_key=ROUTING_KEY)
+        await queue.purge()
+
+
+async def run(args):
+    connection_params = RabbitMQConnectionParams(
+        host=args.host, port=args.port, username=args.username, password=args.password
+    )
+    await declare(connection_params)
+    message = build_message(args.rows)
+
+    start = time.perf_counter()
+    for _ in range(args.messages):
+        await publish_per_message_connection(connection_params, message)
+    legacy_elapsed = time.perf_counter() - start
+
+    publisher = MessagePublisher(connection_params)
+    start = time.perf_counter()
+    for _ in range(args.messages):
+        await publisher.publish(EXCHANGE, ROUTING_KEY, message)
+    pooled_elapsed = time.perf_counter() - start
+
+    await RabbitMQConnectionManager.close_all()
+
+    print(f"messages={args.messages} rows_per_message={args.rows}")
+    print(f"per-message connection: {args.messages / legacy_elapsed:10.1f} msg/s")
+    print(f"pooled connection:      {args.messages / pooled_elapsed:10.1f} msg/s")
+    print(f"speedup:                {legacy_elapsed / pooled_elapsed:10.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=5672)
+    parser.add_argument("--username", default="guest")
+    parser.add_argument("--password", default="guest")
+    parser.add_argument("--messages", type=int, default=1000)
+    parser.add_argument("--rows", type=int, default=200, help="Linhas por mensagem de chunk.")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,9 @@ from alembic import context
 from app.core.database import Base
 from app.models.users import User
 from app.models.debts import Debt
+from app.models.boletos import Boleto
+from app.models.file_imports import FileImport, FileImportChunk
+from app.models.notification_outbox import NotificationOutbox
 
 # Configuração padrão do Alembic
 config = context.config
@@ -0,0 +1,37 @@
+"""Add our number sequence and barcode columns to boletos
+
+Revision ID: 3c8e51f4a9d6
+Revises: 7a41c9e0d2b3
+Create Date: 2026-10-17 11:02:19.730415
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c8e51f4a9d6'
+down_revision: Union[str, None] = '7a41c9e0d2b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(sa.schema.CreateSequence(sa.Sequence('boleto_our_number_seq')))
+    op.add_column(
+        'boletos',
+        sa.Column('our_number', sa.BigInteger(), server_default=sa.text("nextval('boleto_our_number_seq')"), nullable=False)
+    )
+    op.add_column('boletos', sa.Column('barcode', sa.String(length=44), nullable=True))
+    op.add_column('boletos', sa.Column('digitable_line', sa.String(length=54), nullable=True))
+    op.create_unique_constraint('uq_boletos_our_number', 'boletos', ['our_number'])
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_boletos_our_number', 'boletos', type_='unique')
+    op.drop_column('boletos', 'digitable_line')
+    op.drop_column('boletos', 'barcode')
+    op.drop_column('boletos', 'our_number')
+    op.execute(sa.schema.DropSequence(sa.Sequence('boleto_our_number_seq')))
@@ -0,0 +1,40 @@
+"""Track boleto generation on debts for the due-date scheduler
+
+Revision ID: 5b1d0e8c7f23
+Revises: 9d2f6b7e1c40
+Create Date: 2026-10-17 13:20:47.905318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b1d0e8c7f23'
+down_revision: Union[str, None] = '9d2f6b7e1c40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('debts', sa.Column('boleto_generated_at', sa.TIMESTAMP(), nullable=True))
+    op.execute(
+        """
+        UPDATE debts SET boleto_generated_at = COALESCE(boletos.generated_at, now())
+        FROM boletos WHERE boletos.debt_id = debts.debt_id
+        """
+    )
+    # Índice parcial: a varredura diária percorre apenas dívidas ainda sem boleto
+    op.create_index(
+        'ix_debts_pending_boleto_due_date',
+        'debts',
+        ['debt_due_date', 'id'],
+        postgresql_where=sa.text('boleto_generated_at IS NULL')
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_debts_pending_boleto_due_date', table_name='debts')
+    op.drop_column('debts', 'boleto_generated_at')
@@ -0,0 +1,71 @@
+"""Track file imports and prepare boletos for batch generation
+
+Revision ID: 7a41c9e0d2b3
+Revises: 001de2cae138
+Create Date: 2026-10-17 10:12:44.518203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a41c9e0d2b3'
+down_revision: Union[str, None] = '001de2cae138'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'file_imports',
+        sa.Column('file_id', sa.UUID(as_uuid=True), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False, server_default='INGESTING'),
+        sa.Column('total_chunks', sa.Integer(), nullable=True),
+        sa.Column('committed_chunks', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=True),
+        sa.Column('completed_at', sa.TIMESTAMP(), nullable=True),
+        sa.Column('boletos_requested_at', sa.TIMESTAMP(), nullable=True),
+        sa.PrimaryKeyConstraint('file_id')
+    )
+    op.create_table(
+        'file_import_chunks',
+        sa.Column('file_id', sa.UUID(as_uuid=True), nullable=False),
+        sa.Column('chunk_key', sa.String(length=80), nullable=False),
+        sa.PrimaryKeyConstraint('file_id', 'chunk_key')
+    )
+
+    # boletos.user_id referencia users.id (inteiro). A tabela nunca foi populada com o tipo
+    # antigo; se houver linhas, a conversão falha em vez de descartar dados.
+    op.alter_column(
+        'boletos',
+        'user_id',
+        type_=sa.Integer,
+        postgresql_using='NULL::integer'
+    )
+    op.create_foreign_key(
+        'fk_boletos_user_id_users', 'boletos', 'users', ['user_id'], ['id'], ondelete='CASCADE'
+    )
+    op.create_unique_constraint('uq_boletos_debt_id', 'boletos', ['debt_id'])
+    op.alter_column('boletos', 'id', server_default=sa.text('gen_random_uuid()'))
+
+    op.create_index('ix_debts_file_id_id', 'debts', ['file_id', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_debts_file_id_id', table_name='debts')
+
+    op.alter_column('boletos', 'id', server_default=None)
+    op.drop_constraint('uq_boletos_debt_id', 'boletos', type_='unique')
+    op.drop_constraint('fk_boletos_user_id_users', 'boletos', type_='foreignkey')
+    op.alter_column(
+        'boletos',
+        'user_id',
+        type_=sa.UUID(as_uuid=True),
+        postgresql_using='NULL::uuid'
+    )
+
+    op.drop_table('file_import_chunks')
+    op.drop_table('file_imports')
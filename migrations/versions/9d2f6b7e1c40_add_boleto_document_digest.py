@@ -0,0 +1,26 @@
+"""Add document digest to boletos
+
+Revision ID: 9d2f6b7e1c40
+Revises: 3c8e51f4a9d6
+Create Date: 2026-10-17 12:41:05.284117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d2f6b7e1c40'
+down_revision: Union[str, None] = '3c8e51f4a9d6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('boletos', sa.Column('document_digest', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('boletos', 'document_digest')
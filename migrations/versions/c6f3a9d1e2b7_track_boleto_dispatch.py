@@ -0,0 +1,28 @@
+"""Track when boleto documents and notifications were dispatched
+
+Revision ID: c6f3a9d1e2b7
+Revises: e4a7c2b91f58
+Create Date: 2026-10-17 18:41:05.208114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c6f3a9d1e2b7'
+down_revision: Union[str, None] = 'e4a7c2b91f58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('boletos', sa.Column('dispatched_at', sa.TIMESTAMP(), nullable=True))
+    # Boletos anteriores já passaram pelo envio; não devem ser reenviados pela próxima reentrega
+    op.execute("UPDATE boletos SET dispatched_at = COALESCE(generated_at, now())")
+
+
+def downgrade() -> None:
+    op.drop_column('boletos', 'dispatched_at')
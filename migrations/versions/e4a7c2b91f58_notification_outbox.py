@@ -0,0 +1,42 @@
+"""Add the notification outbox for per-user coalescing
+
+Revision ID: e4a7c2b91f58
+Revises: 5b1d0e8c7f23
+Create Date: 2026-10-17 15:02:11.418730
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a7c2b91f58'
+down_revision: Union[str, None] = '5b1d0e8c7f23'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'notification_outbox',
+        sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('boleto_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('digitable_line', sa.String(length=54), nullable=True),
+        sa.Column('document_digest', sa.String(length=64), nullable=True),
+        sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=False),
+        sa.Column('claimed_until', sa.TIMESTAMP(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('boleto_id')
+    )
+    op.create_index(
+        'ix_notification_outbox_user_id_created_at', 'notification_outbox', ['user_id', 'created_at']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_notification_outbox_user_id_created_at', table_name='notification_outbox')
+    op.drop_table('notification_outbox')
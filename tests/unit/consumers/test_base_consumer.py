@@ -0,0 +1,305 @@
+import asyncio
+import json
+import pytest
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock
+
+from app.consumers.base_consumer import BaseConsumer, PermanentMessageError
+from app.utils.retry_policy import RetryPolicy
+
+
+class FakeMessage:
+    """Mensagem mínima com o protocolo usado pelo BaseConsumer."""
+
+    def __init__(self, payload):
+        self.body = json.dumps(payload).encode()
+        self.headers = {}
+        self.content_type = None
+        self.content_encoding = None
+        self.acked = False
+        self.requeued = False
+        self.nacked_multiple = None
+
+    @asynccontextmanager
+    async def process(self, requeue=False):
+        yield
+        self.acked = True
+
+    async def nack(self, requeue=True, multiple=False):
+        self.requeued = requeue
+        self.nacked_multiple = multiple
+
+
+class FakeQueue:
+    """Fila que entrega ao consumidor as mensagens colocadas em `messages`, como o broker."""
+
+    def __init__(self):
+        self.messages = asyncio.Queue()
+        self.cancelled = False
+        self._delivery = None
+
+    async def consume(self, callback):
+        self._delivery = asyncio.create_task(self._deliver(callback))
+        return "ctag"
+
+    async def _deliver(self, callback):
+        while True:
+            await callback(await self.messages.get())
+
+    async def cancel(self, consumer_tag):
+        self._delivery.cancel()
+        self.cancelled = True
+
+
+class RecordingConsumer(BaseConsumer):
+    """Consumidor de teste que registra a concorrência observada."""
+
+    def __init__(self, connection_params, max_in_flight, release: asyncio.Event):
+        super().__init__("test_queue", "test_exchange", "test.key", connection_params, max_in_flight=max_in_flight)
+        self.release = release
+        self.running = 0
+        self.max_running = 0
+        self.processed = []
+
+    async def process_message(self, message):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await self.release.wait()
+            if message.get("fail"):
+                raise RuntimeError("boom")
+            self.processed.append(message["n"])
+        finally:
+            self.running -= 1
+
+
+class TestBaseConsumer:
+    @pytest.fixture
+    def queue(self):
+        return FakeQueue()
+
+    @pytest.fixture
+    def channel(self, queue):
+        channel = MagicMock()
+        channel.set_qos = AsyncMock()
+        channel.declare_queue = AsyncMock(return_value=queue)
+        return channel
+
+    @pytest.fixture
+    def connection_params(self, channel):
+        connection = MagicMock()
+        connection.__aenter__ = AsyncMock(return_value=connection)
+        connection.__aexit__ = AsyncMock(return_value=None)
+        connection.channel = AsyncMock(return_value=channel)
+        params = MagicMock()
+        params.get_connection = AsyncMock(return_value=connection)
+        return params
+
+    async def _wait_until(self, predicate):
+        for _ in range(200):
+            if predicate():
+                return
+            await asyncio.sleep(0.005)
+        pytest.fail("condition not reached")
+
+    @pytest.mark.asyncio
+    async def test_dispatches_up_to_max_in_flight(self, connection_params, channel, queue):
+        """Até `max_in_flight` mensagens são processadas ao mesmo tempo."""
+        release = asyncio.Event()
+        consumer = RecordingConsumer(connection_params, max_in_flight=3, release=release)
+        messages = [FakeMessage({"n": i}) for i in range(6)]
+        for message in messages:
+            queue.messages.put_nowait(message)
+
+        task = asyncio.create_task(consumer.start_consuming(prefetch_count=1))
+        await self._wait_until(lambda: consumer.running == 3)
+        assert consumer.max_running == 3
+
+        release.set()
+        await self._wait_until(lambda: all(message.acked for message in messages))
+        await consumer.stop()
+
+        assert task.done()
+        assert sorted(consumer.processed) == list(range(6))
+        assert consumer.max_running == 3
+        channel.set_qos.assert_awaited_once_with(prefetch_count=3)
+
+    @pytest.mark.asyncio
+    async def test_stop_waits_for_in_flight_messages(self, connection_params, queue):
+        """O desligamento aguarda as mensagens em processamento antes de retornar."""
+        release = asyncio.Event()
+        consumer = RecordingConsumer(connection_params, max_in_flight=2, release=release)
+        message = FakeMessage({"n": 1})
+        queue.messages.put_nowait(message)
+
+        asyncio.create_task(consumer.start_consuming())
+        await self._wait_until(lambda: consumer.running == 1)
+
+        stop_task = asyncio.create_task(consumer.stop())
+        await asyncio.sleep(0.02)
+        assert not stop_task.done()
+
+        release.set()
+        await stop_task
+        assert message.acked
+        assert consumer.processed == [1]
+
+    @pytest.mark.asyncio
+    async def test_stop_requeues_prefetched_messages_after_draining(self, connection_params, queue):
+        """
+        Parado com todos os handlers ocupados, o consumidor conclui as mensagens em processamento
+        e só depois devolve as pré-carregadas, uma a uma (sem `multiple`).
+        """
+        release = asyncio.Event()
+        consumer = RecordingConsumer(connection_params, max_in_flight=2, release=release)
+        messages = [FakeMessage({"n": i}) for i in range(4)]
+        for message in messages:
+            queue.messages.put_nowait(message)
+
+        task = asyncio.create_task(consumer.start_consuming())
+        await self._wait_until(lambda: consumer.running == 2 and queue.messages.empty())
+
+        stop_task = asyncio.create_task(consumer.stop())
+        await asyncio.sleep(0.02)
+        assert not stop_task.done()
+        assert not any(message.requeued for message in messages)
+
+        release.set()
+        await stop_task
+
+        assert task.done() and queue.cancelled
+        assert sorted(consumer.processed) == [0, 1, 2]
+        assert [message.acked for message in messages] == [True, True, True, False]
+        assert messages[3].requeued and messages[3].nacked_multiple is False
+        assert not any(message.requeued for message in messages[:3])
+
+    @pytest.mark.asyncio
+    async def test_failed_message_goes_to_failure_handling(self, connection_params, queue):
+        """Falhas em uma mensagem são tratadas individualmente, sem afetar as demais."""
+        release = asyncio.Event()
+        release.set()
+        consumer = RecordingConsumer(connection_params, max_in_flight=2, release=release)
+        consumer.handle_failure = AsyncMock()
+        ok_message, failed_message = FakeMessage({"n": 1}), FakeMessage({"n": 2, "fail": True})
+        queue.messages.put_nowait(ok_message)
+        queue.messages.put_nowait(failed_message)
+
+        asyncio.create_task(consumer.start_consuming())
+        await self._wait_until(lambda: ok_message.acked and failed_message.acked)
+        await consumer.stop()
+
+        assert consumer.processed == [1]
+        consumer.handle_failure.assert_awaited_once()
+        assert consumer.handle_failure.await_args.args[1] is failed_message
+
+    @pytest.mark.asyncio
+    async def test_failure_is_retried_through_the_consumer_exchange(self, connection_params, channel):
+        """A retentativa vai para a fila do nível do `x-retry-count`, pela exchange do consumidor."""
+        exchange = MagicMock(publish=AsyncMock())
+        channel.get_exchange = AsyncMock(return_value=exchange)
+        consumer = RecordingConsumer(connection_params, max_in_flight=1, release=asyncio.Event())
+        consumer.retry_policy = RetryPolicy(delays=[1, 10, 60], max_retries=4, jitter=0.5, rand=lambda: 1.0)
+        message = FakeMessage({"n": 1})
+        message.headers = {"x-retry-count": 1, "trace": "abc"}
+
+        await consumer.handle_failure(channel, message)
+
+        channel.get_exchange.assert_awaited_once_with("test_exchange", ensure=False)
+        retry = exchange.publish.await_args.args[0]
+        assert exchange.publish.await_args.kwargs["routing_key"] == "test.key.retry.10s"
+        assert retry.headers == {"x-retry-count": 2, "trace": "abc"}
+        assert retry.expiration == 5.0
+        assert message.headers["x-retry-count"] == 1
+
+    @pytest.mark.asyncio
+    async def test_failure_goes_to_dlq_after_last_retry(self, connection_params, channel):
+        """Esgotadas as retentativas, a mensagem vai para a DLQ com os headers originais."""
+        exchange = MagicMock(publish=AsyncMock())
+        channel.get_exchange = AsyncMock(return_value=exchange)
+        consumer = RecordingConsumer(connection_params, max_in_flight=1, release=asyncio.Event())
+        consumer.retry_policy = RetryPolicy(delays=[1, 10], max_retries=3)
+        message = FakeMessage({"n": 1})
+        message.headers = {"x-retry-count": 3}
+
+        await consumer.handle_failure(channel, message)
+
+        assert exchange.publish.await_args.kwargs["routing_key"] == "test.key.dlq"
+        assert exchange.publish.await_args.args[0].headers == {
+            "x-retry-count": 3, "x-dead-letter-reason": "retries_exhausted"
+        }
+
+    @pytest.mark.asyncio
+    async def test_declares_one_retry_queue_per_tier(self, connection_params, channel):
+        """Cada nível tem uma fila com TTL, ligada à exchange do consumidor, que devolve à fila principal."""
+        channel.declare_exchange = AsyncMock(return_value="exchange")
+        queue = MagicMock(bind=AsyncMock())
+        channel.declare_queue = AsyncMock(return_value=queue)
+        consumer = RecordingConsumer(connection_params, max_in_flight=1, release=asyncio.Event())
+        consumer.retry_policy = RetryPolicy(delays=[60, 1, 0.5])
+
+        await consumer.declare_infrastructure()
+
+        retry_queues = {
+            call.args[0]: call.kwargs["arguments"]
+            for call in channel.declare_queue.await_args_list
+            if call.kwargs.get("arguments")
+        }
+        assert retry_queues == {
+            f"test_queue.retry.{label}": {
+                "x-dead-letter-exchange": "test_exchange",
+                "x-dead-letter-routing-key": "test.key",
+                "x-message-ttl": ttl,
+            }
+            for label, ttl in (("0.5s", 500), ("1s", 1000), ("60s", 60000))
+        }
+        bindings = [call.kwargs["routing_key"] for call in queue.bind.await_args_list]
+        assert bindings == [
+            "test.key", "test.key.retry.0.5s", "test.key.retry.1s", "test.key.retry.60s", "test.key.dlq"
+        ]
+
+    @pytest.mark.asyncio
+    async def test_permanent_failure_skips_retries(self, connection_params, channel):
+        """Falhas permanentes vão direto para a DLQ, com o motivo nos headers."""
+        exchange = MagicMock(publish=AsyncMock())
+        channel.get_exchange = AsyncMock(return_value=exchange)
+        consumer = RecordingConsumer(connection_params, max_in_flight=1, release=asyncio.Event())
+
+        await consumer.handle_failure(channel, FakeMessage({"n": 1}), PermanentMessageError("missing 'user_id'"))
+
+        assert exchange.publish.await_args.kwargs["routing_key"] == "test.key.dlq"
+        assert exchange.publish.await_args.args[0].headers == {
+            "x-error-type": "PermanentMessageError",
+            "x-error-reason": "missing 'user_id'",
+            "x-dead-letter-reason": "permanent",
+        }
+
+    @pytest.mark.asyncio
+    async def test_transient_errors_take_precedence(self, connection_params, channel):
+        """Tipos registrados como transitórios são retentados mesmo herdando de um tipo permanente."""
+
+        class LockTimeout(PermanentMessageError):
+            pass
+
+        exchange = MagicMock(publish=AsyncMock())
+        channel.get_exchange = AsyncMock(return_value=exchange)
+        consumer = RecordingConsumer(connection_params, max_in_flight=1, release=asyncio.Event())
+        consumer.transient_errors = (LockTimeout,)
+
+        await consumer.handle_failure(channel, FakeMessage({"n": 1}), LockTimeout("lock timeout"))
+
+        assert exchange.publish.await_args.kwargs["routing_key"].startswith("test.key.retry.")
+        assert exchange.publish.await_args.args[0].headers["x-error-type"] == "LockTimeout"
+
+    @pytest.mark.asyncio
+    async def test_undecodable_body_is_permanent(self, connection_params, channel):
+        """Um corpo ilegível chega ao tratamento de falhas como erro permanente."""
+        consumer = RecordingConsumer(connection_params, max_in_flight=1, release=asyncio.Event())
+        consumer.handle_failure = AsyncMock()
+        message = FakeMessage({})
+        message.body = b"\x00not json"
+
+        await consumer._handle_message(channel, message)
+
+        error = consumer.handle_failure.await_args.args[2]
+        assert isinstance(error, PermanentMessageError) and consumer.is_permanent(error)
+        assert message.acked
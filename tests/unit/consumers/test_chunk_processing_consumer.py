@@ -0,0 +1,146 @@
+import asyncio
+import pytest
+from datetime import date
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+from app.config import settings
+from app.consumers.chunk_processing_consumer import ChunkProcessingConsumer
+from app.core.spool_store import SpoolStore
+from app.schemas.chunk import ChunkSlice
+from app.utils.claim_check import build_claim_check
+from app.utils.trusted_chunk import build_trusted_chunk
+
+
+class TestChunkProcessingConsumer:
+    @pytest.fixture(autouse=True)
+    def signing_key(self, monkeypatch):
+        monkeypatch.setattr(settings, "CHUNK_SIGNING_KEY", "test-signing-key")
+
+    @pytest.fixture
+    def consumer(self):
+        consumer = ChunkProcessingConsumer(MagicMock(), batch_max_rows=0)
+        consumer.chunk_processing_service.session_factory = MagicMock()
+        consumer.chunk_processing_service.process_trusted_chunk = AsyncMock(return_value=[])
+        consumer.chunk_processing_service.ingest_chunks = AsyncMock(return_value=[])
+        consumer.file_import_service = AsyncMock()
+        return consumer
+
+    @pytest.fixture
+    def row(self):
+        return {
+            "name": "Samuel Orr",
+            "governmentId": 5486,
+            "email": "linmichael@example.com",
+            "debtAmount": 5662.0,
+            "debtDueDate": date(2023, 2, 25),
+            "debtId": uuid4(),
+        }
+
+    @pytest.mark.asyncio
+    async def test_trusted_chunk_skips_validation(self, consumer, row):
+        """Chunks confiáveis vão direto para inserção."""
+        file_id = uuid4()
+        consumer.chunk_processing_service.validate_rows = MagicMock()
+
+        await consumer.process_message(build_trusted_chunk(str(file_id), [row]))
+
+        consumer.chunk_processing_service.validate_rows.assert_not_called()
+        called_file_id, rows, chunk_key = consumer.chunk_processing_service.process_trusted_chunk.await_args.args
+        assert called_file_id == file_id
+        assert rows[0].government_id == 5486
+        assert chunk_key.startswith("signature:")
+
+    @pytest.mark.asyncio
+    async def test_legacy_chunk_is_fully_validated(self, consumer):
+        """Mensagens legadas passam pela validação completa; linhas inválidas são descartadas."""
+        file_id = uuid4()
+        legacy_rows = [{"name": "Samuel Orr", "governmentId": "5486"}]
+
+        await consumer.process_message({"file_id": str(file_id), "chunk": legacy_rows})
+
+        called_file_id, rows, chunk_key = consumer.chunk_processing_service.process_trusted_chunk.await_args.args
+        assert (called_file_id, rows) == (file_id, [])
+        # Chunks vazios também contam no progresso da importação
+        assert chunk_key == consumer._content_key({"chunk": legacy_rows})
+
+    @pytest.mark.asyncio
+    async def test_chunk_with_invalid_signature_is_fully_validated(self, consumer, row):
+        """Chunks com assinatura inválida são tratados como não confiáveis."""
+        message = build_trusted_chunk(str(uuid4()), [row])
+        message["signature"] = "0" * 64
+        consumer.chunk_processing_service.validate_rows = MagicMock(return_value=[])
+
+        await consumer.process_message(message)
+
+        chunk = consumer.chunk_processing_service.validate_rows.call_args.args[0]
+        assert chunk[0]["governmentId"] == 5486
+
+    @pytest.mark.asyncio
+    async def test_claim_check_reads_slice_from_spool(self, consumer, tmp_path):
+        """Chunks claim-check são lidos do spool e validados uma única vez."""
+        file_id = uuid4()
+        debt_id = uuid4()
+        source = tmp_path / "upload.csv"
+        header = b"name,governmentId,email,debtAmount,debtDueDate,debtId\n"
+        line = f"Samuel Orr,5486,linmichael@example.com,5662,2023-02-25,{debt_id}\n".encode()
+        source.write_bytes(header + line)
+        consumer.spool_store = SpoolStore(spool_dir=str(tmp_path / "spool"))
+        consumer.spool_store.adopt(file_id, str(source))
+        columns = header.decode().strip().split(",")
+
+        await consumer.process_message(
+            build_claim_check(str(file_id), columns, ChunkSlice(len(header), len(line), 1, 1))
+        )
+
+        called_file_id, rows, chunk_key = consumer.chunk_processing_service.process_trusted_chunk.await_args.args
+        assert called_file_id == file_id
+        assert [(row.government_id, row.debt_id) for row in rows] == [(5486, debt_id)]
+        assert chunk_key == f"offset:{len(header)}"
+
+    @pytest.mark.asyncio
+    async def test_completed_file_requests_boletos(self, consumer, row):
+        """Quando o último chunk do arquivo é gravado, o job de boletos do arquivo é publicado."""
+        file_id = uuid4()
+        consumer.chunk_processing_service.process_trusted_chunk.return_value = [file_id]
+
+        await consumer.process_message(build_trusted_chunk(str(file_id), [row]))
+
+        consumer.file_import_service.request_boletos.assert_awaited_once_with([file_id])
+
+    @pytest.mark.asyncio
+    async def test_concurrent_messages_share_one_transaction(self, row):
+        """Mensagens em processamento simultâneo são gravadas em uma única transação."""
+        consumer = ChunkProcessingConsumer(MagicMock(), batch_max_rows=3, batch_linger_seconds=5)
+        consumer.chunk_processing_service.ingest_chunks = AsyncMock(return_value=[])
+        messages = [build_trusted_chunk(str(uuid4()), [dict(row, debtId=uuid4())]) for _ in range(3)]
+
+        await asyncio.wait_for(asyncio.gather(*(consumer.process_message(m) for m in messages)), timeout=1)
+
+        consumer.chunk_processing_service.ingest_chunks.assert_awaited_once()
+        assert len(consumer.chunk_processing_service.ingest_chunks.await_args.args[0]) == 3
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_falls_back_to_individual_chunks(self, row):
+        """Se o lote falhar, cada chunk é reprocessado em sua própria transação."""
+        consumer = ChunkProcessingConsumer(MagicMock(), batch_max_rows=100, batch_linger_seconds=0.01)
+        consumer.chunk_processing_service.ingest_chunks = AsyncMock(side_effect=RuntimeError("deadlock"))
+        consumer.chunk_processing_service.process_trusted_chunk = AsyncMock(return_value=[])
+        messages = [build_trusted_chunk(str(uuid4()), [dict(row, debtId=uuid4())]) for _ in range(2)]
+
+        await asyncio.gather(*(consumer.process_message(m) for m in messages))
+
+        assert consumer.chunk_processing_service.process_trusted_chunk.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_unsigned_chunk_is_fully_validated(self, consumer, row, monkeypatch):
+        """Sem chave de assinatura, os chunks saem sem assinatura e passam pela validação completa."""
+        monkeypatch.setattr(settings, "CHUNK_SIGNING_KEY", None)
+        message = build_trusted_chunk(str(uuid4()), [row])
+        consumer.chunk_processing_service.validate_rows = MagicMock(return_value=[])
+
+        await consumer.process_message(message)
+
+        assert message["signature"] is None
+        consumer.chunk_processing_service.validate_rows.assert_called_once()
+        assert consumer.chunk_processing_service.process_trusted_chunk.await_args.args[2].startswith("sha256:")
@@ -0,0 +1,84 @@
+import json
+from datetime import date
+from uuid import uuid4
+
+import pytest
+
+from app.config import settings
+from app.core.codecs import (
+    CHUNK_CONTENT_TYPE,
+    DEFLATE_ENCODING,
+    JSON_CONTENT_TYPE,
+    UnsupportedCodecError,
+    decode_message,
+    encode_message,
+)
+from app.utils.trusted_chunk import build_trusted_chunk, is_trusted_chunk
+
+
+class TestCodecs:
+    @pytest.fixture(autouse=True)
+    def signing_key(self, monkeypatch):
+        monkeypatch.setattr(settings, "CHUNK_SIGNING_KEY", "test-signing-key")
+
+    @pytest.fixture
+    def trusted_chunk(self):
+        rows = [
+            {
+                "name": f"Usuário {i} ção",
+                "governmentId": 10_000 + i,
+                "email": f"user{i}@example.com",
+                "debtAmount": 1234.56 + i,
+                "debtDueDate": date(2024, 1, 1 + i % 28),
+                "debtId": uuid4(),
+            }
+            for i in range(200)
+        ]
+        return build_trusted_chunk(str(uuid4()), rows)
+
+    def test_json_matches_standard_library(self):
+        """O codec JSON produz o mesmo conteúdo que o json.dumps usado antes dos codecs."""
+        message = {"file_id": uuid4(), "due": date(2024, 5, 1), "n": 1}
+
+        body, content_type, content_encoding = encode_message(message, "json")
+
+        assert content_type == JSON_CONTENT_TYPE
+        assert content_encoding is None
+        assert json.loads(body) == json.loads(json.dumps(message, default=str))
+
+    def test_columnar_round_trip_keeps_signature_valid(self, trusted_chunk):
+        """O chunk binário é reconstruído exatamente e a assinatura continua válida."""
+        body, content_type, _ = encode_message(trusted_chunk, "columnar")
+
+        decoded = decode_message(body, content_type)
+
+        assert content_type == CHUNK_CONTENT_TYPE
+        assert decoded == trusted_chunk
+        assert is_trusted_chunk(decoded)
+        assert len(body) < len(json.dumps(trusted_chunk)) * 0.7
+
+    def test_columnar_falls_back_to_json(self):
+        """Mensagens que não são chunks confiáveis seguem em JSON mesmo com o codec colunar."""
+        message = {"file_id": str(uuid4()), "file_path": "/tmp/file.csv"}
+
+        body, content_type, _ = encode_message(message, "columnar")
+
+        assert content_type == JSON_CONTENT_TYPE
+        assert decode_message(body, content_type) == message
+
+    def test_compression_above_threshold(self, trusted_chunk):
+        body, content_type, content_encoding = encode_message(trusted_chunk, "json", compression_min_bytes=1024)
+
+        assert content_encoding == DEFLATE_ENCODING
+        assert decode_message(body, content_type, content_encoding) == trusted_chunk
+
+        small = {"n": 1}
+        assert encode_message(small, "json", compression_min_bytes=1024)[2] is None
+
+    def test_legacy_messages_without_content_type(self):
+        """Mensagens publicadas antes dos codecs (sem content_type) são lidas como JSON."""
+        assert decode_message(b'{"n": 1}') == {"n": 1}
+
+    def test_unknown_content_type(self):
+        with pytest.raises(UnsupportedCodecError):
+            decode_message(b"...", "application/x-unknown")
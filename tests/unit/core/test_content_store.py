@@ -0,0 +1,26 @@
+import hashlib
+import os
+
+import pytest
+
+from app.core.content_store import ContentStore
+
+
+class TestContentStore:
+    @pytest.fixture
+    def store(self, tmp_path):
+        return ContentStore(root=str(tmp_path / "store"))
+
+    def test_put_is_content_addressed(self, store):
+        """O mesmo conteúdo gera o mesmo digest e é gravado uma única vez."""
+        digest = store.put(b"%PDF-1.4 boleto")
+
+        assert digest == hashlib.sha256(b"%PDF-1.4 boleto").hexdigest()
+        assert store.put(b"%PDF-1.4 boleto") == digest
+        assert store.get(digest) == b"%PDF-1.4 boleto"
+        assert store.path_for(digest).endswith(os.path.join(digest[:2], digest[2:4], f"{digest}.pdf"))
+        assert os.listdir(os.path.dirname(store.path_for(digest))) == [f"{digest}.pdf"]
+
+    def test_path_for_rejects_invalid_digest(self, store):
+        with pytest.raises(ValueError):
+            store.path_for("../../etc/passwd")
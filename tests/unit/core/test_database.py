@@ -0,0 +1,58 @@
+from unittest.mock import patch
+
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.config import settings
+from app.core import database
+
+
+class TestDatabaseEngines:
+    @pytest.fixture(autouse=True)
+    def isolated_engines(self):
+        with patch.dict(database._engines, clear=True), patch.dict(database._session_factories, clear=True):
+            yield
+
+    def test_engine_built_from_settings(self):
+        engine = database.get_engine("worker")
+
+        assert engine.echo is False
+        assert engine.pool.size() == settings.DB_WORKER_POOL_SIZE
+        assert engine.pool._max_overflow == settings.DB_WORKER_MAX_OVERFLOW
+        assert engine.url.host == settings.POSTGRES_HOST
+        assert database.get_engine("worker") is engine
+        assert database.get_engine("api") is not engine
+
+    def test_invalid_role(self):
+        with pytest.raises(ValueError):
+            database.get_engine("reports")
+
+    def test_session_factory_per_role(self):
+        factory = database.get_session_factory("worker")
+
+        assert factory.kw["bind"] is database.get_engine("worker")
+        assert database.get_session_factory("worker") is factory
+
+    def test_pool_state_is_collected(self):
+        database.get_engine("api")
+
+        in_use = REGISTRY.get_sample_value("db_pool_connections_in_use", {"role": "api"})
+        size = REGISTRY.get_sample_value("db_pool_size", {"role": "api"})
+
+        assert in_use == 0
+        assert size == settings.DB_API_POOL_SIZE
+
+    def test_checkout_timeout_is_counted(self):
+        pool = database.get_engine("api").pool
+        labels = {"role": "api"}
+        before = REGISTRY.get_sample_value("db_pool_checkout_timeouts_total", labels) or 0
+        observed = REGISTRY.get_sample_value("db_pool_checkout_seconds_count", labels) or 0
+
+        with patch.object(AsyncAdaptedQueuePool, "connect", side_effect=exc.TimeoutError("pool exhausted")):
+            with pytest.raises(exc.TimeoutError):
+                pool.connect()
+
+        assert REGISTRY.get_sample_value("db_pool_checkout_timeouts_total", labels) == before + 1
+        assert REGISTRY.get_sample_value("db_pool_checkout_seconds_count", labels) == observed + 1
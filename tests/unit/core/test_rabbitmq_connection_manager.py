@@ -0,0 +1,67 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from app.core.rabbitmq_connection_manager import RabbitMQConnectionManager
+from app.core.rabbitmq_connection_params import RabbitMQConnectionParams
+from app.utils.message_publisher import MessagePublisher
+
+
+class FakeChannel:
+    """Canal mínimo, suficiente para o pool de canais do aio_pika."""
+
+    def __init__(self):
+        self.is_closed = False
+        self.get_exchange = AsyncMock(return_value=MagicMock(publish=AsyncMock()))
+
+    async def close(self):
+        self.is_closed = True
+
+
+class TestRabbitMQConnectionManager:
+    @pytest.fixture
+    def connection_params(self):
+        """Parâmetros de conexão com a abertura de conexão mockada."""
+        params = RabbitMQConnectionParams(host="localhost")
+
+        connection = MagicMock()
+        connection.is_closed = False
+        connection.channel = AsyncMock(side_effect=lambda **kwargs: FakeChannel())
+        connection.close = AsyncMock()
+        params.get_connection = AsyncMock(return_value=connection)
+        return params
+
+    @pytest.fixture(autouse=True)
+    async def reset_instances(self):
+        yield
+        await RabbitMQConnectionManager.close_all()
+
+    def test_for_params_returns_shared_instance(self, connection_params):
+        """Publicadores com os mesmos parâmetros compartilham o gerenciador."""
+        first = MessagePublisher(connection_params)
+        second = MessagePublisher(RabbitMQConnectionParams(host="localhost"))
+
+        assert first.connection_manager is second.connection_manager
+
+    @pytest.mark.asyncio
+    async def test_publish_reuses_connection_and_exchange(self, connection_params):
+        """Várias publicações abrem uma única conexão e resolvem a exchange uma vez por canal."""
+        publisher = MessagePublisher(connection_params)
+
+        for _ in range(10):
+            await publisher.publish("chunk_exchange", "chunk.process", {"file_id": "1"})
+
+        connection_params.get_connection.assert_awaited_once()
+        connection = await connection_params.get_connection()
+        assert connection.channel.await_count == 1
+        assert len(publisher.connection_manager._exchanges) == 1
+
+    @pytest.mark.asyncio
+    async def test_close_all_closes_connection(self, connection_params):
+        """`close_all` fecha a conexão compartilhada."""
+        publisher = MessagePublisher(connection_params)
+        await publisher.publish("file_exchange", "file.process", {"file_id": "1"})
+
+        await RabbitMQConnectionManager.close_all()
+
+        connection = await connection_params.get_connection()
+        connection.close.assert_awaited_once()
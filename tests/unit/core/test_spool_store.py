@@ -0,0 +1,58 @@
+import os
+from uuid import uuid4
+
+import pytest
+
+from app.core.spool_store import SpoolStore
+
+
+class TestSpoolStore:
+    @pytest.fixture
+    def store(self, tmp_path):
+        return SpoolStore(spool_dir=str(tmp_path / "spool"), retention_seconds=60)
+
+    def test_adopt_is_idempotent(self, store, tmp_path):
+        """O arquivo é movido para o spool e uma reentrega reutiliza o arquivo já guardado."""
+        file_id = uuid4()
+        source = tmp_path / "upload.csv"
+        source.write_bytes(b"header\nrow\n")
+
+        spool_path = store.adopt(file_id, str(source))
+
+        assert not source.exists()
+        assert store.adopt(file_id, str(source)) == spool_path
+        with open(spool_path, "rb") as file:
+            assert file.read() == b"header\nrow\n"
+
+    def test_adopt_missing_file(self, store, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            store.adopt(uuid4(), str(tmp_path / "missing.csv"))
+
+    def test_read_slice(self, store, tmp_path):
+        """Lê exatamente o intervalo pedido e rejeita intervalos fora do arquivo."""
+        file_id = uuid4()
+        source = tmp_path / "upload.csv"
+        source.write_bytes(b"0123456789")
+        store.adopt(file_id, str(source))
+
+        assert store.read_slice(file_id, 2, 5) == b"23456"
+        assert store.read_slice(file_id, 10, 0) == b""
+        with pytest.raises(ValueError):
+            store.read_slice(file_id, 8, 5)
+
+    def test_file_id_must_be_uuid(self, store):
+        """Valores arbitrários vindos de mensagens não viram caminhos no disco."""
+        with pytest.raises(ValueError):
+            store.path_for("../../etc/passwd")
+
+    def test_purge_expired(self, store, tmp_path):
+        old_id, new_id = uuid4(), uuid4()
+        for file_id in (old_id, new_id):
+            source = tmp_path / f"{file_id}.upload"
+            source.write_bytes(b"data")
+            store.adopt(file_id, str(source))
+        os.utime(store.path_for(old_id), (0, 0))
+
+        assert store.purge_expired() == 1
+        assert not os.path.exists(store.path_for(old_id))
+        assert os.path.exists(store.path_for(new_id))
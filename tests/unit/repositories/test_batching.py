@@ -0,0 +1,12 @@
+from app.repositories.batching import MAX_BIND_PARAMETERS, statement_batches
+
+
+def test_statement_batches_respect_bind_parameter_limit():
+    """INSERTs multi-linha são divididos para não exceder o limite de parâmetros do PostgreSQL."""
+    rows = [{"a": i, "b": i, "c": i, "d": i, "e": i} for i in range(20000)]
+
+    batches = list(statement_batches(rows))
+
+    assert all(len(batch) * 5 <= MAX_BIND_PARAMETERS for batch in batches)
+    assert [row for batch in batches for row in batch] == rows
+    assert list(statement_batches([])) == []
@@ -0,0 +1,83 @@
+import pytest
+from datetime import date, datetime
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+from app.repositories.copy_repositories import (
+    CopyUserRepository,
+    CopyDebtRepository,
+    CREATE_STAGING_USERS,
+    CREATE_STAGING_DEBTS,
+    MERGE_USERS,
+    MERGE_DEBTS,
+)
+from app.services.chunk_processing_service import ChunkProcessingService
+
+
+class TestCopyRepositories:
+    @pytest.fixture
+    def driver_connection(self):
+        """Mock da conexão nativa do asyncpg."""
+        connection = MagicMock()
+        connection.copy_records_to_table = AsyncMock()
+        return connection
+
+    @pytest.fixture
+    def session(self, driver_connection):
+        """Mock da sessão que expõe a conexão asyncpg subjacente."""
+        raw_connection = MagicMock(driver_connection=driver_connection)
+        sa_connection = MagicMock()
+        sa_connection.get_raw_connection = AsyncMock(return_value=raw_connection)
+        session = MagicMock()
+        session.execute = AsyncMock()
+        session.connection = AsyncMock(return_value=sa_connection)
+        return session
+
+    @pytest.mark.asyncio
+    async def test_insert_users_copies_and_merges(self, session, driver_connection):
+        """Usuários são carregados via COPY no staging e mesclados em um único comando."""
+        users = [{"id": 1, "name": "John", "government_id": 1, "email": "john@example.com"}]
+
+        await CopyUserRepository(session).insert_users(users)
+
+        executed = [call.args[0] for call in session.execute.await_args_list]
+        assert executed == [CREATE_STAGING_USERS, MERGE_USERS]
+        driver_connection.copy_records_to_table.assert_awaited_once_with(
+            "staging_users",
+            records=[(1, "John", 1, "john@example.com")],
+            columns=("id", "name", "government_id", "email"),
+        )
+
+    @pytest.mark.asyncio
+    async def test_insert_debts_converts_types_for_binary_copy(self, session, driver_connection):
+        """Valores são convertidos para os tipos esperados pelo COPY binário."""
+        file_id, debt_id = uuid4(), uuid4()
+        debts = [{
+            "file_id": file_id,
+            "user_id": 1,
+            "debt_amount": 7811.5,
+            "debt_due_date": date(2024, 1, 19),
+            "debt_id": debt_id,
+        }]
+
+        await CopyDebtRepository(session).insert_debts(debts)
+
+        executed = [call.args[0] for call in session.execute.await_args_list]
+        assert executed == [CREATE_STAGING_DEBTS, MERGE_DEBTS]
+        records = driver_connection.copy_records_to_table.await_args.kwargs["records"]
+        assert records == [(file_id, 1, Decimal("7811.5"), datetime(2024, 1, 19), debt_id)]
+
+    @pytest.mark.asyncio
+    async def test_empty_batches_are_skipped(self, session, driver_connection):
+        """Listas vazias não geram comandos no banco."""
+        await CopyUserRepository(session).insert_users([])
+        await CopyDebtRepository(session).insert_debts([])
+
+        session.execute.assert_not_called()
+        driver_connection.copy_records_to_table.assert_not_called()
+
+    def test_invalid_ingest_strategy(self):
+        """Estratégias de carga desconhecidas são rejeitadas na criação do serviço."""
+        with pytest.raises(ValueError, match="Invalid ingest strategy"):
+            ChunkProcessingService(MagicMock(), ingest_strategy="bogus")
@@ -0,0 +1,61 @@
+import pytest
+
+from app.services.adaptive_chunk_sizer import AdaptiveChunkSizer
+
+
+class TestAdaptiveChunkSizer:
+    def _sizer(self, **overrides):
+        options = dict(
+            initial_size=200, min_size=100, max_size=5000, target_seconds=1.0, smoothing=1.0, max_step=2.0
+        )
+        options.update(overrides)
+        return AdaptiveChunkSizer(**options)
+
+    def test_grows_towards_target_in_bounded_steps(self):
+        """Transações rápidas aumentam o chunk, no máximo `max_step` vezes por ajuste."""
+        sizer = self._sizer()
+
+        sizer.record(200, 0.1)  # 0.5 ms por linha -> ideal de 2000 linhas
+        assert sizer.current_size() == 400
+
+        for _ in range(5):
+            sizer.record(sizer.current_size(), sizer.current_size() * 0.0005)
+        assert sizer.current_size() == 2000
+
+    def test_shrinks_when_latency_rises(self):
+        """Transações lentas (ex.: contenção de locks) reduzem o chunk."""
+        sizer = self._sizer(initial_size=1000)
+
+        sizer.record(1000, 4.0)
+
+        assert sizer.current_size() == 500
+
+    def test_stays_within_bounds(self):
+        sizer = self._sizer(initial_size=150, max_step=100.0)
+
+        sizer.record(150, 30.0)
+        assert sizer.current_size() == 100
+
+        sizer.record(100, 0.0001)
+        assert sizer.current_size() <= 5000
+
+    def test_smoothing_dampens_outliers(self):
+        """Uma única medição atípica não derruba o tamanho quando há suavização."""
+        sizer = self._sizer(initial_size=1000, smoothing=0.2, max_step=10.0)
+        sizer.record(1000, 1.0)
+
+        sizer.record(1000, 10.0)
+
+        assert sizer.current_size() > 300
+
+    def test_ignores_empty_samples(self):
+        sizer = self._sizer()
+
+        sizer.record(0, 1.0)
+        sizer.record(100, 0.0)
+
+        assert sizer.current_size() == 200
+
+    def test_invalid_bounds(self):
+        with pytest.raises(ValueError):
+            self._sizer(min_size=500, max_size=100)
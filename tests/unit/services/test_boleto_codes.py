@@ -0,0 +1,71 @@
+import random
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from app.services.boleto_codes import (
+    MAX_AMOUNT_CENTS,
+    MAX_OUR_NUMBER,
+    BoletoCodeEngine,
+    _mod10,
+    _mod11_barcode,
+    _mod11_our_number,
+    due_date_factors,
+    reference_codes,
+)
+
+ACCOUNT = ("237", "1234", "09", "0012345")
+
+
+def digits(value: str) -> np.ndarray:
+    return np.array([[int(digit) for digit in value]])
+
+
+class TestBoletoCodes:
+    def test_due_date_factor_known_values(self):
+        """Datas de referência da FEBRABAN, incluindo o retorno do fator para 1000 em 22/02/2025."""
+        factors = due_date_factors(
+            [date(2000, 7, 3), date(2025, 2, 21), date(2025, 2, 22), date(2049, 10, 13), date(2049, 10, 14)]
+        )
+
+        assert factors.tolist() == [1000, 9999, 1000, 9999, 1000]
+
+    def test_check_digits_of_published_boleto(self):
+        """Boleto de exemplo da FEBRABAN: 00190.50095 40144.816069 06809.350314 3 37370000000100."""
+        assert _mod10(digits("001905009")).tolist() == [5]
+        assert _mod10(digits("4014481606")).tolist() == [9]
+        assert _mod10(digits("0680935031")).tolist() == [4]
+        assert _mod11_barcode(digits("0019" + "37370000000100" + "0500940144816060680935031")).tolist() == [3]
+
+    def test_our_number_check_digit_from_bank_manual(self):
+        """Exemplo do manual do Bradesco: carteira 19, nosso número 00000000002, DV 8."""
+        assert _mod11_our_number(digits("1900000000002")).tolist() == [8]
+        assert BoletoCodeEngine("237", "1234", "19", "0012345").compute([100], [1000], [2]).our_numbers == [
+            "19/00000000002-8"
+        ]
+
+    def test_batch_matches_reference(self):
+        """O cálculo vetorizado coincide com a implementação linha a linha."""
+        rng = random.Random(7)
+        rows = 500
+        cents = [rng.randint(0, MAX_AMOUNT_CENTS) for _ in range(rows)]
+        due_dates = [date(2000, 7, 3) + timedelta(days=rng.randint(0, 20000)) for _ in range(rows)]
+        our_numbers = [rng.randint(0, MAX_OUR_NUMBER) for _ in range(rows)]
+
+        codes = BoletoCodeEngine(*ACCOUNT).compute(cents, due_date_factors(due_dates), our_numbers)
+
+        expected = [reference_codes(*ACCOUNT, *row) for row in zip(cents, due_dates, our_numbers)]
+        assert list(zip(codes.barcodes, codes.digitable_lines, codes.our_numbers)) == expected
+        assert {len(barcode) for barcode in codes.barcodes} == {44}
+        assert {len(line) for line in codes.digitable_lines} == {54}
+
+    def test_out_of_range_values_are_rejected(self):
+        engine = BoletoCodeEngine(*ACCOUNT)
+
+        with pytest.raises(ValueError, match="Amounts"):
+            engine.compute([-1], [1000], [1])
+        with pytest.raises(ValueError, match="Our numbers"):
+            engine.compute([1], [1000], [MAX_OUR_NUMBER + 1])
+        with pytest.raises(ValueError, match="due-date factor"):
+            due_date_factors([date(2000, 7, 2)])
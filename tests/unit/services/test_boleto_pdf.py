@@ -0,0 +1,94 @@
+import re
+import zlib
+from datetime import datetime
+from decimal import Decimal
+from uuid import uuid4
+
+import pytest
+
+from app.core.content_store import ContentStore
+from app.services.boleto_pdf import BAR_NARROW, I2OF5_PATTERNS, get_template, render_boleto_pdf
+from app.services.boleto_renderer import BoletoRenderer, build_document, format_amount
+
+TEMPLATE_KEY = ("237", "Smart Billing", "1234", "0012345")
+BARCODE = "23791879191670246291234095336527238000123450"
+
+
+@pytest.fixture
+def document():
+    return build_document(
+        {
+            "digitable_line": "23791.23405 95336.527239 80001.234501 1 87919167024629",
+            "barcode": BARCODE,
+            "debt_due_date": datetime(2025, 3, 1),
+            "our_number_label": "09/53365272380-3",
+            "debt_id": uuid4(),
+            "debt_amount": Decimal("1234.50"),
+            "user_name": "Ana (Teste)",
+            "user_id": 5486,
+        }
+    )
+
+
+def content_stream(pdf: bytes) -> str:
+    stream = re.search(rb"stream\n(.*)\nendstream", pdf, re.S).group(1)
+    return zlib.decompress(stream).decode("cp1252")
+
+
+def decode_i2of5(content: str) -> str:
+    """Lê os dígitos de volta a partir das posições e larguras dos retângulos desenhados."""
+    bars = [tuple(map(float, match)) for match in re.findall(r"([\d.]+) 540 ([\d.]+) [\d.]+ re", content)]
+    elements = []
+    for (x, width), (next_x, _) in zip(bars, bars[1:] + [(None, None)]):
+        elements.append("w" if width > BAR_NARROW * 2 else "n")
+        if next_x is not None:
+            elements.append("w" if next_x - x - width > BAR_NARROW * 2 + 0.01 else "n")
+    body = elements[4:-3]
+    digits = []
+    for i in range(0, len(body), 10):
+        group = body[i:i + 10]
+        digits.append(I2OF5_PATTERNS.index("".join(group[0::2])))
+        digits.append(I2OF5_PATTERNS.index("".join(group[1::2])))
+    return "".join(map(str, digits))
+
+
+class TestBoletoPdf:
+    def test_template_is_cached_per_process(self):
+        assert get_template(*TEMPLATE_KEY) is get_template(*TEMPLATE_KEY)
+
+    def test_xref_offsets_point_to_objects(self, document):
+        pdf = render_boleto_pdf(get_template(*TEMPLATE_KEY), document)
+
+        xref = pdf[int(pdf.rsplit(b"startxref\n", 1)[1].split(b"\n")[0]):]
+        offsets = [int(line[:10]) for line in xref.split(b"\n")[3:9]]
+        assert pdf.startswith(b"%PDF-1.4") and pdf.endswith(b"%%EOF\n")
+        assert [pdf[offset:offset + 7] for offset in offsets] == [f"{n} 0 obj".encode() for n in range(1, 7)]
+
+    def test_renders_fields_and_barcode(self, document):
+        content = content_stream(render_boleto_pdf(get_template(*TEMPLATE_KEY), document))
+
+        assert "(R$ 1.234,50) Tj" in content
+        assert "(Ana \\(Teste\\) - 5486) Tj" in content
+        assert "(01/03/2025) Tj" in content
+        assert decode_i2of5(content) == BARCODE
+
+    def test_format_amount(self):
+        assert format_amount(Decimal("1234567.8")) == "R$ 1.234.567,80"
+        assert format_amount(Decimal("0.05")) == "R$ 0,05"
+
+
+class TestBoletoRenderer:
+    @pytest.mark.asyncio
+    async def test_render_many_stores_documents(self, document, tmp_path):
+        """Os PDFs são gerados no pool e gravados no store; só os digests voltam."""
+        store = ContentStore(root=str(tmp_path / "boletos"))
+        renderer = BoletoRenderer(workers=1, max_pending=4, batch_size=2, store=store, template_key=TEMPLATE_KEY)
+        documents = [dict(document, document_number=str(i)) for i in range(5)]
+        try:
+            digests = await renderer.render_many(documents)
+        finally:
+            renderer.close()
+
+        assert len(set(digests)) == 5
+        assert store.get(digests[0]) == render_boleto_pdf(get_template(*TEMPLATE_KEY), documents[0])
+        assert renderer._slots._value == 2
@@ -0,0 +1,95 @@
+import pytest
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.services.boleto_scheduler import BoletoScheduler
+from app.services.file_import_service import BOLETO_ROUTING_KEY
+from tests.unit.services.test_boleto_service import fake_session_factory
+
+NOW = datetime(2025, 3, 1, 12, 0).timestamp()
+
+
+class FakeClock:
+    def __init__(self, now: float):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestBoletoScheduler:
+    @pytest.fixture
+    def debts(self):
+        # (id, vencimento): vencida, liberada agora, daqui a 1 hora e daqui a 2 dias
+        return [
+            (1, datetime(2025, 2, 1)),
+            (2, datetime(2025, 3, 11, 12, 0)),
+            (3, datetime(2025, 3, 11, 13, 0)),
+            (4, datetime(2025, 3, 13, 12, 0)),
+        ]
+
+    @pytest.fixture
+    def repository(self, debts):
+        def stream_pending_debts(due_before, after, page_size, fetch_size):
+            async def rows():
+                page = [debt for debt in debts if debt[1] < due_before and (debt[1], debt[0]) > after]
+                for debt in page[:page_size]:
+                    yield debt
+            return rows()
+
+        repository = MagicMock()
+        repository.stream_pending_debts = MagicMock(side_effect=stream_pending_debts)
+        return repository
+
+    def scheduler(self, clock, publisher, **kwargs):
+        return BoletoScheduler(
+            fake_session_factory(), publisher, lead_days=10, sweep_seconds=86400, tick_seconds=60,
+            fetch_size=10, clock=clock, **kwargs
+        )
+
+    @pytest.mark.asyncio
+    async def test_releases_debts_lead_days_before_due_date(self, repository):
+        clock = FakeClock(NOW)
+        publisher = AsyncMock()
+        scheduler = self.scheduler(clock, publisher, page_size=2, batch_size=10)
+
+        with patch("app.services.boleto_scheduler.BoletoRepository", return_value=repository):
+            assert await scheduler.sweep() == 3
+
+        # Páginas de até 2 dívidas a partir da última lida; a dívida 4 fica para a próxima varredura
+        afters = [call.args[1] for call in repository.stream_pending_debts.call_args_list]
+        assert afters == [(datetime.min, 0), (datetime(2025, 3, 11, 12, 0), 2)]
+
+        clock.now += 60
+        assert await scheduler.release_due() == 2
+        assert publisher.publish.await_args.kwargs["message"] == {"debt_ids": [1, 2]}
+        assert publisher.publish.await_args.kwargs["routing_key"] == BOLETO_ROUTING_KEY
+
+        clock.now += 3600
+        assert await scheduler.release_due() == 1
+        assert publisher.publish.await_args.kwargs["message"] == {"debt_ids": [3]}
+
+    @pytest.mark.asyncio
+    async def test_sweep_does_not_reschedule_pending_debts(self, repository):
+        scheduler = self.scheduler(FakeClock(NOW), AsyncMock(), page_size=100, batch_size=10)
+
+        with patch("app.services.boleto_scheduler.BoletoRepository", return_value=repository):
+            assert await scheduler.sweep() == 3
+            assert await scheduler.sweep() == 0
+        assert len(scheduler.wheel) == 3
+
+    @pytest.mark.asyncio
+    async def test_failed_publish_returns_debts_to_the_wheel(self, repository):
+        clock = FakeClock(NOW)
+        publisher = AsyncMock()
+        publisher.publish.side_effect = [None, ConnectionError("broker down"), None]
+        scheduler = self.scheduler(clock, publisher, page_size=100, batch_size=1)
+        with patch("app.services.boleto_scheduler.BoletoRepository", return_value=repository):
+            await scheduler.sweep()
+
+        clock.now += 60
+        with pytest.raises(ConnectionError):
+            await scheduler.release_due()
+        clock.now += 60
+        assert await scheduler.release_due() == 1
+        assert [call.kwargs["message"]["debt_ids"] for call in publisher.publish.await_args_list] == [[1], [2], [2]]
@@ -0,0 +1,181 @@
+import pytest
+from contextlib import asynccontextmanager
+from datetime import datetime
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+from app.repositories.file_import_repository import _progress
+from app.services.boleto_service import NOTIFICATION_ROUTING_KEY, BoletoService
+
+
+@asynccontextmanager
+async def fake_transaction():
+    yield
+
+
+def fake_session_factory():
+    session = MagicMock()
+    session.begin = fake_transaction
+
+    @asynccontextmanager
+    async def factory():
+        yield session
+
+    return factory
+
+
+class TestBoletoService:
+    @pytest.fixture
+    def repository(self):
+        repository = MagicMock()
+        repository.next_page_boundary = AsyncMock(side_effect=[3, 5, None])
+        repository.insert_page = AsyncMock(
+            side_effect=lambda file_id, after_id, last_id, generate_before: [
+                {
+                    "id": uuid4(),
+                    "user_id": debt_id,
+                    "debt_id": uuid4(),
+                    "our_number": debt_id,
+                    "debt_amount": Decimal("100.50") if debt_id != 4 else Decimal("-1.00"),
+                    "debt_due_date": datetime(2025, 3, 1),
+                    "user_name": f"User {debt_id}",
+                }
+                for debt_id in range(after_id + 1, last_id + 1)
+            ]
+        )
+        repository.undispatched_page = AsyncMock(return_value=[])
+        repository.update_codes = AsyncMock()
+        repository.update_documents = AsyncMock()
+        repository.mark_dispatched = AsyncMock()
+        repository.apply_transitions = AsyncMock(side_effect=lambda ids, statuses, occurred_at: ids)
+        return repository
+
+    @pytest.mark.asyncio
+    async def test_generates_file_in_keyset_pages(self, repository):
+        """Cada página vai do último `debts.id` processado até o limite da próxima página."""
+        file_id = uuid4()
+        service = BoletoService(fake_session_factory(), publisher=AsyncMock(), page_size=3, bulk_size=2)
+
+        with patch("app.services.boleto_service.BoletoRepository", return_value=repository):
+            generated = await service.generate_boletos_for_file(file_id)
+
+        assert generated == 5
+        assert [call.args for call in repository.next_page_boundary.await_args_list] == [
+            (file_id, 0, 3), (file_id, 3, 3), (file_id, 5, 3)
+        ]
+        assert [call.args[:3] for call in repository.insert_page.await_args_list] == [(file_id, 0, 3), (file_id, 3, 5)]
+
+    @pytest.mark.asyncio
+    async def test_notifications_are_published_in_bulk(self, repository):
+        """Os boletos de cada página são notificados em mensagens de até `bulk_size` boletos."""
+        publisher = AsyncMock()
+        service = BoletoService(fake_session_factory(), publisher=publisher, page_size=3, bulk_size=2)
+
+        with patch("app.services.boleto_service.BoletoRepository", return_value=repository):
+            await service.generate_boletos_for_file(uuid4())
+
+        messages = [call.kwargs["message"]["boletos"] for call in publisher.publish.await_args_list]
+        assert [len(boletos) for boletos in messages] == [2, 1, 2]
+        assert [boleto["user_id"] for boletos in messages for boleto in boletos] == [1, 2, 3, 4, 5]
+        assert all(call.kwargs["routing_key"] == NOTIFICATION_ROUTING_KEY for call in publisher.publish.await_args_list)
+
+    @pytest.mark.asyncio
+    async def test_codes_are_written_with_each_page(self, repository):
+        """Os códigos da página são gravados em um único comando; valores fora do layout ficam sem código."""
+        publisher = AsyncMock()
+        service = BoletoService(fake_session_factory(), publisher=publisher, page_size=3, bulk_size=10)
+
+        with patch("app.services.boleto_service.BoletoRepository", return_value=repository):
+            await service.generate_boletos_for_file(uuid4())
+
+        first_page, second_page = [call.args for call in repository.update_codes.await_args_list]
+        assert len(first_page[0]) == 3
+        assert len(second_page[0]) == 1  # a dívida 4 tem valor negativo
+        assert first_page[1][0][5:9] == "1007"  # fator de 01/03/2025
+        lines = [
+            boleto["digitable_line"]
+            for call in publisher.publish.await_args_list
+            for boleto in call.kwargs["message"]["boletos"]
+        ]
+        assert lines[3] is None and all(lines[:3])
+        statuses = [status for call in repository.apply_transitions.await_args_list for status in call.args[1]]
+        assert statuses == ["GENERATED", "GENERATED", "GENERATED", "GENERATION_FAILED", "GENERATED"]
+
+    @pytest.mark.asyncio
+    async def test_documents_are_rendered_after_commit(self, repository):
+        """Os PDFs dos boletos com código de barras são gerados e os digests seguem na notificação."""
+        publisher = AsyncMock()
+        renderer = MagicMock()
+        renderer.render_many = AsyncMock(side_effect=lambda documents: [f"digest-{d['payer']}" for d in documents])
+        service = BoletoService(
+            fake_session_factory(), publisher=publisher, page_size=5, bulk_size=10, renderer=renderer
+        )
+        repository.next_page_boundary = AsyncMock(side_effect=[5, None])
+
+        with patch("app.services.boleto_service.BoletoRepository", return_value=repository):
+            await service.generate_boletos_for_file(uuid4())
+
+        ids, digests = repository.update_documents.await_args.args
+        assert len(ids) == len(digests) == 4
+        boletos = publisher.publish.await_args.kwargs["message"]["boletos"]
+        assert [boleto["document_digest"] for boleto in boletos] == [
+            "digest-User 1 - 1", "digest-User 2 - 2", "digest-User 3 - 3", None, "digest-User 5 - 5"
+        ]
+
+    @pytest.mark.asyncio
+    async def test_redelivery_notifies_boletos_committed_before_a_failed_publish(self, repository):
+        """Se a publicação falha depois do commit, a reentrega encontra os boletos não despachados e os notifica."""
+        boletos = {}
+        dispatched = set()
+
+        async def insert_page(file_id, after_id, last_id, generate_before):
+            # Como o ON CONFLICT DO NOTHING: a reentrega não devolve boletos já gerados
+            if last_id in boletos:
+                return []
+            boletos[last_id] = [{**boleto} for boleto in await original_insert(file_id, after_id, last_id, None)]
+            return [{**boleto} for boleto in boletos[last_id]]
+
+        async def undispatched_page(file_id, after_id, last_id, generate_before):
+            page = [{**boleto} for boleto in boletos.get(last_id, []) if boleto["id"] not in dispatched]
+            for boleto in page:
+                boleto.update(barcode="x", digitable_line="y")
+            return page
+
+        original_insert = repository.insert_page
+        repository.insert_page = AsyncMock(side_effect=insert_page)
+        repository.undispatched_page = AsyncMock(side_effect=undispatched_page)
+        repository.mark_dispatched = AsyncMock(side_effect=dispatched.update)
+        publisher = AsyncMock()
+        publisher.publish.side_effect = [None, ConnectionError("channel closed")]
+        service = BoletoService(fake_session_factory(), publisher=publisher, page_size=3, bulk_size=10)
+
+        with patch("app.services.boleto_service.BoletoRepository", return_value=repository):
+            with pytest.raises(ConnectionError):
+                await service.generate_boletos_for_file(uuid4())
+            assert len(dispatched) == 3  # só a primeira página foi despachada
+
+            publisher.publish.side_effect = None
+            repository.next_page_boundary = AsyncMock(side_effect=[3, 5, None])
+            generated = await service.generate_boletos_for_file(uuid4())
+
+        assert generated == 0
+        retried = publisher.publish.await_args.kwargs["message"]["boletos"]
+        assert [boleto["user_id"] for boleto in retried] == [4, 5]
+        assert len(dispatched) == 5
+
+
+class TestFileImportProgress:
+    def test_completed_file_needs_boletos_once(self):
+        file_id = uuid4()
+
+        assert _progress(file_id, ("COMPLETED", 1, True)).needs_boletos
+        assert not _progress(file_id, ("COMPLETED", 0, False)).needs_boletos
+        assert not _progress(file_id, ("INGESTING", 1, True)).needs_boletos
+
+    def test_chunks_after_completion_request_boletos_again(self):
+        """Chunks novos depois da conclusão (ex.: reenvio do arquivo) pedem uma nova geração."""
+        assert _progress(uuid4(), ("COMPLETED", 2, False)).needs_boletos
+
+    def test_untracked_file(self):
+        assert _progress(uuid4(), None) is None
@@ -0,0 +1,68 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+from app.models.boletos import BoletoStatus
+from app.services.boleto_status_recorder import BoletoStatusRecorder, BoletoTransition, transition_rounds
+from tests.unit.services.test_boleto_service import fake_session_factory
+
+
+class TestTransitionRounds:
+    def test_each_boleto_appears_once_per_round(self):
+        first, second = uuid4(), uuid4()
+        transitions = [
+            BoletoTransition(first, BoletoStatus.NOTIFICATION_FAILED, None),
+            BoletoTransition(second, BoletoStatus.NOTIFIED, None),
+            BoletoTransition(first, BoletoStatus.NOTIFIED, None),
+        ]
+
+        rounds = transition_rounds(transitions)
+
+        assert [[t.boleto_id for t in transitions_round] for transitions_round in rounds] == [[first, second], [first]]
+        assert rounds[1][0].status == BoletoStatus.NOTIFIED
+
+
+class TestBoletoStatusRecorder:
+    @pytest.fixture
+    def repository(self):
+        repository = MagicMock()
+        # A guarda de transição rejeita o primeiro boleto de cada comando
+        repository.apply_transitions = AsyncMock(side_effect=lambda ids, statuses, occurred_at: ids[1:])
+        return repository
+
+    @pytest.mark.asyncio
+    async def test_concurrent_records_share_one_command(self, repository):
+        recorder = BoletoStatusRecorder(fake_session_factory(), batch_size=100, flush_seconds=0.01)
+        messages = [[uuid4(), uuid4()] for _ in range(3)]
+
+        with patch("app.services.boleto_status_recorder.BoletoRepository", return_value=repository):
+            await asyncio.gather(*(recorder.record(ids, BoletoStatus.NOTIFIED) for ids in messages))
+
+        repository.apply_transitions.assert_awaited_once()
+        ids, statuses, occurred_at = repository.apply_transitions.await_args.args
+        assert ids == [boleto_id for message in messages for boleto_id in message]
+        assert set(statuses) == {BoletoStatus.NOTIFIED} and len(occurred_at) == 6
+
+    @pytest.mark.asyncio
+    async def test_apply_counts_ignored_transitions(self, repository):
+        recorder = BoletoStatusRecorder(fake_session_factory(), batch_size=0)
+        boleto_id = uuid4()
+        transitions = [
+            BoletoTransition(boleto_id, BoletoStatus.NOTIFICATION_FAILED, None),
+            BoletoTransition(uuid4(), BoletoStatus.NOTIFIED, None),
+            BoletoTransition(boleto_id, BoletoStatus.NOTIFIED, None),
+        ]
+
+        with patch("app.services.boleto_status_recorder.BoletoRepository", return_value=repository):
+            applied = await recorder.apply(transitions)
+
+        assert applied == 1
+        assert repository.apply_transitions.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_unknown_status(self):
+        recorder = BoletoStatusRecorder(fake_session_factory(), batch_size=0)
+
+        with pytest.raises(ValueError):
+            await recorder.record([uuid4()], "PAID")
@@ -0,0 +1,83 @@
+import random
+import pytest
+from uuid import uuid4
+
+from app.services.csv_validation import (
+    ColumnarRowValidator,
+    PydanticRowValidator,
+    build_row_validator,
+)
+
+FIELDNAMES = ["name", "governmentId", "email", "debtAmount", "debtDueDate", "debtId"]
+
+GOVERNMENT_IDS = ["9558", "0012", "1_000", "+5", " 12 ", "", "abc", "12.5", "9" * 25]
+EMAILS = [
+    "janet95@example.com", "John.Doe@EXAMPLE.COM", "a..b@example.com", "a@test", "a@b.invalid",
+    " a@example.com", "invalid-email", "user+tag@sub.example.co", "a@example.c0m", "x@ab--cd.com",
+    "ação@exemplo.com.br", "a" * 65 + "@example.com", "a@" + "b" * 64 + ".com", "",
+]
+AMOUNTS = ["7811", "5662.50", "1e3", "-10", "inf", " 2.5", "INVALID", "", "1_0"]
+DUE_DATES = ["2024-01-19", "2023-02-30", "2023-13-45", "2024-1-01", "2024-01-01T00:00:00", "0500-01-01", ""]
+DEBT_IDS = [None, "EA23F2CA663A4266A7429DA4C9F4FCB3", "invalid-uuid", ""]
+
+
+def _random_row(rng: random.Random) -> list:
+    debt_id = rng.choice(DEBT_IDS)
+    return [
+        rng.choice(["Elijah Santos", "", "Zoë"]),
+        rng.choice(GOVERNMENT_IDS),
+        rng.choice(EMAILS),
+        rng.choice(AMOUNTS),
+        rng.choice(DUE_DATES),
+        debt_id if debt_id is not None else str(uuid4()),
+    ]
+
+
+def _without_generated_debt_id(invalid_rows):
+    return [
+        {**entry, "row": {k: v for k, v in entry["row"].items() if k != "debt_id"}}
+        for entry in invalid_rows
+    ]
+
+
+class TestCsvValidation:
+    def test_columnar_matches_pydantic(self):
+        """O engine colunar produz as mesmas linhas válidas e os mesmos erros do Pydantic."""
+        rng = random.Random(42)
+        rows = [_random_row(rng) for _ in range(3000)]
+        # Linhas com número de colunas diferente do cabeçalho
+        rows[10] = rows[10][:4]
+        rows[20] = rows[20] + ["extra"]
+
+        expected_valid, expected_invalid = PydanticRowValidator().validate_batch(FIELDNAMES, rows, 1)
+        valid, invalid = ColumnarRowValidator().validate_batch(FIELDNAMES, rows, 1)
+
+        assert expected_valid and expected_invalid
+        assert valid == expected_valid
+        assert _without_generated_debt_id(invalid) == _without_generated_debt_id(expected_invalid)
+
+    def test_columnar_all_valid_batch(self):
+        """Lotes totalmente válidos não passam pelo fallback linha a linha."""
+        rows = [["Samuel Orr", "5486", "LinMichael@Example.com", "5662", "2023-02-25", str(uuid4())]]
+
+        valid, invalid = ColumnarRowValidator().validate_batch(FIELDNAMES, rows, 1)
+
+        assert invalid == []
+        assert valid == PydanticRowValidator().validate_batch(FIELDNAMES, rows, 1)[0]
+        assert valid[0]["email"] == "LinMichael@example.com"
+
+    def test_columnar_missing_column_reports_like_pydantic(self):
+        """Sem uma coluna obrigatória, todas as linhas são rejeitadas com o erro do Pydantic."""
+        fieldnames = FIELDNAMES[:-1]
+        rows = [["Samuel Orr", "5486", "a@example.com", "5662", "2023-02-25"]]
+
+        valid, invalid = ColumnarRowValidator().validate_batch(fieldnames, rows, 7)
+
+        assert valid == []
+        assert invalid[0]["line_number"] == 7
+        assert "debtId" in invalid[0]["error"]
+
+    def test_build_row_validator_rejects_unknown_engine(self):
+        """Engines desconhecidos são rejeitados."""
+        with pytest.raises(ValueError, match="Invalid CSV validation engine"):
+            build_row_validator("bogus")
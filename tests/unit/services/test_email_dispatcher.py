@@ -0,0 +1,196 @@
+import asyncio
+import time
+from email.message import EmailMessage
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import UUID, uuid4
+
+import pytest
+import pytest_asyncio
+
+from app.repositories.boleto_repository import NOTIFICATION_RECIPIENTS
+from app.services.email_dispatcher import EmailDispatcher, SmtpConnectionPool, recipient_domain
+from app.services.notification_service import NotificationService
+from tests.unit.services.test_boleto_service import fake_session_factory
+
+
+class SmtpSink:
+    """Servidor SMTP mínimo que guarda as mensagens recebidas em memória."""
+
+    def __init__(self, rejected=()):
+        self.rejected = set(rejected)
+        self.messages = []
+        self.sessions = 0
+        self.server = None
+        self.port = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle, "127.0.0.1", 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def handle(self, reader, writer):
+        self.sessions += 1
+        writer.write(b"220 sink ESMTP\r\n")
+        recipients, data, in_data = [], [], False
+        while line := await reader.readline():
+            if in_data:
+                if line == b".\r\n":
+                    self.messages.append((recipients, b"".join(data)))
+                    recipients, data, in_data = [], [], False
+                    writer.write(b"250 OK\r\n")
+                else:
+                    data.append(line)
+                continue
+
+            command = line[:4].upper()
+            if command == b"EHLO":
+                writer.write(b"250-sink\r\n250 8BITMIME\r\n")
+            elif command == b"RCPT":
+                address = line.decode().split("<", 1)[1].split(">", 1)[0]
+                if address in self.rejected:
+                    writer.write(b"550 mailbox unavailable\r\n")
+                else:
+                    recipients.append(address)
+                    writer.write(b"250 OK\r\n")
+            elif command == b"DATA":
+                in_data = True
+                writer.write(b"354 go ahead\r\n")
+            elif command == b"RSET":
+                recipients = []
+                writer.write(b"250 OK\r\n")
+            elif command == b"QUIT":
+                writer.write(b"221 bye\r\n")
+                await writer.drain()
+                break
+            else:
+                writer.write(b"250 OK\r\n")
+            await writer.drain()
+        writer.close()
+
+
+def build_message(to: str) -> EmailMessage:
+    message = EmailMessage()
+    message["From"] = "boletos@example.com"
+    message["To"] = to
+    message["Subject"] = "Boleto"
+    message.set_content("Seu boleto foi gerado.")
+    return message
+
+
+@pytest_asyncio.fixture
+async def sink():
+    sink = SmtpSink(rejected={"missing@example.com"})
+    await sink.start()
+    yield sink
+    await sink.stop()
+
+
+def dispatcher_for(sink: SmtpSink, size: int = 2, messages_per_connection: int = 1000, **rates) -> EmailDispatcher:
+    pool = SmtpConnectionPool(
+        host="127.0.0.1", port=sink.port, size=size, username=None, password=None,
+        use_tls=False, start_tls=False, timeout=5, messages_per_connection=messages_per_connection,
+    )
+    return EmailDispatcher(pool, **{"provider_rate": 10_000, "domain_rate": 10_000, "domain_rates": {}, **rates})
+
+
+class TestEmailDispatcher:
+    @pytest.mark.asyncio
+    async def test_sessions_are_reused(self, sink):
+        dispatcher = dispatcher_for(sink, size=2)
+
+        errors = await dispatcher.send_many([build_message(f"user{i}@example.com") for i in range(20)])
+        await dispatcher.close()
+
+        assert errors == [None] * 20
+        assert len(sink.messages) == 20
+        assert sink.sessions == 2
+
+    @pytest.mark.asyncio
+    async def test_sessions_are_recycled(self, sink):
+        dispatcher = dispatcher_for(sink, size=1, messages_per_connection=5)
+
+        await dispatcher.send_many([build_message(f"user{i}@example.com") for i in range(12)])
+        await dispatcher.close()
+
+        assert sink.sessions == 3
+
+    @pytest.mark.asyncio
+    async def test_rejected_recipient_fails_only_its_message(self, sink):
+        dispatcher = dispatcher_for(sink, size=1)
+
+        errors = await dispatcher.send_many(
+            [build_message("a@example.com"), build_message("missing@example.com"), build_message("b@example.com")]
+        )
+        await dispatcher.close()
+
+        assert errors[0] is None and errors[2] is None
+        assert errors[1] is not None
+        assert [recipients for recipients, _ in sink.messages] == [["a@example.com"], ["b@example.com"]]
+        assert sink.sessions == 1  # a sessão continua válida depois do RSET
+
+    @pytest.mark.asyncio
+    async def test_domain_rate_limit(self, sink):
+        dispatcher = dispatcher_for(sink, domain_rate=1, domain_rates={"slow.com": 50}, burst_seconds=0.01)
+        started_at = time.monotonic()
+
+        await dispatcher.send_many([build_message(f"user{i}@slow.com") for i in range(6)])
+
+        assert time.monotonic() - started_at >= 0.09
+        await dispatcher.close()
+
+    def test_recipient_domain(self):
+        assert recipient_domain(build_message("John <John@Example.COM>")) == "example.com"
+        with pytest.raises(ValueError):
+            recipient_domain(build_message("invalid"))
+
+
+class TestNotificationService:
+    @pytest.mark.asyncio
+    async def test_notified_boletos_are_skipped(self):
+        sent, already_notified = uuid4(), uuid4()
+        repository = MagicMock()
+        repository.notification_recipients = AsyncMock(return_value={sent: ("john@example.com", "John")})
+        dispatcher = MagicMock()
+        dispatcher.send_many = AsyncMock(return_value=[None])
+        service = NotificationService(fake_session_factory(), dispatcher)
+
+        with patch("app.services.notification_service.BoletoRepository", return_value=repository):
+            result = await service.notify_boletos([
+                {"boleto_id": str(sent), "user_id": 1, "digitable_line": "23790.12345"},
+                {"boleto_id": str(already_notified), "user_id": 2},
+            ])
+
+        assert result.notified == [sent] and result.failed == [] and result.skipped == [already_notified]
+        (message,) = dispatcher.send_many.await_args.args[0]
+        assert message["To"] == "john@example.com"
+        assert "23790.12345" in message.get_content()
+
+    def test_only_generated_boletos_are_recipients(self):
+        """Boletos sem código (`GENERATION_FAILED`) ou já notificados não recebem e-mail."""
+        statement = NOTIFICATION_RECIPIENTS.text
+
+        assert "boletos.status IN ('GENERATED', 'NOTIFICATION_FAILED')" in statement
+        assert "GENERATION_FAILED" not in statement
+
+    @pytest.mark.asyncio
+    async def test_one_email_per_user(self):
+        boletos = [{"boleto_id": str(uuid4()), "user_id": user_id} for user_id in (1, 2, 1, 1)]
+        repository = MagicMock()
+        repository.notification_recipients = AsyncMock(return_value={
+            UUID(boleto["boleto_id"]): (f"user{boleto['user_id']}@example.com", "User") for boleto in boletos
+        })
+        dispatcher = MagicMock()
+        dispatcher.send_many = AsyncMock(return_value=[None, ConnectionError("down")])
+        service = NotificationService(fake_session_factory(), dispatcher)
+
+        with patch("app.services.notification_service.BoletoRepository", return_value=repository):
+            result = await service.notify_boletos(boletos)
+
+        first, second = dispatcher.send_many.await_args.args[0]
+        assert (first["To"], first["Subject"]) == ("user1@example.com", "Você tem 3 boletos disponíveis")
+        assert second["To"] == "user2@example.com"
+        assert result.notified == [UUID(boletos[i]["boleto_id"]) for i in (0, 2, 3)]
+        assert result.failed == [UUID(boletos[1]["boleto_id"])]
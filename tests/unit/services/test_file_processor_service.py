@@ -5,6 +5,7 @@ import pytest
 from unittest.mock import patch, mock_open, MagicMock
 from io import StringIO
 
+from app.services.chunk_processing_service import ChunkProcessingService
 from app.services.file_processor_service import FileProcessorService
 from app.schemas.chunk import ChunkRow
 
@@ -127,4 +128,146 @@ Samuel Orr,5486,linmichael@example.com,5662,2023-02-25,acc1794e-b264-4fab-8bb7-3
         file_path.chmod(0o000)  # Remove all permissions
 
         with pytest.raises(ValueError, match="Error processing file"):
-            list(file_processor_service.process_file(str(file_path)))
\ No newline at end of file
+            list(file_processor_service.process_file(str(file_path)))
+
+    def test_process_file_columnar_engine_matches_default(self, mixed_csv_content, tmp_path):
+        """
+        Test that the columnar engine yields the same chunks and invalid rows as the default engine.
+        """
+        file_path = tmp_path / "mixed_engines.csv"
+        file_path.write_text(mixed_csv_content)
+
+        results = {}
+        for engine in ("pydantic", "columnar"):
+            service = FileProcessorService(validation_engine=engine)
+            with patch.object(service, '_log_invalid_rows') as mock_log_invalid:
+                chunks = list(service.process_file(str(file_path), chunk_size=1))
+                logged_rows = mock_log_invalid.call_args[0][1]
+            results[engine] = (chunks, [(row['line_number'], row['error']) for row in logged_rows])
+
+        assert results["columnar"] == results["pydantic"]
+
+    @pytest.mark.parametrize("domain", ["a" * 63 + ".com", "a" * 64 + ".com", "mail." + "b" * 64 + ".com.br"])
+    def test_columnar_engine_matches_default_on_email_label_length(self, domain, tmp_path):
+        """
+        Test that both engines agree on domain labels around the 63-character limit when only the email varies.
+        """
+        file_path = tmp_path / "email_labels.csv"
+        file_path.write_text(
+            "name,governmentId,email,debtAmount,debtDueDate,debtId\n"
+            f"Elijah Santos,9558,john@{domain},7811,2024-01-19,ea23f2ca-663a-4266-a742-9da4c9f4fcb3\n"
+        )
+
+        results = {}
+        for engine in ("pydantic", "columnar"):
+            service = FileProcessorService(validation_engine=engine)
+            with patch.object(service, '_log_invalid_rows') as mock_log_invalid:
+                chunks = list(service.process_file(str(file_path)))
+                logged_rows = mock_log_invalid.call_args[0][1] if mock_log_invalid.called else []
+            results[engine] = (chunks, [(row['line_number'], row['error']) for row in logged_rows])
+
+        assert results["columnar"] == results["pydantic"]
+
+    def test_split_byte_ranges_aligned_to_lines(self, valid_csv_content, tmp_path):
+        """
+        Test that byte ranges cover the whole body and always end on a line boundary.
+        """
+        file_path = tmp_path / "ranges.csv"
+        file_path.write_text(valid_csv_content + "\n")
+
+        fieldnames, byte_ranges = FileProcessorService.split_byte_ranges(str(file_path), range_bytes=10)
+
+        content = file_path.read_bytes()
+        header_end = content.index(b"\n") + 1
+        assert fieldnames == ["name", "governmentId", "email", "debtAmount", "debtDueDate", "debtId"]
+        assert byte_ranges[0][0] == header_end
+        assert byte_ranges[-1][1] == len(content)
+        for (start, end), (next_start, _) in zip(byte_ranges, byte_ranges[1:]):
+            assert end == next_start
+            assert content[end - 1:end] == b"\n"
+
+    def test_process_file_parallel_matches_sequential(self, mixed_csv_content, tmp_path):
+        """
+        Test that splitting across a process pool yields the same chunks and report as the sequential path.
+        """
+        file_path = tmp_path / "parallel.csv"
+        file_path.write_text(mixed_csv_content + "\n" + "\n".join(mixed_csv_content.splitlines()[1:] * 20))
+
+        results = {}
+        for workers in (1, 2):
+            service = FileProcessorService(workers=workers, parallel_min_bytes=0, range_bytes=256)
+            with patch.object(service, '_log_invalid_rows') as mock_log_invalid:
+                chunks = list(service.process_file(str(file_path), chunk_size=7))
+                logged_rows = mock_log_invalid.call_args[0][1]
+            results[workers] = (chunks, [(row['line_number'], row['error']) for row in logged_rows])
+
+        assert results[2] == results[1]
+        assert len(results[1][1]) == 21
+
+    @pytest.mark.parametrize("range_bytes", [60, 90, 110])
+    def test_process_file_parallel_keeps_quoted_line_breaks(self, range_bytes, tmp_path):
+        """
+        Test that byte ranges never cut a quoted multi-line field, matching the sequential path.
+        """
+        names = ['"' + "x" * (40 + (i * 37) % 120) + "\n" + "y" * 60 + '"' for i in range(50)]
+        lines = [
+            f"{name},{1000 + i},user{i}@example.com,{i}.5,2024-05-01,0f8fad5b-d9cb-469f-a165-{i:012d}"
+            for i, name in enumerate(names)
+        ]
+        file_path = tmp_path / "multiline.csv"
+        file_path.write_text("name,governmentId,email,debtAmount,debtDueDate,debtId\n" + "\n".join(lines) + "\n")
+
+        _, byte_ranges = FileProcessorService.split_byte_ranges(str(file_path), range_bytes=range_bytes)
+        raw = file_path.read_bytes()
+        assert all(raw[start:end].count(b'"') % 2 == 0 for start, end in byte_ranges)
+
+        results = {}
+        for workers in (1, 2):
+            service = FileProcessorService(workers=workers, parallel_min_bytes=0, range_bytes=range_bytes)
+            with patch.object(service, '_log_invalid_rows'):
+                chunks = service.process_file(str(file_path), chunk_size=7)
+                results[workers] = [row for chunk in chunks for row in chunk]
+
+        assert len(results[1]) == 50
+        assert results[2] == results[1]
+
+    def test_plan_chunk_slices_matches_process_file(self, mixed_csv_content, tmp_path):
+        """
+        Test that claim-check slices, validated by the chunk consumer, yield the same rows as process_file.
+        """
+        content = mixed_csv_content + "\n\n" + '"Ann ""Quoted""\nLine",1234,ann@example.com,10.5,2024-05-01,0f8fad5b-d9cb-469f-a165-70867728950e\n'
+        content += "\n".join(mixed_csv_content.splitlines()[1:] * 5) + "\n"
+        file_path = tmp_path / "claim_check.csv"
+        file_path.write_text(content)
+
+        service = FileProcessorService()
+        with patch.object(service, '_log_invalid_rows'):
+            expected = [row for chunk in service.process_file(str(file_path)) for row in chunk]
+
+        chunk_service = ChunkProcessingService(session_factory=MagicMock())
+        fieldnames = FileProcessorService.read_fieldnames(str(file_path))
+        slices = list(FileProcessorService.plan_chunk_slices(str(file_path), chunk_size=4))
+        raw = file_path.read_bytes()
+        rows = []
+        for chunk_slice in slices:
+            data = raw[chunk_slice.offset:chunk_slice.offset + chunk_slice.length]
+            rows.extend(chunk_service.validate_slice(fieldnames, data, chunk_slice.first_row, chunk_slice.row_count))
+
+        assert [chunk_slice.first_row for chunk_slice in slices] == [1, 5, 9, 13, 17]
+        assert sum(chunk_slice.row_count for chunk_slice in slices) == 19
+        assert [tuple(row.values()) for row in expected] == [tuple(row) for row in rows]
+        assert any(row.name == 'Ann "Quoted"\nLine' for row in rows)
+
+    def test_process_file_with_chunk_size_provider(self, valid_csv_content, tmp_path):
+        """
+        Test that a callable chunk size is consulted at the start of every chunk.
+        """
+        file_path = tmp_path / "adaptive.csv"
+        file_path.write_text(valid_csv_content + "\n" + "\n".join(valid_csv_content.splitlines()[1:] * 3))
+        sizes = iter([1, 2, 3, 100])
+
+        chunks = list(FileProcessorService().process_file(str(file_path), chunk_size=lambda: next(sizes)))
+        slices = list(FileProcessorService.plan_chunk_slices(str(file_path), chunk_size=iter([1, 2, 3, 100]).__next__))
+
+        assert [len(chunk) for chunk in chunks] == [1, 2, 3, 6]
+        assert [chunk_slice.row_count for chunk_slice in slices] == [1, 2, 3, 6]
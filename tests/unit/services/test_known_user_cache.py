@@ -0,0 +1,73 @@
+import pytest
+from datetime import date
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+from sqlalchemy.exc import IntegrityError
+
+from app.schemas.chunk import IngestRow
+from app.services.chunk_processing_service import ChunkProcessingService
+from app.services.known_user_cache import KnownUserCache
+
+
+class TestKnownUserCache:
+    def test_evicts_least_recently_used(self):
+        cache = KnownUserCache(max_size=2)
+        cache.add([1, 2])
+        cache.known([1])
+
+        cache.add([3])
+
+        assert cache.known([1, 2, 3]) == {1, 3}
+        assert len(cache) == 2
+
+    def test_disabled_cache_knows_nothing(self):
+        cache = KnownUserCache(max_size=0)
+        cache.add([1])
+
+        assert cache.known([1]) == set()
+
+
+class TestChunkProcessingServiceUserCache:
+    @pytest.fixture
+    def rows(self):
+        return [
+            IngestRow("Known", 1, "known@example.com", 10.0, date(2024, 1, 1), uuid4()),
+            IngestRow("New", 2, "new@example.com", 20.0, date(2024, 1, 1), uuid4()),
+        ]
+
+    @pytest.fixture
+    def service(self):
+        cache = KnownUserCache(max_size=10)
+        cache.add([1])
+        return ChunkProcessingService(session_factory=MagicMock(), user_cache=cache)
+
+    @pytest.mark.asyncio
+    async def test_known_users_skip_upsert(self, service, rows):
+        """Usuários conhecidos não entram no upsert; os novos entram no cache após o commit."""
+        with patch.object(service, "_write", AsyncMock()) as write:
+            await service.process_trusted_chunk(uuid4(), rows)
+
+        users, debts = write.await_args.args[:2]
+        assert [user["government_id"] for user in users] == [2]
+        assert len(debts) == 2
+        assert service.user_cache.known([1, 2]) == {1, 2}
+
+    @pytest.mark.asyncio
+    async def test_stale_cache_retries_with_all_users(self, service, rows):
+        """Uma violação de integridade com usuários pulados regrava o chunk com todos os usuários."""
+        error = IntegrityError("INSERT", {}, Exception("fk violation"))
+        with patch.object(service, "_write", AsyncMock(side_effect=[error, None])) as write:
+            await service.process_trusted_chunk(uuid4(), rows)
+
+        retried_users = write.await_args_list[1].args[0]
+        assert sorted(user["government_id"] for user in retried_users) == [1, 2]
+
+    @pytest.mark.asyncio
+    async def test_failed_write_does_not_cache_users(self, rows):
+        service = ChunkProcessingService(session_factory=MagicMock(), user_cache=KnownUserCache(max_size=10))
+        with patch.object(service, "_write", AsyncMock(side_effect=RuntimeError("db down"))):
+            with pytest.raises(RuntimeError):
+                await service.process_trusted_chunk(uuid4(), rows)
+
+        assert service.user_cache.known([1, 2]) == set()
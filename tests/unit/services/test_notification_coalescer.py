@@ -0,0 +1,57 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+from app.models.boletos import BoletoStatus
+from app.services.notification_coalescer import NotificationCoalescer
+from app.services.notification_service import NotificationResult
+from tests.unit.services.test_boleto_service import fake_session_factory
+
+
+class TestNotificationCoalescer:
+    @pytest.fixture
+    def boletos(self):
+        return [{"boleto_id": uuid4(), "user_id": user_id} for user_id in (1, 1, 2)]
+
+    def coalescer(self, notification_service, status_recorder, **kwargs):
+        return NotificationCoalescer(
+            fake_session_factory(), notification_service, status_recorder,
+            window_seconds=300, max_boletos=50, lease_seconds=60, **kwargs
+        )
+
+    @pytest.mark.asyncio
+    async def test_enqueue_only_writes_outbox(self, boletos):
+        repository = MagicMock()
+        repository.enqueue = AsyncMock()
+        notification_service = AsyncMock()
+        coalescer = self.coalescer(notification_service, AsyncMock())
+
+        with patch("app.services.notification_coalescer.NotificationOutboxRepository", return_value=repository):
+            await coalescer.enqueue(boletos)
+
+        repository.enqueue.assert_awaited_once_with(boletos)
+        notification_service.notify_boletos.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_flush_keeps_failed_boletos_claimed(self, boletos):
+        notified, failed, skipped = (boleto["boleto_id"] for boleto in boletos)
+        repository = MagicMock()
+        repository.claim_ready = AsyncMock(side_effect=[boletos, []])
+        repository.delete = AsyncMock()
+        notification_service = MagicMock()
+        notification_service.notify_boletos = AsyncMock(
+            return_value=NotificationResult([notified], [failed], [skipped])
+        )
+        status_recorder = AsyncMock()
+        coalescer = self.coalescer(notification_service, status_recorder, max_users=2)
+
+        with patch("app.services.notification_coalescer.NotificationOutboxRepository", return_value=repository):
+            assert await coalescer.flush_ready() == 1
+
+        # Dois usuários reservados (= max_users): uma nova reserva é feita até não sobrar ninguém pronto
+        assert repository.claim_ready.await_count == 2
+        assert repository.claim_ready.await_args.args == (300, 50, 2, 60)
+        repository.delete.assert_awaited_once_with([notified, skipped])
+        assert [call.args for call in status_recorder.record.await_args_list] == [
+            ([notified], BoletoStatus.NOTIFIED), ([failed], BoletoStatus.NOTIFICATION_FAILED)
+        ]
@@ -6,7 +6,8 @@ from io import BytesIO
 
 from fastapi import UploadFile
 from app.core.message_broker import MessageBroker
-from app.services.upload_service import UploadService
+from app.services.upload_service import UploadService, StoredFile, FileTooLargeError
+import hashlib
 
 class TestUploadService:
     @pytest.fixture
@@ -54,18 +55,45 @@ class TestUploadService:
         file_content = b"test csv content"
         file_mock = UploadFile(filename="test.csv", file=BytesIO(file_content))
         
-        # Mock file.read() to return content
-        file_mock.read = AsyncMock(return_value=file_content)
-        
         # Save the file
-        file_path = await upload_service.save_file(file_mock)
+        stored_file = await upload_service.save_file(file_mock)
         
         # Assertions
-        assert os.path.exists(file_path)
-        assert file_path.endswith("test.csv")
-        with open(file_path, 'rb') as saved_file:
+        assert os.path.exists(stored_file.path)
+        assert stored_file.path.endswith("test.csv")
+        assert stored_file.size == len(file_content)
+        assert stored_file.sha256 == hashlib.sha256(file_content).hexdigest()
+        with open(stored_file.path, 'rb') as saved_file:
+            assert saved_file.read() == file_content
+
+    @pytest.mark.asyncio
+    async def test_save_file_streams_in_blocks(self, message_broker_mock, tmp_path):
+        """Test that the file is read in fixed-size blocks."""
+        upload_service = UploadService(message_broker_mock, temp_dir=str(tmp_path), block_size=4)
+        file_content = b"0123456789"
+        file_mock = UploadFile(filename="test.csv", file=BytesIO(file_content))
+        file_mock.read = AsyncMock(side_effect=[b"0123", b"4567", b"89", b""])
+
+        stored_file = await upload_service.save_file(file_mock)
+
+        assert all(call.args == (4,) for call in file_mock.read.call_args_list)
+        assert stored_file.size == len(file_content)
+        with open(stored_file.path, 'rb') as saved_file:
             assert saved_file.read() == file_content
 
+    @pytest.mark.asyncio
+    async def test_save_file_exceeds_max_size(self, message_broker_mock, tmp_path):
+        """Test that oversized uploads fail and leave no partial file behind."""
+        upload_service = UploadService(
+            message_broker_mock, temp_dir=str(tmp_path), max_file_size=8, block_size=4
+        )
+        file_mock = UploadFile(filename="test.csv", file=BytesIO(b"0123456789"))
+
+        with pytest.raises(FileTooLargeError):
+            await upload_service.save_file(file_mock)
+
+        assert not os.path.exists(tmp_path / "test.csv")
+
     @pytest.mark.asyncio
     async def test_save_file_error(self, upload_service):
         """Test file saving with a simulated error."""
@@ -128,7 +156,9 @@ class TestUploadService:
         file_mock.read = AsyncMock(return_value=file_content)
         
         # Mock the dependent methods
-        upload_service.save_file = AsyncMock(return_value="/tmp/test.csv")
+        upload_service.save_file = AsyncMock(
+            return_value=StoredFile(path="/tmp/test.csv", size=len(file_content), sha256="abc")
+        )
         upload_service.enqueue_file = AsyncMock()
         
         # Call the method
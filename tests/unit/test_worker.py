@@ -0,0 +1,94 @@
+import multiprocessing
+import signal
+import sys
+import time
+
+import pytest
+
+from app import worker
+from app.worker import WorkerSupervisor, parse_queues
+
+context = multiprocessing.get_context("fork")
+started = context.Queue()
+
+
+def exit_with_error(queues, index, run_scheduler):
+    sys.exit(3)
+
+
+def report_and_wait(queues, index, run_scheduler):
+    started.put((index, run_scheduler))
+    time.sleep(60)
+
+
+def ignore_sigterm(queues, index, run_scheduler):
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    started.put((index, run_scheduler))
+    time.sleep(60)
+
+
+def supervisor_for(target, processes=1, **kwargs) -> WorkerSupervisor:
+    return WorkerSupervisor(["chunk"], processes, target=target, context=context, **kwargs)
+
+
+def wait_for_exit(supervisor: WorkerSupervisor):
+    for process in supervisor.children.values():
+        process.join(5)
+
+
+class TestParseQueues:
+    def test_valid_queues(self):
+        assert parse_queues("chunk, boleto") == ["chunk", "boleto"]
+
+    @pytest.mark.parametrize("value", ["", "chunk,invoices", "file", "file,boleto"])
+    def test_invalid_queues(self, value):
+        with pytest.raises(ValueError):
+            parse_queues(value)
+
+
+class TestWorkerSupervisor:
+    def test_only_first_process_runs_the_scheduler(self):
+        supervisor = supervisor_for(report_and_wait, processes=3, run_scheduler=True, shutdown_timeout=5)
+        supervisor.start()
+        try:
+            reports = sorted(started.get(timeout=5) for _ in range(3))
+        finally:
+            supervisor.stop()
+
+        assert reports == [(0, True), (1, False), (2, False)]
+        assert all(process.exitcode == -signal.SIGTERM for process in supervisor.children.values())
+
+    def test_crashed_process_is_restarted(self, monkeypatch):
+        monkeypatch.setattr(worker, "RESTART_STABLE_SECONDS", 0.0)
+        supervisor = supervisor_for(exit_with_error)
+        supervisor.start()
+        crashed = supervisor.children[0]
+        wait_for_exit(supervisor)
+
+        supervisor.check()
+        wait_for_exit(supervisor)
+        supervisor.stop()
+
+        assert crashed.exitcode == 3
+        assert supervisor.children[0] is not crashed
+
+    def test_restart_waits_after_a_quick_crash(self):
+        supervisor = supervisor_for(exit_with_error)
+        supervisor.start()
+        crashed = supervisor.children[0]
+        wait_for_exit(supervisor)
+
+        supervisor.check()
+        supervisor.check()
+
+        assert supervisor.children[0] is crashed
+        assert supervisor._backoff[0] == 1.0
+
+    def test_stop_kills_processes_that_do_not_drain(self):
+        supervisor = supervisor_for(ignore_sigterm, shutdown_timeout=0.2)
+        supervisor.start()
+        started.get(timeout=5)
+
+        supervisor.stop()
+
+        assert supervisor.children[0].exitcode == -signal.SIGKILL
@@ -0,0 +1,84 @@
+import asyncio
+import threading
+import time
+from contextlib import aclosing
+
+import pytest
+
+from app.utils.async_iteration import iterate_in_thread
+
+
+@pytest.mark.asyncio
+class TestIterateInThread:
+    async def test_yields_all_items_in_order(self):
+        """Todos os itens do iterável síncrono chegam ao consumidor, na ordem."""
+        items = [item async for item in iterate_in_thread(lambda: iter(range(50)), max_queue_size=4)]
+
+        assert items == list(range(50))
+
+    async def test_propagates_producer_errors(self):
+        """Exceções do iterável são relançadas no consumidor após os itens já produzidos."""
+        def failing():
+            yield 1
+            raise ValueError("broken file")
+
+        received = []
+        with pytest.raises(ValueError, match="broken file"):
+            async for item in iterate_in_thread(failing):
+                received.append(item)
+
+        assert received == [1]
+
+    async def test_bounded_queue_applies_backpressure(self):
+        """O produtor não se adianta mais do que o tamanho da fila."""
+        produced = []
+
+        def producer():
+            for i in range(100):
+                produced.append(i)
+                yield i
+
+        async with aclosing(iterate_in_thread(producer, max_queue_size=3)) as items:
+            await items.__anext__()
+            await asyncio.sleep(0.2)
+            # 1 consumido + 3 na fila + 1 aguardando espaço na fila
+            assert len(produced) <= 5
+
+    async def test_closing_early_stops_producer(self):
+        """Interromper a iteração encerra o gerador síncrono e libera a thread."""
+        closed = threading.Event()
+
+        def endless():
+            try:
+                while True:
+                    yield 1
+            finally:
+                closed.set()
+
+        async with aclosing(iterate_in_thread(endless, max_queue_size=2)) as items:
+            async for _ in items:
+                break
+
+        assert closed.is_set()
+
+    async def test_event_loop_stays_responsive(self):
+        """Trabalho bloqueante do produtor não impede outras tarefas de rodarem."""
+        def slow():
+            for i in range(3):
+                time.sleep(0.1)
+                yield i
+
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        ticker_task = asyncio.create_task(ticker())
+        items = [item async for item in iterate_in_thread(slow)]
+        ticker_task.cancel()
+
+        assert items == [0, 1, 2]
+        assert ticks >= 10
@@ -0,0 +1,94 @@
+import asyncio
+import json
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from pamqp.commands import Basic
+
+from app.core.rabbitmq_connection_manager import RabbitMQConnectionManager
+from app.core.rabbitmq_connection_params import RabbitMQConnectionParams
+from app.utils.message_publisher import MessagePublisher, PublishConfirmError
+
+
+class FakeExchange:
+    """Exchange que confirma as publicações depois de um atraso, recusando as tags em `nacks`."""
+
+    def __init__(self, nacks=None):
+        self.nacks = nacks or {}  # tag -> quantas vezes recusar
+        self.attempts = []
+        self.outstanding = 0
+        self.max_outstanding = 0
+
+    async def publish(self, message, routing_key, timeout=None):
+        tag = json.loads(message.body)["tag"]
+        self.attempts.append(tag)
+        self.outstanding += 1
+        self.max_outstanding = max(self.max_outstanding, self.outstanding)
+        await asyncio.sleep(0.001)
+        self.outstanding -= 1
+        if self.nacks.get(tag, 0) > 0:
+            self.nacks[tag] -= 1
+            return Basic.Nack()
+        return Basic.Ack()
+
+
+class FakeChannel:
+    """Canal mínimo, suficiente para o pool de canais do aio_pika."""
+
+    def __init__(self, exchange: FakeExchange):
+        self.is_closed = False
+        self.get_exchange = AsyncMock(return_value=exchange)
+
+    async def close(self):
+        self.is_closed = True
+
+
+class TestConfirmedPublishWindow:
+    @pytest.fixture(autouse=True)
+    async def reset_instances(self):
+        yield
+        await RabbitMQConnectionManager.close_all()
+
+    def publisher_for(self, exchange: FakeExchange) -> MessagePublisher:
+        connection = MagicMock(is_closed=False)
+        connection.channel = AsyncMock(side_effect=lambda **kwargs: FakeChannel(exchange))
+        connection.close = AsyncMock()
+        params = RabbitMQConnectionParams(host="localhost")
+        params.get_connection = AsyncMock(return_value=connection)
+        return MessagePublisher(params)
+
+    @pytest.mark.asyncio
+    async def test_window_bounds_outstanding_publishes(self):
+        exchange = FakeExchange()
+        publisher = self.publisher_for(exchange)
+
+        async with publisher.confirm_window(size=4) as window:
+            for tag in range(20):
+                await window.publish("chunk_exchange", "chunk.process", {"tag": tag}, tag=tag)
+
+        assert window.confirmed == 20
+        assert exchange.max_outstanding == 4
+
+    @pytest.mark.asyncio
+    async def test_nacked_messages_are_republished(self):
+        exchange = FakeExchange(nacks={3: 1, 7: 2})
+        publisher = self.publisher_for(exchange)
+
+        async with publisher.confirm_window(size=8, retries=2) as window:
+            for tag in range(10):
+                await window.publish("chunk_exchange", "chunk.process", {"tag": tag}, tag=tag)
+
+        assert window.confirmed == 10
+        assert sorted(exchange.attempts) == sorted(list(range(10)) + [3, 7, 7])
+
+    @pytest.mark.asyncio
+    async def test_reports_exactly_the_unconfirmed_tags(self):
+        exchange = FakeExchange(nacks={2: 10, 5: 10, 6: 1})
+        publisher = self.publisher_for(exchange)
+
+        with pytest.raises(PublishConfirmError) as error:
+            async with publisher.confirm_window(size=8, retries=1) as window:
+                for tag in range(8):
+                    await window.publish("chunk_exchange", "chunk.process", {"tag": tag}, tag=tag)
+
+        assert sorted(error.value.unconfirmed) == [2, 5]
@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+
+from app.utils.micro_batcher import MicroBatcher
+
+
+@pytest.mark.asyncio
+class TestMicroBatcher:
+    async def test_flushes_when_size_is_reached(self):
+        batches = []
+
+        async def flush(items):
+            batches.append(items)
+
+        batcher = MicroBatcher(flush, max_size=4, linger_seconds=10, size_of=len)
+
+        await asyncio.wait_for(asyncio.gather(batcher.submit("ab"), batcher.submit("cd")), timeout=1)
+
+        assert batches == [["ab", "cd"]]
+
+    async def test_flushes_after_linger(self):
+        batches = []
+
+        async def flush(items):
+            batches.append(items)
+
+        batcher = MicroBatcher(flush, max_size=100, linger_seconds=0.01)
+
+        await asyncio.gather(batcher.submit(1), batcher.submit(2))
+        await batcher.submit(3)
+
+        assert batches == [[1, 2], [3]]
+
+    async def test_flush_error_reaches_every_caller(self):
+        async def flush(items):
+            raise RuntimeError("commit failed")
+
+        batcher = MicroBatcher(flush, max_size=2, linger_seconds=10)
+
+        results = await asyncio.gather(batcher.submit(1), batcher.submit(2), return_exceptions=True)
+
+        assert all(isinstance(result, RuntimeError) for result in results)
+
+    async def test_close_flushes_pending_items(self):
+        batches = []
+
+        async def flush(items):
+            batches.append(items)
+
+        batcher = MicroBatcher(flush, max_size=100, linger_seconds=10)
+        pending = asyncio.create_task(batcher.submit(1))
+        await asyncio.sleep(0)
+
+        await batcher.close()
+        await pending
+
+        assert batches == [[1]]
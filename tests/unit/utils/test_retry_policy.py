@@ -0,0 +1,24 @@
+import pytest
+
+from app.utils.retry_policy import RetryPolicy
+
+
+class TestRetryPolicy:
+    def test_tier_follows_retry_count(self):
+        policy = RetryPolicy(delays=[10, 1, 60], max_retries=5)
+
+        assert [policy.delay_for(count) for count in range(6)] == [1.0, 10.0, 60.0, 60.0, 60.0, None]
+
+    def test_jitter_only_shortens_the_delay(self):
+        assert RetryPolicy(delays=[10], jitter=0.2, rand=lambda: 0.0).expiration_for(10) == 10
+        assert RetryPolicy(delays=[10], jitter=0.2, rand=lambda: 0.5).expiration_for(10) == pytest.approx(9)
+
+        policy = RetryPolicy(delays=[10], jitter=0.2)
+        assert all(8 <= policy.expiration_for(10) <= 10 for _ in range(100))
+
+    def test_label(self):
+        assert [RetryPolicy.label(delay) for delay in (0.5, 1.0, 600.0)] == ["0.5s", "1s", "600s"]
+
+    def test_requires_a_delay(self):
+        with pytest.raises(ValueError):
+            RetryPolicy(delays=[])
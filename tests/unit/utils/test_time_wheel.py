@@ -0,0 +1,46 @@
+import random
+
+import pytest
+
+from app.utils.time_wheel import HierarchicalTimeWheel
+
+
+class TestHierarchicalTimeWheel:
+    def test_releases_items_at_their_tick(self):
+        wheel = HierarchicalTimeWheel(1.0, (4, 3), start=100.0)
+        wheel.add(102.5, "a")
+        wheel.add(109.0, "b")  # nível 1
+        wheel.add(99.0, "late")
+
+        assert wheel.advance(100.9) == ["late"]
+        assert wheel.advance(101.9) == []
+        assert wheel.advance(102.0) == ["a"]
+        assert wheel.advance(108.99) == []
+        assert wheel.advance(109.0) == ["b"]
+        assert len(wheel) == 0
+
+    def test_overflow_beyond_last_level(self):
+        """Prazos além da volta completa voltam para a roda quando a volta termina."""
+        wheel = HierarchicalTimeWheel(1.0, (4, 3), start=0.0)
+        wheel.add(30.0, "far")
+
+        assert wheel.advance(29.0) == []
+        assert wheel.advance(30.0) == ["far"]
+
+    @pytest.mark.parametrize("seed", range(20))
+    def test_never_early_never_late(self, seed):
+        rng = random.Random(seed)
+        start = rng.uniform(0, 1e6)
+        wheel = HierarchicalTimeWheel(1.0, (4, 3, 2), start=start)
+        deadlines = {item: start + rng.uniform(-5, 60) for item in range(100)}
+        for item, deadline in deadlines.items():
+            wheel.add(deadline, item)
+
+        now = start
+        released = set()
+        while now < start + 80:
+            now += rng.uniform(0, 3)
+            for item in wheel.advance(now):
+                assert deadlines[item] // 1 <= now // 1
+                released.add(item)
+            assert {item for item, deadline in deadlines.items() if deadline // 1 <= now // 1} == released
@@ -0,0 +1,49 @@
+import asyncio
+import time
+
+import pytest
+
+from app.utils.token_bucket import TokenBucket, TokenBucketRegistry
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestTokenBucket:
+    def test_burst_then_refill(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=2, capacity=3, clock=clock)
+
+        assert [bucket.try_acquire() for _ in range(4)] == [True, True, True, False]
+        clock.now += 0.5
+        assert bucket.try_acquire()
+        assert not bucket.try_acquire()
+        clock.now += 100
+        assert sum(bucket.try_acquire() for _ in range(10)) == 3  # nunca acumula além da capacidade
+
+    @pytest.mark.asyncio
+    async def test_acquire_waits_for_tokens(self):
+        bucket = TokenBucket(rate=100, capacity=1)
+        started_at = time.monotonic()
+
+        await asyncio.gather(*(bucket.acquire() for _ in range(6)))
+
+        assert time.monotonic() - started_at >= 0.045
+
+    def test_invalid_rate(self):
+        with pytest.raises(ValueError):
+            TokenBucket(rate=0, capacity=1)
+
+
+class TestTokenBucketRegistry:
+    def test_overrides_and_case_insensitive_keys(self):
+        registry = TokenBucketRegistry(rate=10, burst_seconds=2, overrides={"Gmail.com": 50})
+
+        assert registry.get("gmail.com") is registry.get("GMAIL.COM")
+        assert registry.get("gmail.com").capacity == 100
+        assert registry.get("example.com").rate == 10
@@ -0,0 +1,60 @@
+import json
+from datetime import date
+from uuid import uuid4
+
+import pytest
+
+from app.config import settings
+from app.schemas.chunk import IngestRow
+from app.utils.trusted_chunk import build_trusted_chunk, decode_trusted_chunk, is_trusted_chunk
+
+
+class TestTrustedChunk:
+    @pytest.fixture(autouse=True)
+    def signing_key(self, monkeypatch):
+        monkeypatch.setattr(settings, "CHUNK_SIGNING_KEY", "test-signing-key")
+
+    def _chunk(self):
+        return [{
+            "name": "Elijah Santos",
+            "governmentId": 9558,
+            "email": "janet95@example.com",
+            "debtAmount": 7811.5,
+            "debtDueDate": date(2024, 1, 19),
+            "debtId": uuid4(),
+        }]
+
+    def test_round_trip_through_json(self):
+        """Um chunk assinado continua confiável após serialização e é decodificado sem revalidação."""
+        file_id = uuid4()
+        chunk = self._chunk()
+
+        message = json.loads(json.dumps(build_trusted_chunk(str(file_id), chunk)))
+
+        assert is_trusted_chunk(message)
+        decoded_file_id, rows = decode_trusted_chunk(message)
+        assert decoded_file_id == file_id
+        assert rows == [IngestRow("Elijah Santos", 9558, "janet95@example.com", 7811.5, date(2024, 1, 19), chunk[0]["debtId"])]
+
+    def test_tampered_rows_are_not_trusted(self):
+        """Alterações no conteúdo invalidam a assinatura."""
+        message = build_trusted_chunk(str(uuid4()), self._chunk())
+        message["rows"][0][3] = 1.0
+
+        assert not is_trusted_chunk(message)
+
+    def test_wrong_key_or_legacy_message_is_not_trusted(self):
+        """Assinaturas com outra chave e mensagens legadas não são confiáveis."""
+        message = build_trusted_chunk(str(uuid4()), self._chunk(), key="other-key")
+
+        assert not is_trusted_chunk(message)
+        assert not is_trusted_chunk({"file_id": str(uuid4()), "chunk": []})
+
+    def test_nothing_is_trusted_without_a_key(self, monkeypatch):
+        """Sem `CHUNK_SIGNING_KEY`, nenhum chunk é confiável, nem os assinados com outra chave."""
+        forged = build_trusted_chunk(str(uuid4()), self._chunk(), key="public-default")
+        monkeypatch.setattr(settings, "CHUNK_SIGNING_KEY", None)
+
+        assert build_trusted_chunk(str(uuid4()), self._chunk())["signature"] is None
+        assert not is_trusted_chunk(forged)
+        assert not is_trusted_chunk(forged, key="")